@@ -0,0 +1,164 @@
+""" A back end that avoids committing to a target for as long as it can. """
+
+import numpy as np
+
+from typing import Optional, Tuple
+
+from backend import ClonleBackend, ClonleState, NotInitializedError
+from instrumentation import timed
+from scoring import (
+    CONTAINED,
+    LOCATED,
+    encode_words,
+    feedback_digits,
+    feedback_to_str,
+    score,
+    solved_code,
+)
+
+
+def feedback_classes(codes: np.ndarray, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the distinct feedback codes and the number of times each occurs.
+
+    :param codes: feedback codes
+    :param length: word length
+    :return: tuple `(class_codes, counts)`, with `class_codes` in increasing order
+    """
+    n_codes = 3**length
+    if n_codes <= max(4 * len(codes), 1024):
+        counts = np.bincount(codes, minlength=n_codes)
+        class_codes = np.flatnonzero(counts)
+        return class_codes, counts[class_codes]
+    else:
+        # too many possible codes for a dense histogram
+        return np.unique(codes, return_counts=True)
+
+
+class AdversarialBackend(ClonleBackend):
+    """A back end in the style of Absurdle, in which the target is not chosen ahead of
+    time.
+
+    The game keeps a set of remaining targets, initially all the possible targets. Each
+    attempt splits these by the feedback they would produce, and the game answers with
+    the feedback of the class chosen by `policy`, keeping only those targets. Solving
+    thus requires narrowing the set down to a single word. The target is only fixed
+    once the game is over.
+
+    :param policy: how to choose the feedback class:
+        "largest": keep as many targets as possible, preferring feedback that reveals
+            fewer letters in case of ties;
+        "least_revealing": give as few located letters, and then as few contained
+            letters, as possible, preferring larger classes in case of ties;
+        in both cases, the perfect match is only accepted when it is the only option
+    :param kwargs: other arguments are passed to `ClonleBackend`
+
+    Attributes:
+        remaining: np.ndarray or None
+            Indices in the database of the targets that are consistent with all the
+            feedback so far. Set to `None` before `start()`.
+    """
+
+    def __init__(self, *args, policy: str = "largest", **kwargs):
+        if policy not in ["largest", "least_revealing"]:
+            raise ValueError(f"unknown policy '{policy}'.")
+        self.policy = policy
+        self.remaining = None
+
+        super().__init__(*args, **kwargs)
+
+    @timed("backend.start")
+    def start(
+        self,
+        target_frequency_cutoff: Optional[float] = None,
+        target_n_cutoff: Optional[int] = None,
+    ):
+        """Start a new game.
+
+        All words above the cutoffs are possible targets. The parameters have the same
+        meaning as for `ClonleBackend.start()`.
+        """
+        self._reset_game()
+        self.n_targets = self._n_targets(target_frequency_cutoff, target_n_cutoff)
+        if self.n_targets == 0:
+            raise ValueError("no possible targets.")
+
+        self.remaining = np.arange(self.n_targets)
+        self.target = None
+        self._target_counts = None
+
+    def attempt(self, word: str) -> str:
+        """Attempt a word. See `ClonleBackend.attempt()`."""
+        if self.remaining is None:
+            raise NotInitializedError("attempt() called before start()")
+
+        return super().attempt(word)
+
+    @timed("backend.attempt.score")
+    def _score(self, word: str) -> str:
+        """Choose the feedback for an attempt and keep only the consistent targets."""
+        guess = encode_words([word], self.length)
+        codes = score(guess, self.database.matrix[self.remaining])
+        class_codes, counts = feedback_classes(codes, self.length)
+
+        solved = solved_code(self.length)
+        if len(class_codes) > 1:
+            keep = class_codes != solved
+            class_codes = class_codes[keep]
+            counts = counts[keep]
+
+        digits = feedback_digits(class_codes, self.length)
+        n_located = np.sum(digits == LOCATED, axis=1)
+        n_contained = np.sum(digits == CONTAINED, axis=1)
+        if self.policy == "largest":
+            order = np.lexsort((class_codes, n_contained, n_located, -counts))
+        else:
+            order = np.lexsort((class_codes, -counts, n_contained, n_located))
+
+        code = class_codes[order[0]]
+        self.remaining = self.remaining[codes == code]
+        if code == solved or self.attempts + 1 >= self.max_attempts:
+            # the game is over, so commit to a target
+            self.target = self.database.word(self.remaining[0])
+        return feedback_to_str(code, self.length)
+
+    def _snapshot_targets(self) -> list:
+        # the target is only fixed at the end, and replaying the guesses recovers it
+        return []
+
+    def _start_from_snapshot(self, n_targets: int, targets: list):
+        self.start(target_n_cutoff=n_targets)
+
+    @timed("backend.attempt.update_state")
+    def _update_state(self, word: str, res: str):
+        """Update `self.letter_states`, using only what holds for all remaining
+        targets."""
+        matrix = self.database.matrix[self.remaining]
+
+        found = set()
+        n_exact = {}
+        for ch, symbol in zip(word, res):
+            if symbol != " ":
+                found.add(ch)
+            if symbol == "x":
+                n_exact[ch] = n_exact.get(ch, 0) + 1
+
+        states = self.letter_states
+        for ch in set(word):
+            i = ord(ch) - ord("a")
+            counts = np.sum(matrix == i, axis=1)
+            if np.all(counts == 0):
+                states[i] = ClonleState.MISSING.value
+            elif np.all(counts == n_exact.get(ch, 0)):
+                states[i] = ClonleState.LOCATED.value
+            elif ch in found and states[i] != ClonleState.LOCATED.value:
+                states[i] = ClonleState.CONTAINED.value
+
+    def __str__(self):
+        n_remaining = len(self.remaining) if self.remaining is not None else None
+        return (
+            f"AdversarialBackend("
+            f"length={self.length}, "
+            f"attempts={self.attempts} / {self.max_attempts}, "
+            f"remaining={n_remaining}"
+            f")"
+        )
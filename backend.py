@@ -1,12 +1,34 @@
 """ Define the back end of the gam. """
 
-import pandas as pd
+import struct
+import time
+
 import numpy as np
 
 from string import ascii_lowercase
-from typing import Union, Optional
+from typing import Union, Optional, Sequence, TYPE_CHECKING
 from enum import Enum
 
+from scoring import (
+    FEEDBACK_SYMBOLS,
+    decode_words,
+    encode_words,
+    feedback_to_str,
+    score_word,
+)
+from patterns import load_pattern_table
+from dictionary import WordList, dataframe_to_word_list
+from registry import DictionaryRegistry, default_registry
+from candidates import CandidateMasks, CandidateSet
+from constraints import HardModeConstraints
+from gamelog import GameLog
+from letter_stats import LetterStats
+from instrumentation import timed
+
+if TYPE_CHECKING:
+    # Pandas is slow to import and is only needed when a dataframe is passed in
+    import pandas as pd
+
 
 class NotInitializedError(Exception):
     pass
@@ -26,10 +48,29 @@ class ClonleState(Enum):
     MISSING = -1  # not in word
 
 
+_STATE_BY_VALUE = {_.value: _ for _ in ClonleState}
+_CONTAINED = ClonleState.CONTAINED.value
+_LOCATED = ClonleState.LOCATED.value
+_MISSING = ClonleState.MISSING.value
+
+# lookup tables between feedback symbols (as bytes) and feedback digits
+_SYMBOLS = np.frombuffer(FEEDBACK_SYMBOLS.encode("ascii"), dtype=np.uint8)
+_DIGITS = np.zeros(256, dtype=np.uint8)
+_DIGITS[_SYMBOLS] = np.arange(len(_SYMBOLS))
+
+# snapshot header: magic, format version, word length, maximum attempts, attempts,
+# number of stored targets, number of possible targets
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_MAGIC = b"CLNL"
+_SNAPSHOT_HEADER = struct.Struct("<4sBBHHHI")
+
+
 class ClonleBackend:
     """Class that manages the wordle-like backend.
 
-    :param database: word database as a Pandas dataframe with columns "word" and "count"
+    :param database: word database, either as a Pandas dataframe with columns "word"
+        and "count" (or "freq"), or as a `dictionary.WordList`, e.g., loaded from a
+        compiled dictionary using `dictionary.load_compiled()`
     :param length: word length
     :param frequency_cutoff: cutoff for word frequencies: any word with a frequency
         below the cutoff will be ignored; frequencies are either used directly if a
@@ -37,52 +78,270 @@ class ClonleBackend:
         length
     :param max_attempts: maximum number of attempts
     :param rng: random number generator to use; should be either a seed or a
-        `numpy.random.Generator` object
+        `numpy.random.Generator` object; use `None` for an unpredictable seed
+    :param hard_mode: if provided, every guess must respect the hints revealed so far;
+        either "standard" or "strict" (see `constraints.HardModeConstraints`)
+    :param game_log: if provided, every finished game is recorded in this log
 
     Attributes:
         attempts: int or None
             Number of attempts made. Set to `None` before `start()`.
+        letter_states: np.ndarray or None
+            Information state: `int8` array giving the value of the `ClonleState` of
+            each letter, from 'a' to 'z'. Set to `None` before `start()`.
         state: dict or None
-            Information state: dictionary indicating the state for each letter. See
-            the `ClonleState` enum. Set to `None` before `start()`.
+            The information state as a dictionary mapping each letter to a
+            `ClonleState`. Set to `None` before `start()`.
+        history: list or None
+            List of `(word, feedback)` pairs for all the attempts made so far. This is
+            generated from compact `uint8` buffers of guessed letters and feedback
+            digits. Set to `None` before `start()`.
+        n_targets: int or None
+            Number of possible targets; these are the first `n_targets` words in the
+            database. Set to `None` before `start()`.
+        constraints: HardModeConstraints or None
+            The hints that hard-mode guesses must respect. Set to `None` before
+            `start()` or when not in hard mode.
+        seed: int or None
+            The random seed, if one was given.
+        start_time: float or None
+            Time when the game started, in seconds since the epoch. Set to `None`
+            before `start()`.
+        guess_times: list or None
+            Time in seconds from the start of the game to each attempt. Set to `None`
+            before `start()`.
     """
 
     def __init__(
         self,
-        database: pd.DataFrame,
+        database: Union["pd.DataFrame", WordList],
         length: int,
         frequency_cutoff: Optional[float] = None,
         max_attempts: int = 6,
-        rng: Union[int, np.random.Generator] = 0,
+        rng: Optional[Union[int, np.random.Generator]] = 0,
+        hard_mode: Optional[str] = None,
+        game_log: Optional[GameLog] = None,
     ):
+        if hard_mode is not None:
+            # fail early for unknown modes
+            HardModeConstraints(length, hard_mode)
+
         self.length = length
         self.frequency_cutoff = frequency_cutoff
         self.max_attempts = max_attempts
+        self.hard_mode = hard_mode
+        self.constraints = None
 
         self.attempts = None
-        self.state = None
+        self.letter_states = None
         self.target = None
+        self.n_targets = None
         self.rng = np.random.default_rng(rng)
-
+        self.seed = int(rng) if isinstance(rng, (int, np.integer)) else None
+        self.game_log = game_log
+        self.start_time = None
+        self.guess_times = None
+
+        self._database = None
+        self._word_index = None
+        self._candidate_masks = None
         self.database = self._clean_db(database)
+        self._candidates = None
+        self._letter_stats = None
+        self._guesses = None
+        self._feedback = None
 
         self._target_counts = None
 
+    @classmethod
+    def from_words(
+        cls,
+        words: Sequence[str],
+        length: int,
+        freq: Optional[Sequence[float]] = None,
+        **kwargs,
+    ) -> "ClonleBackend":
+        """Create a backend from a plain list of words, without using Pandas.
+
+        :param words: list of words; only lowercase words of the right length are used
+        :param length: word length
+        :param freq: frequency of each word; by default all words are equally likely
+        :param kwargs: additional arguments are passed to the constructor
+        """
+        if freq is None:
+            freq = np.ones(len(words))
+        freq = np.asarray(freq, dtype=float)
+
+        keep = [
+            i
+            for i, word in enumerate(words)
+            if len(word) == length
+            and word.isascii()
+            and word.isalpha()
+            and word.islower()
+        ]
+        freq = freq[keep]
+        order = np.argsort(-freq, kind="stable")
+        clean_words = [words[keep[i]] for i in order]
+        database = WordList.from_words(clean_words, freq[order])
+
+        return cls(database, length, **kwargs)
+
+    @classmethod
+    def from_source(
+        cls,
+        source: str,
+        length: int,
+        frequency_cutoff: Optional[float] = None,
+        registry: Optional[DictionaryRegistry] = None,
+        **kwargs,
+    ) -> "ClonleBackend":
+        """Create a backend that shares its word list with other backends.
+
+        The cleaned word list is taken from a `registry.DictionaryRegistry`, so it is
+        only built the first time it is needed.
+
+        :param source: path to a compiled dictionary or to a CSV word database
+        :param length: word length
+        :param frequency_cutoff: see the constructor
+        :param registry: registry to use; by default, the process-wide one
+        :param kwargs: additional arguments are passed to the constructor
+        """
+        if registry is None:
+            registry = default_registry
+        database = registry.get(source, length, frequency_cutoff)
+
+        # the registry already applied the cutoff
+        backend = cls(database, length, **kwargs)
+        backend.frequency_cutoff = frequency_cutoff
+        return backend
+
+    @property
+    def database(self) -> WordList:
+        """The cleaned word database, sorted by decreasing frequency.
+
+        This used to be a Pandas dataframe; use `database.to_dataframe()` for code
+        that needs one. A dataframe with a "word" column and a "freq" or "count"
+        column can still be assigned, and is converted to a `WordList`.
+        """
+        return self._database
+
+    @database.setter
+    def database(self, database: Union["pd.DataFrame", WordList]):
+        if not isinstance(database, WordList):
+            database = dataframe_to_word_list(database, self.length)
+        # keep a hashed index of the words so that validating an attempt is O(1)
+        self._word_index = database.index
+        self._candidate_masks = None
+        self._database = database
+
+    @property
+    def word_matrix(self) -> np.ndarray:
+        """The words in the database, encoded as a `uint8` matrix (see
+        `scoring.encode_words`)."""
+        return self.database.matrix
+
+    def pattern_table(
+        self,
+        target_frequency_cutoff: Optional[float] = None,
+        target_n_cutoff: Optional[int] = None,
+        cache_dir: str = "save",
+    ) -> np.ndarray:
+        """Return the feedback-pattern table for this dictionary.
+
+        The table contains the feedback code (see `scoring.score`) for every word in
+        the database used as a guess (rows) and every possible target (columns). The
+        target cutoffs have the same meaning as for `start()`. The table is cached in
+        `cache_dir` and memory-mapped.
+
+        :param target_frequency_cutoff: lowest frequency for target words
+        :param target_n_cutoff: the number of top-frequency target words
+        :param cache_dir: folder where to cache the table
+        """
+        words = self.database.words
+        n_targets = self._n_targets(target_frequency_cutoff, target_n_cutoff)
+        return load_pattern_table(words, words[:n_targets], cache_dir=cache_dir)
+
+    @property
+    def state(self) -> Optional[dict]:
+        """The information state, as a dictionary mapping each letter to a
+        `ClonleState`."""
+        if self.letter_states is None:
+            return None
+        values = self.letter_states.tolist()
+        return {ch: _STATE_BY_VALUE[v] for ch, v in zip(ascii_lowercase, values)}
+
+    @property
+    def history(self) -> Optional[list]:
+        """List of `(word, feedback)` pairs for all the attempts made so far."""
+        if self.attempts is None:
+            return None
+        if self.attempts == 0:
+            return []
+        words = decode_words(self._guesses[: self.attempts])
+        data = _SYMBOLS[self._feedback[: self.attempts]].tobytes().decode("ascii")
+        n = self.length
+        return [(word, data[i * n : (i + 1) * n]) for i, word in enumerate(words)]
+
+    @property
+    def candidates(self) -> CandidateSet:
+        """The words in the database that are consistent with all the feedback so far.
+
+        The candidate set is created on first access and afterwards updated
+        incrementally by `attempt()`.
+        """
+        if self.history is None:
+            raise NotInitializedError("candidates accessed before start()")
+
+        if self._candidates is None:
+            self._candidates = CandidateSet(self.database, self._get_candidate_masks())
+            for word, res in self.history:
+                self._candidates.update(word, res)
+
+        return self._candidates
+
+    @property
+    def letter_stats(self) -> LetterStats:
+        """Letter and position statistics of the words in `candidates`.
+
+        The statistics are computed on first access and afterwards updated
+        incrementally by `attempt()`.
+        """
+        if self._letter_stats is None:
+            self._letter_stats = LetterStats.from_candidates(self.candidates)
+        return self._letter_stats
+
+    def valid_guesses(self) -> np.ndarray:
+        """Find the words in the database that are allowed as the next guess.
+
+        Outside hard mode, all words are allowed.
+
+        :return: boolean array with one element for each word in the database
+        """
+        if self.attempts is None:
+            raise NotInitializedError("valid_guesses() called before start()")
+        if self.constraints is None:
+            return np.ones(len(self.database), dtype=bool)
+        return self.constraints.mask(self._get_candidate_masks())
+
     def get_state(self) -> dict:
         """Return the current information state.
 
         :return: a dictionary in which each letter is mapped to one of the `ClonleState`
             options
         """
-        if self.state is None:
+        if self.letter_states is None:
             raise NotInitializedError("get_state() called before start()")
 
         return self.state
 
+    @timed("backend.start")
     def start(
         self,
         target_frequency_cutoff: Optional[float] = None,
         target_n_cutoff: Optional[int] = None,
+        target: Optional[str] = None,
+        weighted: bool = False,
     ):
         """Start a new game.
 
@@ -92,24 +351,156 @@ class ClonleBackend:
         :param target_frequency_cutoff: lowest frequency for target word
         :param target_n_cutoff: the number of top-frequency words from which to choose
             target
+        :param target: if provided, use this as the target instead of choosing one at
+            random; it must be in the database
+        :param weighted: if true, the target is chosen with probability proportional to
+            its frequency; otherwise all possible targets are equally likely
         """
-        self.attempts = 0
-        self._reset_state()
-        self.target = self._select_target(
-            cutoff=target_frequency_cutoff, n_cutoff=target_n_cutoff
-        )
+        if target is not None and target not in self._word_index:
+            raise ValueError("target word not in dictionary.")
+
+        self._reset_game()
+        self.n_targets = self._n_targets(target_frequency_cutoff, target_n_cutoff)
+        if target is None:
+            target = self._select_target(self.n_targets, weighted=weighted)
+        self.target = target
         self._setup_target_counts()
 
+    @timed("backend.attempt")
     def attempt(self, word: str) -> str:
         """Attempt a word.
 
-        The function increases `self.attempts` and updates `self.state`.
+        The function increases `self.attempts` and updates `self.letter_states`.
 
         :param word: word to test; should be length `self.length`.
         :return: information about the word, as a string in which a space indicates no
             match; '.' indicates a letter contained in the target but not at that
             position; and 'x' indicates a letter at the correct position.
         """
+        self._check_attempt(word)
+
+        res = self._score(word)
+        self._update_state(word, res)
+        self._record(word, res)
+        if self._candidates is not None:
+            self._candidates.update(word, res)
+            if self._letter_stats is not None:
+                self._letter_stats.update_from_candidates(self._candidates)
+        if self.constraints is not None:
+            self.constraints.update(word, res)
+
+        self.attempts += 1
+        self.guess_times.append(time.time() - self.start_time)
+        if self.game_log is not None:
+            if res == self.length * "x" or self.attempts >= self.max_attempts:
+                self.game_log.record_game(self)
+        return res
+
+    def snapshot(self) -> bytes:
+        """Save the game in a compact binary form.
+
+        The snapshot contains the word length, the number of attempts allowed and
+        made, the target pool size, the target, and the guesses, taking
+        `16 + (1 + attempts) * length` bytes. It does not contain the dictionary or the
+        random number generator.
+
+        :return: snapshot that can be passed to `restore()`
+        """
+        if self.attempts is None:
+            raise NotInitializedError("snapshot() called before start()")
+
+        targets = self._snapshot_targets()
+        guesses = [word for word, _ in self.history]
+        header = _SNAPSHOT_HEADER.pack(
+            _SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            self.length,
+            self.max_attempts,
+            len(guesses),
+            len(targets),
+            self.n_targets,
+        )
+        words = encode_words(targets + guesses, self.length)
+        return header + words.tobytes()
+
+    def restore(self, data: bytes):
+        """Restore a game saved with `snapshot()`.
+
+        The game is replayed from the start, so the database must contain the target
+        and all the guesses. This replaces any game in progress.
+
+        :param data: the snapshot
+        """
+        header_size = _SNAPSHOT_HEADER.size
+        if len(data) < header_size:
+            raise ValueError("snapshot too short.")
+        header = _SNAPSHOT_HEADER.unpack_from(data)
+        magic, version, length, max_attempts, attempts, n_stored, n_targets = header
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("not a Clonle snapshot.")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}.")
+        if length != self.length:
+            raise ValueError(f"snapshot has length {length}, should be {self.length}.")
+        if len(data) != header_size + (n_stored + attempts) * length:
+            raise ValueError("snapshot has the wrong size.")
+
+        matrix = np.frombuffer(data, dtype=np.uint8, offset=header_size)
+        if np.any(matrix >= 26):
+            raise ValueError("snapshot contains invalid letters.")
+        words = decode_words(matrix.reshape(-1, length)) if len(matrix) > 0 else []
+
+        self.max_attempts = max_attempts
+        # the game was already logged if it was finished
+        game_log, self.game_log = self.game_log, None
+        try:
+            self._start_from_snapshot(n_targets, words[:n_stored])
+            for word in words[n_stored:]:
+                self.attempt(word)
+        finally:
+            self.game_log = game_log
+
+    def _snapshot_targets(self) -> list:
+        """The targets to store in a snapshot."""
+        return [self.target]
+
+    def _start_from_snapshot(self, n_targets: int, targets: list):
+        """Start a game with the pool size and targets stored in a snapshot."""
+        if len(targets) != 1:
+            raise ValueError("snapshot should contain exactly one target.")
+        self.start(target_n_cutoff=n_targets, target=targets[0])
+
+    def _reset_game(self):
+        """Reset the attempts, history, and letter states."""
+        self.attempts = 0
+        self.start_time = time.time()
+        self.guess_times = []
+        self._candidates = None
+        self._letter_stats = None
+        self._guesses = np.zeros((self.max_attempts, self.length), dtype=np.uint8)
+        self._feedback = np.zeros((self.max_attempts, self.length), dtype=np.uint8)
+        self.letter_states = np.full(
+            len(ascii_lowercase), ClonleState.UNKNOWN.value, dtype=np.int8
+        )
+        if self.hard_mode is not None:
+            self.constraints = HardModeConstraints(self.length, self.hard_mode)
+
+    def _record(self, word: str, res: str):
+        """Store an attempt and its feedback in the history buffers."""
+        k = self.attempts
+        if k >= len(self._guesses):
+            # `max_attempts` was increased after `start()`
+            extra = np.zeros((k + 1 - len(self._guesses), self.length), np.uint8)
+            self._guesses = np.concatenate([self._guesses, extra])
+            self._feedback = np.concatenate([self._feedback, extra])
+
+        letters = np.frombuffer(word.encode("ascii"), dtype=np.uint8)
+        self._guesses[k] = letters - np.uint8(ord("a"))
+        self._feedback[k] = _DIGITS[np.frombuffer(res.encode("ascii"), np.uint8)]
+
+    @timed("backend.attempt.validate")
+    def _check_attempt(self, word: str):
+        """Raise an exception if an attempt is not valid."""
         if len(word) != self.length:
             raise ValueError(
                 f"attempt word has length {len(word)}, should be {self.length}."
@@ -118,77 +509,83 @@ class ClonleBackend:
             raise ValueError("attempt word contains non-letters.")
         if self.attempts >= self.max_attempts:
             raise GameOverError("maximum attempts made.")
-        if word not in self.database["word"].values:
+        if word not in self._word_index:
             raise ValueError("attempt word not in dictionary.")
-
-        res = np.array(self.length * [" "])
-        word = np.array(list(word))
-        target = np.array(list(self.target))
-        for ch, count in self._target_counts.items():
-            # first assign `ch` to exact matches
-            mask = (word == ch) & (target == ch)
-            res[mask] = "x"
-            n_exact = mask.sum()
-            count -= n_exact
-
+        if self.constraints is not None:
+            self.constraints.check(word)
+
+    def _get_candidate_masks(self) -> CandidateMasks:
+        if self._candidate_masks is None:
+            self._candidate_masks = CandidateMasks(self.database.matrix)
+        return self._candidate_masks
+
+    @timed("backend.attempt.score")
+    def _score(self, word: str) -> str:
+        """Calculate the feedback string for a valid attempt."""
+        return feedback_to_str(score_word(word, self.target), self.length)
+
+    @timed("backend.attempt.update_state")
+    def _update_state(self, word: str, res: str):
+        """Update `self.letter_states` given an attempted word and its feedback
+        string."""
+        found = set()
+        n_exact = {}
+        for ch, symbol in zip(word, res):
+            if symbol != " ":
+                found.add(ch)
+            if symbol == "x":
+                n_exact[ch] = n_exact.get(ch, 0) + 1
+
+        states = self.letter_states
+        for ch in set(word):
+            i = ord(ch) - ord("a")
+            count = self._target_counts.get(ch, 0)
             if count == 0:
+                states[i] = _MISSING
+            elif n_exact.get(ch, 0) == count:
                 # we found all of them
-                self.state[ch] = ClonleState.LOCATED
-            else:
-                if n_exact > 0 and self.state[ch] != ClonleState.LOCATED:
-                    # we found some, some missing/misplaced
-                    self.state[ch] = ClonleState.CONTAINED
+                states[i] = _LOCATED
+            elif ch in found and states[i] != _LOCATED:
+                # we found some, some missing/misplaced
+                states[i] = _CONTAINED
 
-                # find remaining occurrences of `ch` in `word` (if any)
-                idxs = ((word == ch) & (target != ch)).nonzero()[0][:count]
-
-                if len(idxs) > 0:
-                    if self.state[ch] != ClonleState.LOCATED:
-                        self.state[ch] = ClonleState.CONTAINED
-                    res[idxs] = "."
-
-        for ch in set(word):
-            if ch not in self._target_counts:
-                self.state[ch] = ClonleState.MISSING
-
-        self.attempts += 1
-        return "".join(res)
-
-    def _reset_state(self):
-        self.state = {}
-        for ch in ascii_lowercase:
-            self.state[ch] = ClonleState.UNKNOWN
-
-    def _clean_db(self, database: pd.DataFrame) -> pd.DataFrame:
+    @timed("backend.clean_db")
+    def _clean_db(self, database: Union["pd.DataFrame", WordList]) -> WordList:
         """Return a cleaned database, with the proper number of letters and after
         removing extremely rare words."""
-        clean_db = database.copy()
-
-        if "freq" not in clean_db.columns:
-            clean_db["freq"] = clean_db["count"] / clean_db["count"].sum()
-
-        mask = clean_db["word"].str.len() == self.length
+        if isinstance(database, WordList):
+            if database.length != self.length:
+                raise ValueError(
+                    f"word list has length {database.length}, should be {self.length}."
+                )
+            if self.frequency_cutoff:
+                # the word list is sorted, so this keeps a prefix without copying
+                return database.head(database.sampler.count(self.frequency_cutoff))
+            else:
+                return database
 
-        if self.frequency_cutoff:
-            mask = mask & (clean_db["freq"] >= self.frequency_cutoff)
+        return dataframe_to_word_list(database, self.length, self.frequency_cutoff)
 
-        return clean_db[mask].sort_values("freq", ascending=False)
+    def _n_targets(self, cutoff: Optional[float], n_cutoff: Optional[int]) -> int:
+        """Find the number of possible target words.
 
-    def _select_target(self, cutoff: Optional[float], n_cutoff: Optional[int]) -> str:
-        """Select a target word.
+        Since the database is sorted by frequency, the targets are always the first
+        words in the database.
 
         :param cutoff: lowest-frequency word to consider
         :param n_cutoff: number of top-frequency words to consider
         """
-        if cutoff:
-            mask = self.database["freq"] >= cutoff
-            words = self.database["word"][mask]
-        else:
-            words = self.database["word"]
+        return self.database.sampler.count(cutoff, n_cutoff)
+
+    @timed("backend.select_target")
+    def _select_target(self, n: int, weighted: bool = False) -> str:
+        """Select a target word.
 
-        if n_cutoff:
-            words = words[:n_cutoff]
-        return words.sample(random_state=self.rng).iloc[0]
+        :param n: number of top-frequency words to choose from
+        :param weighted: whether to choose words in proportion to their frequency
+        """
+        idx = self.database.sampler.sample(self.rng, n, weighted=weighted)
+        return self.database.word(idx)
 
     def _setup_target_counts(self):
         """Creates a `dict` member that lists the letters in `self.target` and their
@@ -226,3 +623,16 @@ class ClonleBackend:
             f"target={self.target}"
             f")"
         )
+
+
+def snapshot_length(data: bytes) -> int:
+    """Find the word length of a game saved with `ClonleBackend.snapshot()`, e.g., to
+    create a backend that can restore it."""
+    if len(data) < _SNAPSHOT_HEADER.size:
+        raise ValueError("snapshot too short.")
+    magic, version, length = _SNAPSHOT_HEADER.unpack_from(data)[:3]
+    if magic != _SNAPSHOT_MAGIC:
+        raise ValueError("not a Clonle snapshot.")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}.")
+    return length
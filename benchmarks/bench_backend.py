@@ -0,0 +1,296 @@
+#! /usr/bin/env python
+""" Performance benchmarks for the back end, run with pytest-benchmark.
+
+Run the suite with
+
+    python -m pytest benchmarks/bench_backend.py
+
+Timings can be saved as a baseline and later runs compared against it, failing if they
+regress beyond a threshold:
+
+    python -m pytest benchmarks/bench_backend.py --benchmark-save=baseline
+    python -m pytest benchmarks/bench_backend.py --benchmark-compare \
+        --benchmark-compare-fail=mean:10%
+
+The memory used per game is checked against `baselines/memory.json`, which is
+regenerated by running this file as a script.
+"""
+
+import argparse
+import functools
+import gc
+import itertools
+import json
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+if __name__ != "__main__":
+    pytest.importorskip("pytest_benchmark")
+
+base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, base_path)
+
+from backend import ClonleBackend  # noqa: E402
+from dictionary import (  # noqa: E402
+    WordList,
+    compile_dictionary,
+    dataframe_to_word_list,
+    load_compiled,
+)
+from scoring import decode_words  # noqa: E402
+from solver import METRICS, EntropySolver  # noqa: E402
+
+LENGTHS = list(range(3, 16))
+SOURCES = ["synthetic", "csw"]
+
+# number of words in the synthetic dictionaries, similar to the larger CSW lengths
+N_SYNTHETIC = 40_000
+N_TARGETS = 3000
+
+MEMORY_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "memory.json")
+# fail if the memory used per game grows by more than this fraction of the baseline
+MEMORY_THRESHOLD = 0.2
+# number of games kept alive at once when measuring memory
+N_MEMORY_GAMES = 100
+
+# a solver hint for the second guess, with the full list of 5-letter words as guesses,
+# should take less than this many seconds
+HINT_BUDGET = 0.05
+
+
+def zipf_freq(n: int) -> np.ndarray:
+    """Decreasing, Zipf-like frequencies for `n` words."""
+    freq = 1.0 / np.arange(1, n + 1)
+    return freq / freq.sum()
+
+
+@functools.lru_cache(maxsize=None)
+def synthetic_word_list(length: int) -> WordList:
+    """Random words of the given length, with Zipf-distributed frequencies."""
+    rng = np.random.default_rng(length)
+    matrix = rng.integers(0, 26, size=(N_SYNTHETIC, length), dtype=np.uint8)
+    matrix = np.unique(matrix, axis=0)
+    matrix = matrix[rng.permutation(len(matrix))]
+    return WordList(matrix, zipf_freq(len(matrix)))
+
+
+@functools.lru_cache(maxsize=None)
+def csw_words() -> dict:
+    """The words from the Collins Scrabble Words list, grouped by length."""
+    with open(os.path.join(base_path, "data", "csw_2019.txt"), "rt") as f:
+        lines = f.read().split("\n")[2:]
+
+    words = {}
+    for line in lines:
+        word = line.strip().lower()
+        if word:
+            words.setdefault(len(word), []).append(word)
+    return words
+
+
+@functools.lru_cache(maxsize=None)
+def csw_word_list(length: int) -> WordList:
+    """CSW words of the given length.
+
+    The word list has no frequency data, so words are ranked in a random (but fixed)
+    order and given Zipf-distributed frequencies.
+    """
+    words = csw_words()[length]
+    order = np.random.default_rng(length).permutation(len(words))
+    return WordList.from_words([words[_] for _ in order], zipf_freq(len(words)))
+
+
+def get_word_list(source: str, length: int) -> WordList:
+    if source == "synthetic":
+        return synthetic_word_list(length)
+    else:
+        return csw_word_list(length)
+
+
+def guesses_for(word_list: WordList, target: str, n: int = 50) -> list:
+    """A fixed selection of valid guesses that excludes the target."""
+    rng = np.random.default_rng(0)
+    idxs = rng.choice(len(word_list), size=min(n + 1, len(word_list)), replace=False)
+    return [_ for _ in decode_words(word_list.matrix[idxs]) if _ != target][:n]
+
+
+def play_game(clonle: ClonleBackend, guesses: list):
+    """Start a game and play the given guesses, up to the maximum attempts."""
+    clonle.start(target_n_cutoff=N_TARGETS)
+    for word in guesses[: clonle.max_attempts]:
+        res = clonle.attempt(word)
+        if res == clonle.length * "x":
+            break
+
+
+def game_memory(word_list: WordList, n_games: int = N_MEMORY_GAMES) -> int:
+    """Average number of bytes held by a finished game that shares its word list with
+    other games."""
+    guesses = guesses_for(word_list, target="", n=6)
+    # play once so that the data shared between games, like the word index, is built
+    play_game(ClonleBackend(word_list, word_list.length), guesses)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        games = []
+        for i in range(n_games):
+            clonle = ClonleBackend(word_list, word_list.length, rng=i)
+            play_game(clonle, guesses)
+            games.append(clonle)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return (after - before) // n_games
+
+
+def load_memory_baseline() -> dict:
+    if not os.path.exists(MEMORY_BASELINE):
+        return {}
+    with open(MEMORY_BASELINE, "rt") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def csw_source(tmp_path_factory) -> dict:
+    """The CSW words, with the same frequencies as `csw_word_list`, saved both as a
+    CSV word database and as a compiled dictionary."""
+    import pandas as pd
+
+    words = []
+    freqs = []
+    for length in LENGTHS:
+        word_list = csw_word_list(length)
+        words.extend(word_list.words)
+        freqs.append(word_list.freq)
+    database = pd.DataFrame({"word": words, "freq": np.concatenate(freqs)})
+
+    path = tmp_path_factory.mktemp("dictionary")
+    database.to_csv(path / "dictionary.csv", index=False)
+    compile_dictionary(database, str(path / "compiled"))
+    return {"csv": str(path / "dictionary.csv"), "compiled": str(path / "compiled")}
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("length", LENGTHS)
+def test_construct(benchmark, source, length):
+    word_list = get_word_list(source, length)
+
+    def fresh_word_list():
+        # a new view, so that the word index is rebuilt every round
+        return (WordList(word_list.matrix, word_list.freq), length), {}
+
+    benchmark.pedantic(ClonleBackend, setup=fresh_word_list, rounds=10)
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("length", LENGTHS)
+def test_start(benchmark, source, length):
+    clonle = ClonleBackend(get_word_list(source, length), length)
+    benchmark(clonle.start, target_n_cutoff=N_TARGETS)
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("length", LENGTHS)
+def test_attempt(benchmark, source, length):
+    word_list = get_word_list(source, length)
+    clonle = ClonleBackend(word_list, length, max_attempts=10**7)
+    clonle.start(target_n_cutoff=N_TARGETS)
+    guesses = itertools.cycle(guesses_for(word_list, clonle.target))
+
+    benchmark(lambda: clonle.attempt(next(guesses)))
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("length", LENGTHS)
+def test_game(benchmark, source, length):
+    word_list = get_word_list(source, length)
+    clonle = ClonleBackend(word_list, length)
+    guesses = guesses_for(word_list, target="")
+
+    benchmark(play_game, clonle, guesses)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+@pytest.mark.parametrize("length", LENGTHS)
+def test_load_compiled(benchmark, csw_source, length, mmap):
+    word_list = benchmark(load_compiled, csw_source["compiled"], length, mmap=mmap)
+    assert len(word_list) == len(csw_word_list(length))
+
+
+@pytest.mark.parametrize("length", [3, 5, 8, 15])
+def test_load_csv(benchmark, csw_source, length):
+    import pandas as pd
+
+    def load():
+        return dataframe_to_word_list(pd.read_csv(csw_source["csv"]), length)
+
+    word_list = benchmark.pedantic(load, rounds=3)
+    # Pandas parses some words, like "nan", as missing values
+    assert len(word_list) >= len(csw_word_list(length)) - 5
+
+
+@pytest.fixture(scope="module")
+def hint_cache_dir(tmp_path_factory) -> str:
+    """Where the solver benchmarks cache their pattern tables."""
+    return str(tmp_path_factory.mktemp("patterns"))
+
+
+@pytest.mark.parametrize("metric", list(METRICS))
+def test_solver_hint(benchmark, hint_cache_dir, metric):
+    clonle = ClonleBackend(csw_word_list(5), 5, rng=0)
+    clonle.start(target_n_cutoff=N_TARGETS)
+    solver = EntropySolver(clonle, metric=metric, cache_dir=hint_cache_dir)
+    clonle.attempt(solver.next_guess())
+
+    def forget_guesses():
+        # so that every round scores all the guesses again
+        solver._memo.clear()
+
+    benchmark.pedantic(solver.next_guess, setup=forget_guesses, rounds=20)
+    assert benchmark.stats.stats.median < HINT_BUDGET
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("length", LENGTHS)
+def test_memory_per_game(benchmark, source, length):
+    word_list = get_word_list(source, length)
+    n_bytes = benchmark.pedantic(game_memory, args=(word_list,), rounds=1)
+    benchmark.extra_info["bytes_per_game"] = n_bytes
+
+    baseline = load_memory_baseline().get(f"{source}_{length}")
+    if baseline is not None:
+        assert n_bytes <= (1 + MEMORY_THRESHOLD) * baseline
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(description="Clonle memory baseline")
+    parser.add_argument(
+        "--output", default=MEMORY_BASELINE, help="where to save the memory baseline"
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    baseline = {}
+    for source in SOURCES:
+        for length in LENGTHS:
+            n_bytes = game_memory(get_word_list(source, length))
+            print(f"{source:>10s} {length:2d}: {n_bytes:8d} bytes per game")
+            baseline[f"{source}_{length}"] = n_bytes
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "wt") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+    print(f"Memory baseline saved to {args.output}.")
@@ -0,0 +1,118 @@
+#! /usr/bin/env python
+""" Generate load on a Clonle server and measure its throughput and latency. """
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, base_path)
+
+from dictionary import load_compiled  # noqa: E402
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(description="Clonle server load generator")
+    parser.add_argument(
+        "n_letters", nargs="?", default=5, type=int, help="number of letters per word"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", default=8765, type=int, help="server port")
+    parser.add_argument(
+        "--connections", default=100, type=int, help="number of concurrent connections"
+    )
+    parser.add_argument(
+        "--sessions",
+        default=10_000,
+        type=int,
+        help="total number of games to play, spread over the connections",
+    )
+    parser.add_argument(
+        "--dictionary",
+        default=os.path.join(base_path, "data", "dictionary"),
+        help="compiled dictionary from which to draw guesses",
+    )
+    parser.add_argument(
+        "--n-guesses",
+        default=3000,
+        type=int,
+        help="guesses are drawn from this many top-frequency words",
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+async def run_connection(
+    host: str, port: int, n_sessions: int, words: list, seed: int
+) -> list:
+    """Play `n_sessions` games, one after another, over a single connection.
+
+    Each game makes random guesses until it is over.
+
+    :return: list of request latencies, in seconds
+    """
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+
+    latencies = []
+
+    async def request(**kwargs) -> dict:
+        t0 = time.perf_counter()
+        writer.write(json.dumps(kwargs).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - t0)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response
+
+    for _ in range(n_sessions):
+        session = (await request(cmd="new"))["session"]
+        while True:
+            word = words[rng.integers(len(words))]
+            response = await request(cmd="guess", session=session, word=word)
+            if response["status"] != "playing":
+                break
+
+    writer.close()
+    return latencies
+
+
+async def main(args):
+    words = load_compiled(args.dictionary, args.n_letters).words[: args.n_guesses]
+
+    n_conn = min(args.connections, args.sessions)
+    per_conn = [
+        args.sessions // n_conn + (i < args.sessions % n_conn) for i in range(n_conn)
+    ]
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(
+        *[
+            run_connection(args.host, args.port, n, words, seed)
+            for seed, n in enumerate(per_conn)
+        ]
+    )
+    elapsed = time.perf_counter() - t0
+
+    latencies = 1000 * np.concatenate(results)
+    print(
+        f"Played {args.sessions} games over {n_conn} connections in {elapsed:.2f} s: "
+        f"{args.sessions / elapsed:.0f} sessions / s, "
+        f"{len(latencies) / elapsed:.0f} requests / s."
+    )
+    p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9])
+    print(
+        f"Latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms, p99.9 {p999:.2f} ms, "
+        f"max {latencies.max():.2f} ms."
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_command_line()))
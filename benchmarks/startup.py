@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+""" Measure the time it takes to launch a game. """
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+scenarios = {
+    "import": "import clonle",
+    "start": (
+        "from backend import ClonleBackend\n"
+        "from dictionary import load_compiled\n"
+        "clonle = ClonleBackend(load_compiled({path!r}, 5), 5)\n"
+        "clonle.start(target_n_cutoff=3000)\n"
+    ),
+}
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(description="Clonle startup-time benchmark")
+    parser.add_argument(
+        "--repeats", default=10, type=int, help="number of runs for each scenario"
+    )
+    parser.add_argument(
+        "--dictionary",
+        default=os.path.join(base_path, "data", "dictionary"),
+        help="compiled dictionary to use for the 'start' scenario",
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        help="fail if the median time of any scenario exceeds this many milliseconds",
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+def time_scenario(code: str, repeats: int) -> list:
+    """Run `code` in a fresh interpreter `repeats` times and return the wall-clock
+    durations in milliseconds."""
+    durations = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=base_path, check=True)
+        durations.append(1000 * (time.perf_counter() - t0))
+
+    return durations
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    # measure the bare interpreter startup as a reference
+    all_code = {"python": "pass"}
+    all_code.update(scenarios)
+    if not os.path.exists(os.path.join(args.dictionary, "meta.json")):
+        print(f"No compiled dictionary at {args.dictionary}; skipping 'start'.")
+        del all_code["start"]
+
+    failed = False
+    for name, code in all_code.items():
+        durations = sorted(
+            time_scenario(code.format(path=args.dictionary), args.repeats)
+        )
+        median = durations[len(durations) // 2]
+        print(f"{name:>8s}: median {median:6.1f} ms, min {durations[0]:6.1f} ms")
+
+        if args.max_ms is not None and name != "python" and median > args.max_ms:
+            failed = True
+
+    if failed:
+        print(f"Startup time exceeds {args.max_ms} ms.")
+        sys.exit(1)
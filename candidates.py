@@ -0,0 +1,126 @@
+""" Track the words that are consistent with the feedback received so far. """
+
+import numpy as np
+
+from typing import Union
+
+from dictionary import WordList
+from scoring import LOCATED, MISS, encode_words, str_to_feedback
+
+ALPHABET_SIZE = 26
+
+
+class CandidateMasks:
+    """Packed bitsets over the words of a word matrix, used to filter candidates.
+
+    Each bitset is a `uint8` array with one bit per word, as returned by
+    `numpy.packbits`.
+
+    :param matrix: encoded words, shape `(n_words, length)`
+
+    Attributes:
+        all: bitset with all words set
+        located: array of shape `(length, 26, n_bytes)`; `located[i, c]` marks the
+            words that have letter `c` at position `i`
+        not_located: complement of `located`
+        at_least: array of shape `(26, length + 2, n_bytes)`; `at_least[c, k]` marks
+            the words that contain letter `c` at least `k` times
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        n, length = matrix.shape
+        self.n_words = n
+        self.length = length
+
+        letters = np.arange(ALPHABET_SIZE, dtype=np.uint8)[:, None]
+        counts = np.zeros((ALPHABET_SIZE, n), dtype=np.uint8)
+        located = []
+        for i in range(length):
+            crt_located = matrix[:, i] == letters
+            counts += crt_located
+            located.append(np.packbits(crt_located, axis=1))
+        self.located = np.stack(located)
+        self.not_located = ~self.located
+
+        at_least = [counts >= k for k in range(length + 2)]
+        self.at_least = np.packbits(np.stack(at_least, axis=1), axis=2)
+
+        self.all = np.packbits(np.ones(n, dtype=bool))
+
+
+class CandidateSet:
+    """The set of words consistent with a sequence of guesses and their feedback.
+
+    The set is stored as a packed bitset that is updated in place by `update()`.
+
+    :param word_list: the words to choose from
+    :param masks: precomputed masks for `word_list`; built if not provided
+    """
+
+    def __init__(self, word_list: WordList, masks: CandidateMasks = None):
+        self.word_list = word_list
+        self.masks = masks if masks is not None else CandidateMasks(word_list.matrix)
+        self.bits = self.masks.all.copy()
+
+    def update(self, guess: Union[str, np.ndarray], feedback: Union[str, int]):
+        """Keep only the words that would yield the given feedback for the given guess.
+
+        :param guess: guessed word, either as a string or encoded (see
+            `scoring.encode_words`)
+        :param feedback: feedback, either as a string or as a code (see
+            `scoring.score`)
+        """
+        if isinstance(guess, str):
+            guess = encode_words([guess])[0]
+        if isinstance(feedback, str):
+            feedback = str_to_feedback(feedback)
+
+        masks = self.masks
+        bits = self.bits
+        n_found = {}
+        missed = set()
+        for i, letter in enumerate(guess.tolist()):
+            feedback, digit = divmod(feedback, 3)
+            if digit == LOCATED:
+                bits &= masks.located[i, letter]
+            else:
+                bits &= masks.not_located[i, letter]
+
+            if digit == MISS:
+                missed.add(letter)
+                n_found.setdefault(letter, 0)
+            else:
+                n_found[letter] = n_found.get(letter, 0) + 1
+
+        for letter, count in n_found.items():
+            bits &= masks.at_least[letter, count]
+            if letter in missed:
+                # a miss means the target contains no more copies of the letter
+                bits &= ~masks.at_least[letter, count + 1]
+
+    @property
+    def count(self) -> int:
+        """Number of remaining candidates."""
+        return int(np.count_nonzero(np.unpackbits(self.bits)))
+
+    def indices(self) -> np.ndarray:
+        """Positions of the remaining candidates in the word list."""
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.masks.n_words))
+
+    @property
+    def words(self) -> list:
+        """The remaining candidates, in order of decreasing frequency."""
+        all_words = self.word_list.words
+        return [all_words[_] for _ in self.indices()]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, word: str) -> bool:
+        idx = self.word_list.index.get(word)
+        if idx is None:
+            return False
+        return bool(self.bits[idx // 8] & (0x80 >> (idx % 8)))
+
+    def __repr__(self) -> str:
+        return f"CandidateSet(count={self.count}, n_words={self.masks.n_words})"
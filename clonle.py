@@ -1,15 +1,31 @@
 #! /usr/bin/env python
 
 import argparse
+import atexit
 import os
 import readline
+import struct
 
-import pandas as pd
-import numpy as np
-
-from backend import ClonleBackend, ClonleState, GameOverError
+from adversarial import AdversarialBackend
+from backend import ClonleBackend, ClonleState, GameOverError, snapshot_length
+from gamelog import GameLog
+from multiboard import MultiBoardBackend
+from schedule import Schedule
+from store import WordStore
+from instrumentation import stats
 from colorama import Style, Fore, Back
 from datetime import datetime
+from typing import Optional
+
+# maximum number of words offered when completing with the tab key
+MAX_COMPLETIONS = 100
+
+# word lengths used in random-length mode (the range allowed by Collins Scrabble Words)
+RANDOM_LENGTHS = range(3, 16)
+
+# session files start with the period in which the game was started (see
+# `game_period()`), or -1 for games with a new word on every run
+_SESSION_HEADER = struct.Struct("<q")
 
 
 def parse_command_line():
@@ -18,7 +34,15 @@ def parse_command_line():
         "n_letters", nargs="?", default=5, type=int, help="number of letters per word"
     )
     parser.add_argument(
-        "--max-attempts", default=6, type=int, help="maximum number of attempts"
+        "--random-length",
+        action="store_true",
+        help="choose the number of letters at random, between 3 and 15 (ignores "
+        "n_letters); daily and hourly words have the same length for everyone",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        help="maximum number of attempts (default: 6, or 5 more than the boards)",
     )
     parser.add_argument(
         "--frequency",
@@ -26,8 +50,47 @@ def parse_command_line():
         choices=["daily", "hourly", "always"],
         help="how often to get a new word: daily, hourly, or always (for every run)",
     )
+    parser.add_argument(
+        "--adversarial",
+        action="store_true",
+        help="don't fix the word ahead of time, but keep dodging guesses (Absurdle)",
+    )
+    parser.add_argument(
+        "--hard",
+        nargs="?",
+        const="standard",
+        choices=["standard", "strict"],
+        help="hard mode: found letters must be used in later guesses; in strict mode, "
+        "guesses must also avoid letters and positions that were ruled out",
+    )
+    parser.add_argument(
+        "--boards",
+        default=1,
+        type=int,
+        help="number of words to find at the same time (e.g., 4 for Quordle)",
+    )
+    parser.add_argument(
+        "--log",
+        nargs="?",
+        const=os.path.join("save", "games.jsonl"),
+        help="append every finished game to a log, which can be analyzed with "
+        "gamelog.py (default file: save/games.jsonl)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=os.path.join("save", "profile.json"),
+        help="time the game's internals and save the statistics as JSON on exit "
+        "(default file: save/profile.json)",
+    )
 
     args = parser.parse_args()
+    if args.adversarial and args.boards > 1:
+        parser.error("--adversarial cannot be used with more than one board")
+    if args.hard and args.boards > 1:
+        parser.error("--hard cannot be used with more than one board")
+    if args.max_attempts is None:
+        args.max_attempts = 6 if args.boards == 1 else args.boards + 5
     return args
 
 
@@ -61,37 +124,308 @@ def display_history(history: list):
         display_word(*item)
 
 
-def create_clonle(frequency: str) -> ClonleBackend:
-    database_name = os.path.join("data", "dictionary.csv")
-    database = pd.read_csv(database_name)
+def display_boards(history: list, n_boards: int, per_row: int = 4):
+    """Show the history of a multi-board game, with several boards side by side.
+
+    Boards that were already solved are left blank.
+    """
+    for first in range(0, n_boards, per_row):
+        boards = range(first, min(first + per_row, n_boards))
+        for word, res in history:
+            print("   ", end="")
+            for board in boards:
+                if res[board] is not None:
+                    for ch, score in zip(word, res[board]):
+                        print(color_mapping[score] + ch, end="")
+                else:
+                    print(Style.RESET_ALL + len(word) * " ", end="")
+                print(Style.RESET_ALL + "   ", end="")
+            print(Style.RESET_ALL)
+        print()
+
+
+def play_boards(clonle: MultiBoardBackend, session_name: str, period: Optional[int]):
+    """Run a multi-board game, saving it to `session_name` after every attempt."""
+    while True:
+        n_solved = int(clonle.solved.sum())
+        print(
+            f"Attempt {clonle.attempts + 1} of {clonle.max_attempts}, "
+            f"{n_solved} / {clonle.n_boards} words found:"
+        )
+        print()
+        display_boards(clonle.history, clonle.n_boards)
+        s = input(">> ")
+
+        error = check_spelling(clonle, s)
+        if error is not None:
+            print(f"Invalid word: {error}")
+            continue
+        try:
+            clonle.attempt(s)
+        except ValueError as err:
+            print(f"Invalid word: {err}")
+            continue
+        save_session(clonle, session_name, period)
+
+        if clonle.solved.all():
+            print()
+            print(
+                f"Success! All words found in "
+                f"{clonle.attempts} / {clonle.max_attempts} attempts:"
+            )
+            print()
+            display_boards(clonle.history, clonle.n_boards)
+            end_session(session_name)
+            break
+
+        if clonle.attempts == clonle.max_attempts:
+            print("Unfortunately, maximum attempts reached and not all words found.")
+            missed = [t for t, ok in zip(clonle.targets, clonle.solved) if not ok]
+            print(f"The missing words were: {', '.join(missed)}.")
+            print()
+            end_session(session_name)
+            break
+
+
+def setup_completion(clonle: ClonleBackend):
+    """Complete words with the tab key.
+
+    Only words that are consistent with the letters found or ruled out so far are
+    offered.
+    """
+    index = clonle.database.prefix_index
+    matches = []
+
+    def completer(text: str, state: int) -> Optional[str]:
+        if state == 0:
+            matches[:] = index.complete(
+                text.lower(), clonle.letter_states, limit=MAX_COMPLETIONS
+            )
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer(completer)
+    readline.set_completer_delims(" \t\n")
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
+
+def check_spelling(clonle: ClonleBackend, word: str) -> Optional[str]:
+    """Point out where a word that is not in the dictionary goes wrong.
+
+    :return: an error message, or `None` if the word is in the dictionary or has the
+        wrong length
+    """
+    if len(word) != clonle.length:
+        return None
+    n = clonle.database.prefix_index.longest_prefix(word)
+    if n < len(word):
+        return f"no word starts with '{word[: n + 1]}'."
+    return None
+
+
+def get_session_name(args) -> str:
+    """Find the file used to save an unfinished game in the given mode."""
+    if args.adversarial:
+        mode = "adversarial"
+    elif args.boards > 1:
+        mode = f"boards{args.boards}"
+    else:
+        mode = "classic"
+    if args.hard:
+        mode += f"_hard_{args.hard}"
+    length = "random" if args.random_length else args.n_letters
+    return os.path.join("save", f"session_{length}_{mode}.bin")
+
+
+def save_session(clonle: ClonleBackend, session_name: str, period: Optional[int]):
+    """Save a snapshot of the game so that it can be resumed after a crash.
+
+    :param period: the period in which the game was started; see `game_period()`
+    """
+    os.makedirs(os.path.dirname(session_name), exist_ok=True)
+    tmp_name = session_name + ".tmp"
+    with open(tmp_name, "wb") as f:
+        f.write(_SESSION_HEADER.pack(-1 if period is None else period))
+        f.write(clonle.snapshot())
+    os.replace(tmp_name, session_name)
+
 
+def load_session(session_name: str, period: Optional[int]) -> Optional[bytes]:
+    """Read the snapshot of an unfinished game started in the given period.
+
+    A game saved in a different period (e.g., yesterday's daily word) can't be
+    resumed any more, so its file is removed.
+
+    :return: the snapshot, or `None` if there is no game to resume
+    """
+    if not os.path.exists(session_name):
+        return None
+
+    with open(session_name, "rb") as f:
+        data = f.read()
+    expected = -1 if period is None else period
+    if (
+        len(data) < _SESSION_HEADER.size
+        or _SESSION_HEADER.unpack_from(data)[0] != expected
+    ):
+        end_session(session_name)
+        return None
+
+    return data[_SESSION_HEADER.size :]
+
+
+def resume_session(
+    clonle: ClonleBackend, session_name: str, period: Optional[int]
+) -> bool:
+    """Restore an unfinished game started in the given period, if there is one.
+
+    :return: true if a game was restored
+    """
+    data = load_session(session_name, period)
+    if data is None:
+        return False
+
+    try:
+        clonle.restore(data)
+    except (ValueError, GameOverError):
+        end_session(session_name)
+        return False
+
+    return True
+
+
+def saved_length(session_name: str, period: Optional[int]) -> Optional[int]:
+    """Find the word length of the unfinished game saved in `session_name` in the
+    given period, if any."""
+    data = load_session(session_name, period)
+    if data is None:
+        return None
+    try:
+        return snapshot_length(data)
+    except ValueError:
+        return None
+
+
+def end_session(session_name: str):
+    if os.path.exists(session_name):
+        os.remove(session_name)
+
+
+def write_profile(path: str):
+    """Show the timing statistics and save them as JSON."""
+    print()
+    print(stats.report())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    stats.dump(path)
+    print(f"Timing statistics saved to {path}.")
+
+
+def scheduled_target(frequency: str, n_letters: int) -> Optional[str]:
+    """Look up today's (or this hour's) target in the precomputed schedule, if there
+    is one for this word length; see `schedule.py`."""
+    path = os.path.join("data", "schedule.bin")
+    if frequency == "always" or not os.path.exists(path):
+        return None
+    try:
+        return Schedule(path).target(n_letters, period=frequency)
+    except (OSError, ValueError):
+        # fall back to drawing the target from the dictionary
+        return None
+
+
+def game_period(frequency: str) -> Optional[int]:
+    """Find a key for the current day or hour, which also seeds the choice of target.
+
+    :param frequency: "daily", "hourly", or "always"
+    :return: the key, or `None` if there is a new word on every run
+    """
     if frequency == "always":
-        rng = np.random.default_rng()
+        return None
+
+    now = datetime.now()
+    period = 1000 * now.year + 50 * now.month + now.day
+    if frequency == "hourly":
+        period = 25 * period + now.hour
+    return period
+
+
+def create_clonle(seed: Optional[int]) -> ClonleBackend:
+    source = os.path.join("data", "dictionary")
+    if not os.path.exists(os.path.join(source, "meta.json")):
+        source = os.path.join("data", "dictionary.csv")
+
+    kwargs = {"max_attempts": args.max_attempts, "rng": seed}
+    if args.hard:
+        kwargs["hard_mode"] = args.hard
+    if args.log:
+        kwargs["game_log"] = GameLog(args.log)
+    if args.adversarial:
+        backend_class = AdversarialBackend
+    elif args.boards > 1:
+        backend_class = MultiBoardBackend
+        kwargs["n_boards"] = args.boards
     else:
-        now = datetime.now()
-        seed = 1000 * now.year + 50 * now.month + now.day
-        if frequency == "hourly":
-            seed = 25 * seed + now.hour
-        rng = np.random.default_rng(seed)
-
-    clonle = ClonleBackend(
-        database, args.n_letters, max_attempts=args.max_attempts, rng=rng
-    )
+        backend_class = ClonleBackend
+
+    if args.random_length:
+        store = WordStore.load(source, lengths=RANDOM_LENGTHS)
+        # keep the length of an unfinished game so that it can be resumed
+        length = saved_length(get_session_name(args), seed)
+        if length not in store:
+            length = store.random_length(seed)
+        args.n_letters = length
+        return store.create_backend(length, backend_class, **kwargs)
+
+    clonle = backend_class.from_source(source, args.n_letters, **kwargs)
     return clonle
 
 
 if __name__ == "__main__":
     args = parse_command_line()
-    print(f"Playing Clonle with {args.n_letters}-letter words.")
-    print()
+    if args.profile:
+        stats.enable()
+        atexit.register(write_profile, args.profile)
+
+    if not args.random_length:
+        print(f"Playing Clonle with {args.n_letters}-letter words.")
+        print()
+
+    # fixed at startup, so that a game played across midnight is saved as the one it
+    # started as
+    period = game_period(args.frequency)
 
     print("Loading word database...", end="")
-    clonle = create_clonle(args.frequency)
+    clonle = create_clonle(period)
     print(f" done. {len(clonle.database)} words in dictionary.")
+    if args.random_length:
+        print()
+        print(f"Playing Clonle with {args.n_letters}-letter words.")
+
+    setup_completion(clonle)
 
-    print("Choosing a word...", end="")
-    clonle.start(target_n_cutoff=3000)
-    print(" done.")
+    session_name = get_session_name(args)
+    if resume_session(clonle, session_name, period):
+        print(f"Resuming unfinished game after {clonle.attempts} attempts.")
+    elif args.adversarial:
+        print("The word will keep changing to avoid your guesses. Good luck!")
+        clonle.start(target_n_cutoff=3000)
+    elif args.boards > 1:
+        print(f"Choosing {args.boards} words...", end="")
+        clonle.start(target_n_cutoff=3000)
+        print(" done.")
+    else:
+        print("Choosing a word...", end="")
+        # the dictionary is still needed to check the guesses, so the schedule only
+        # replaces the draw of the target
+        target = scheduled_target(args.frequency, args.n_letters)
+        try:
+            clonle.start(target_n_cutoff=3000, target=target)
+        except ValueError:
+            # the schedule was built from a different dictionary
+            clonle.start(target_n_cutoff=3000)
+        print(" done.")
 
     color_mapping = {
         ".": Style.RESET_ALL + Back.YELLOW + Fore.BLACK,
@@ -99,38 +433,45 @@ if __name__ == "__main__":
         " ": Style.RESET_ALL + Style.DIM,
     }
 
-    history = []
-
-    while True:
-        print(f"Attempt {clonle.attempts + 1} of {args.max_attempts}:")
+    if args.boards > 1:
+        play_boards(clonle, session_name, period)
+    else:
+        while True:
+            print(f"Attempt {clonle.attempts + 1} of {clonle.max_attempts}:")
 
-        display_state(clonle.get_state())
+            display_state(clonle.get_state())
 
-        print()
-        display_history(history)
-        s = input(">> ")
+            print()
+            display_history(clonle.history)
+            s = input(">> ")
 
-        try:
-            res = clonle.attempt(s)
-            display_word(s, res)
-            history.append((s, res))
-        except ValueError as err:
-            print(f"Invalid word: {err}")
-            continue
+            error = check_spelling(clonle, s)
+            if error is not None:
+                print(f"Invalid word: {error}")
+                continue
+            try:
+                res = clonle.attempt(s)
+                display_word(s, res)
+            except ValueError as err:
+                print(f"Invalid word: {err}")
+                continue
+            save_session(clonle, session_name, period)
 
-        if res == clonle.length * "x":
-            print()
-            print(
-                f"Success! Word found in "
-                f"{clonle.attempts} / {clonle.max_attempts} attempts:"
-            )
-            print()
-            display_history(history)
-            print()
-            break
+            if res == clonle.length * "x":
+                print()
+                print(
+                    f"Success! Word found in "
+                    f"{clonle.attempts} / {clonle.max_attempts} attempts:"
+                )
+                print()
+                display_history(clonle.history)
+                print()
+                end_session(session_name)
+                break
 
-        if clonle.attempts == clonle.max_attempts:
-            print("Unfortunately, maximum attempts reached and word not found.")
-            print(f"The word was: {clonle.target}.")
-            print()
-            break
+            if clonle.attempts == clonle.max_attempts:
+                print("Unfortunately, maximum attempts reached and word not found.")
+                print(f"The word was: {clonle.target}.")
+                print()
+                end_session(session_name)
+                break
@@ -0,0 +1,192 @@
+""" Constraints on the guesses allowed in hard mode. """
+
+import numpy as np
+
+from typing import Union
+
+from candidates import ALPHABET_SIZE, CandidateMasks
+from scoring import LOCATED, MISS, encode_words, feedback_digits, str_to_feedback
+
+HARD_MODES = ["standard", "strict"]
+
+_ORDINALS = {1: "1st", 2: "2nd", 3: "3rd"}
+
+
+class HardModeError(ValueError):
+    pass
+
+
+def _ordinal(i: int) -> str:
+    return _ORDINALS.get(i, f"{i}th")
+
+
+class HardModeConstraints:
+    """The hints revealed so far, compiled into a form that allows checking a guess
+    without replaying the game history.
+
+    In "standard" hard mode, as in Wordle, letters found in the right position must be
+    reused in that position, and letters found in the word must be reused (as many
+    times as they were found). In "strict" mode, guesses must additionally be
+    consistent with all the other feedback: no letter can be placed where it was shown
+    not to be, and no letter can be used more times than the target contains it.
+
+    The constraints are updated incrementally with `update()` after every attempt.
+
+    :param length: word length
+    :param mode: either "standard" or "strict"
+
+    Attributes:
+        required: np.ndarray
+            Letter index required at each position, or -1 if none.
+        min_count: np.ndarray
+            Minimum number of times each letter must appear.
+        max_count: np.ndarray
+            Maximum number of times each letter can appear.
+        forbidden: np.ndarray
+            Boolean array of shape `(length, 26)`; `forbidden[i, c]` is true if letter
+            `c` was shown not to be at position `i`.
+    """
+
+    def __init__(self, length: int, mode: str = "standard"):
+        if mode not in HARD_MODES:
+            raise ValueError(f"unknown hard mode '{mode}'.")
+        self.length = length
+        self.mode = mode
+
+        self.required = np.full(length, -1, dtype=np.int8)
+        self.min_count = np.zeros(ALPHABET_SIZE, dtype=np.int8)
+        self.max_count = np.full(ALPHABET_SIZE, length, dtype=np.int8)
+        self.forbidden = np.zeros((length, ALPHABET_SIZE), dtype=bool)
+
+        # plain-Python copies of the constraints, which are faster to check one word
+        # at a time: (position, letter) pairs, letter -> count maps, and sets of
+        # (position, letter) pairs
+        self._required = []
+        self._min_count = {}
+        self._max_count = {}
+        self._forbidden = set()
+
+    def update(self, guess: Union[str, np.ndarray], feedback: Union[str, int]):
+        """Add the hints given by an attempt.
+
+        :param guess: guessed word, either as a string or encoded (see
+            `scoring.encode_words`)
+        :param feedback: feedback, either as a string or as a code (see
+            `scoring.score`)
+        """
+        if isinstance(guess, str):
+            guess = encode_words([guess])[0]
+        if isinstance(feedback, str):
+            feedback = str_to_feedback(feedback)
+        digits = feedback_digits(feedback, self.length).tolist()
+
+        n_found = {}
+        missed = set()
+        for i, (letter, digit) in enumerate(zip(guess.tolist(), digits)):
+            if digit == LOCATED:
+                self.required[i] = letter
+            else:
+                self.forbidden[i, letter] = True
+
+            if digit == MISS:
+                missed.add(letter)
+                n_found.setdefault(letter, 0)
+            else:
+                n_found[letter] = n_found.get(letter, 0) + 1
+
+        for letter, count in n_found.items():
+            self.min_count[letter] = max(self.min_count[letter], count)
+            if letter in missed:
+                # a miss means the target contains no more copies of the letter
+                self.max_count[letter] = min(self.max_count[letter], count)
+
+        self._compile()
+
+    def check(self, word: str):
+        """Raise `HardModeError` if a word does not satisfy the constraints.
+
+        This takes time proportional to the word length, independent of the number of
+        attempts made.
+
+        :param word: lowercase word of the right length
+        """
+        for i, letter in self._required:
+            if word[i] != letter:
+                raise HardModeError(f"{_ordinal(i + 1)} letter must be '{letter}'.")
+
+        for letter, count in self._min_count.items():
+            if word.count(letter) < count:
+                times = "" if count == 1 else f" {count} times"
+                raise HardModeError(f"guess must contain '{letter}'{times}.")
+
+        if self.mode == "strict":
+            forbidden = self._forbidden
+            for i, letter in enumerate(word):
+                if (i, letter) in forbidden:
+                    raise HardModeError(
+                        f"'{letter}' cannot be the {_ordinal(i + 1)} letter."
+                    )
+            for letter, count in self._max_count.items():
+                if word.count(letter) > count:
+                    if count == 0:
+                        raise HardModeError(f"guess cannot contain '{letter}'.")
+                    times = "once" if count == 1 else f"{count} times"
+                    raise HardModeError(
+                        f"guess cannot contain '{letter}' more than {times}."
+                    )
+
+    def allows(self, word: str) -> bool:
+        """Check whether a word satisfies the constraints."""
+        try:
+            self.check(word)
+        except HardModeError:
+            return False
+        return True
+
+    def mask(self, masks: CandidateMasks) -> np.ndarray:
+        """Find all the words that satisfy the constraints.
+
+        :param masks: precomputed masks for the word list
+        :return: boolean array with one element for each word in the word list
+        """
+        bits = masks.all.copy()
+        for i, letter in enumerate(self.required.tolist()):
+            if letter >= 0:
+                bits &= masks.located[i, letter]
+        for letter in np.flatnonzero(self.min_count):
+            bits &= masks.at_least[letter, self.min_count[letter]]
+
+        if self.mode == "strict":
+            for i, letter in zip(*np.nonzero(self.forbidden)):
+                bits &= masks.not_located[i, letter]
+            for letter in np.flatnonzero(self.max_count < self.length):
+                bits &= ~masks.at_least[letter, self.max_count[letter] + 1]
+
+        return np.unpackbits(bits, count=masks.n_words).astype(bool)
+
+    def _compile(self):
+        """Update the plain-Python copies of the constraints."""
+        letters = [chr(ord("a") + _) for _ in range(ALPHABET_SIZE)]
+        self._required = [
+            (i, letters[c]) for i, c in enumerate(self.required.tolist()) if c >= 0
+        ]
+        self._min_count = {
+            letters[c]: int(self.min_count[c]) for c in np.flatnonzero(self.min_count)
+        }
+        self._max_count = {
+            letters[c]: int(self.max_count[c])
+            for c in np.flatnonzero(self.max_count < self.length)
+        }
+        self._forbidden = {
+            (int(i), letters[c]) for i, c in zip(*np.nonzero(self.forbidden))
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"HardModeConstraints("
+            f"length={self.length}, "
+            f"mode={self.mode}, "
+            f"required={self._required}, "
+            f"min_count={self._min_count}"
+            f")"
+        )
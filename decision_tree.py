@@ -0,0 +1,401 @@
+#! /usr/bin/env python
+""" Precompute a complete strategy for a dictionary and serve its guesses instantly. """
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+from backend import ClonleBackend, NotInitializedError
+from dictionary import load_compiled
+from patterns import dictionary_hash
+from scoring import decode_words, solved_code, str_to_feedback
+from solver import METRICS, information_scores
+
+FORMAT_VERSION = 1
+
+
+class DecisionTree:
+    """A strategy giving the next guess for every possible game history.
+
+    The tree is stored in compressed sparse row format: node `i` guesses
+    `guesses[i]`, and its children are `child_node[child_start[i] : child_start[i + 1]]`,
+    reached through the (sorted) feedback codes in `child_code` (see `scoring.score`).
+    Node 0 is the root. The solving feedback has no child.
+
+    :param guesses: encoded guess for each node, shape `(n_nodes, length)`
+    :param child_start: start of each node's children, shape `(n_nodes + 1,)`
+    :param child_code: feedback code leading to each child
+    :param child_node: index of each child
+    :param meta: dictionary with information about how the tree was built; contains
+        at least "length", "n_targets", "max_attempts", and "key" (see
+        `patterns.dictionary_hash`)
+    """
+
+    def __init__(
+        self,
+        guesses: np.ndarray,
+        child_start: np.ndarray,
+        child_code: np.ndarray,
+        child_node: np.ndarray,
+        meta: dict,
+    ):
+        self.guesses = guesses
+        self.child_start = child_start
+        self.child_code = child_code
+        self.child_node = child_node
+        self.meta = meta
+
+        self._words = decode_words(guesses) if len(guesses) > 0 else []
+
+    def next_guess(self, history: Sequence[Tuple[str, str]]) -> str:
+        """Find the next guess.
+
+        This takes time proportional to the length of the history.
+
+        :param history: list of `(word, feedback)` pairs, as in `ClonleBackend.history`
+        :return: the guess to make next
+        """
+        node = 0
+        for word, feedback in history:
+            if word != self._words[node]:
+                raise ValueError(f"history deviates from the tree at '{word}'.")
+            start = self.child_start[node]
+            end = self.child_start[node + 1]
+            code = str_to_feedback(feedback)
+            i = start + np.searchsorted(self.child_code[start:end], code)
+            if i >= end or self.child_code[i] != code:
+                raise ValueError(f"feedback '{feedback}' not in tree.")
+            node = self.child_node[i]
+
+        return self._words[node]
+
+    def matches(self, backend: ClonleBackend) -> bool:
+        """Check whether the tree was built for the dictionary and target pool of a
+        started game, and finds every target within the game's maximum number of
+        attempts."""
+        if backend.n_targets is None:
+            raise NotInitializedError("matches() called before start()")
+        words = backend.database.words
+        return (
+            self.meta["length"] == backend.length
+            and self.meta["n_targets"] == backend.n_targets
+            and self.meta["max_guesses"] <= backend.max_attempts
+            and self.meta["key"] == dictionary_hash(words, words[: backend.n_targets])
+        )
+
+    def save(self, path: str):
+        """Save the tree to an `.npz` file."""
+        np.savez_compressed(
+            path,
+            guesses=self.guesses,
+            child_start=self.child_start,
+            child_code=self.child_code,
+            child_node=self.child_node,
+            meta=np.array(json.dumps(dict(self.meta, version=FORMAT_VERSION))),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "DecisionTree":
+        """Load a tree saved with `save()`."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.pop("version", None) != FORMAT_VERSION:
+                raise ValueError(f"unsupported decision tree version in {path}.")
+            return cls(
+                data["guesses"],
+                data["child_start"],
+                data["child_code"],
+                data["child_node"],
+                meta,
+            )
+
+    def __len__(self) -> int:
+        return len(self.guesses)
+
+    def __repr__(self) -> str:
+        return (
+            f"DecisionTree("
+            f"n_nodes={len(self)}, "
+            f"expected_guesses={self.meta.get('expected_guesses')}, "
+            f"exhaustive={self.meta.get('exhaustive', False)}, "
+            f"max_guesses={self.meta.get('max_guesses')}"
+            f")"
+        )
+
+
+class _TreeBuilder:
+    """Search for a good strategy using memoized subproblems over candidate sets.
+
+    With a `beam_width` of `None`, every guess is tried at every node, which finds an
+    optimal strategy; otherwise only the best-scoring guesses are tried.
+
+    A plan is a pair `(guess, {code: plan})`. The cost of a plan is a pair
+    `(total, depth)`, where `total` is the number of guesses summed over all targets
+    and `depth` is the worst-case number of guesses.
+    """
+
+    def __init__(
+        self,
+        table: np.ndarray,
+        objective: str,
+        beam_width: Optional[Sequence[int]],
+        metric: Callable,
+        max_depth: int,
+        length: int,
+    ):
+        if objective not in ["expected", "minimax"]:
+            raise ValueError(f"unknown objective '{objective}'.")
+
+        self.table = table
+        self.objective = objective
+        self.beam_width = beam_width
+        self.metric = metric
+        self.max_depth = max_depth
+
+        self.solved = solved_code(length)
+        self.memo = {}
+
+    def solve(self, cands: np.ndarray, depth: int = 0) -> Tuple[tuple, Optional[tuple]]:
+        """Find the best plan for the given candidates (column indices), with `depth`
+        guesses already made."""
+        if depth >= self.max_depth:
+            return (np.inf, np.inf), None
+
+        key = (cands.tobytes(), depth)
+        res = self.memo.get(key)
+        if res is not None:
+            return res
+
+        n = len(cands)
+        if n == 1:
+            res = (1, 1), (cands[0], {})
+        else:
+            res = self._search(cands, depth)
+
+        self.memo[key] = res
+        return res
+
+    def _search(self, cands: np.ndarray, depth: int) -> Tuple[tuple, Optional[tuple]]:
+        n = len(cands)
+        if n == 2:
+            # guessing one of the two candidates is always optimal
+            options = [cands[0]]
+        elif self.beam_width is None:
+            # try the guesses from best to worst score, so that good plans are found
+            # early and the others are pruned quickly
+            scores = information_scores(self.table, cands, self.metric)
+            options = list(np.argsort(-scores, kind="stable"))
+        else:
+            scores = information_scores(self.table, cands, self.metric)
+            width = self.beam_width[min(depth, len(self.beam_width) - 1)]
+            width = min(width, len(scores))
+            top = np.argpartition(-scores, width - 1)[:width]
+            top = top[np.lexsort((top, -scores[top]))]
+            # also try the best guess that could win immediately
+            best_cand = cands[np.argmax(scores[cands])]
+            options = list(top) + ([best_cand] if best_cand not in top else [])
+
+        best_cost = (np.inf, np.inf)
+        best_plan = None
+        for guess in options:
+            cost, plan = self._try_guess(guess, cands, depth, best_cost)
+            if self._key(cost) < self._key(best_cost):
+                best_cost = cost
+                best_plan = plan
+
+        return best_cost, best_plan
+
+    def _try_guess(
+        self, guess: int, cands: np.ndarray, depth: int, bound: tuple
+    ) -> Tuple[tuple, Optional[tuple]]:
+        codes = np.asarray(self.table[guess, cands])
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        splits = np.flatnonzero(np.diff(sorted_codes)) + 1
+        if len(splits) == 0 and sorted_codes[0] != self.solved:
+            # the guess gives no information
+            return (np.inf, np.inf), None
+
+        total = len(cands)
+        max_depth = 1
+        children = {}
+        for group in np.split(order, splits):
+            code = int(codes[group[0]])
+            if code == self.solved:
+                continue
+            (sub_total, sub_depth), sub_plan = self.solve(cands[group], depth + 1)
+            total += sub_total
+            max_depth = max(max_depth, 1 + sub_depth)
+            if self._key((total, max_depth)) >= self._key(bound):
+                # can't beat the best option found so far
+                return (np.inf, np.inf), None
+            children[code] = sub_plan
+
+        return (total, max_depth), (guess, children)
+
+    def _key(self, cost: tuple) -> tuple:
+        return cost if self.objective == "expected" else cost[::-1]
+
+
+def build_decision_tree(
+    backend: ClonleBackend,
+    objective: str = "expected",
+    beam_width: Optional[Union[int, Sequence[int]]] = 1,
+    metric: Union[str, Callable] = "mean",
+    cache_dir: str = "save",
+) -> DecisionTree:
+    """Build a decision tree for the dictionary and target pool of a started game.
+
+    At each node, the guesses with the highest information scores (see
+    `solver.EntropySolver`) are tried, together with the best-scoring candidate, and
+    the one leading to the best subtree is kept. Subproblems are memoized by candidate
+    set and depth.
+
+    This is a heuristic beam search: the tree is the best among those that only use
+    the guesses that were tried, and its cost is an upper bound on the optimum. The
+    default width of 1 is essentially the greedy entropy strategy, with a lookahead
+    over the best candidate. Use `beam_width=None` to try every guess at every node,
+    which gives a tree that is optimal for the objective (within the maximum number
+    of attempts), but is only practical for small target pools.
+
+    :param backend: started game; its database, number of targets, and maximum number
+        of attempts are used
+    :param objective: "expected" to minimize the average number of guesses, or
+        "minimax" to minimize the worst case
+    :param beam_width: number of guesses to try at each node; either a single number
+        or one number per depth, with the last one used for all deeper nodes; `None`
+        for an exhaustive search
+    :param metric: information metric used to pick the guesses to try
+    :param cache_dir: where to cache the pattern table
+    """
+    if backend.n_targets is None:
+        raise NotInitializedError("build_decision_tree() called before start()")
+    if isinstance(beam_width, int):
+        beam_width = [beam_width]
+    exhaustive = beam_width is None
+    if isinstance(metric, str):
+        metric = METRICS[metric]
+
+    n_targets = backend.n_targets
+    table = np.asarray(
+        backend.pattern_table(target_n_cutoff=n_targets, cache_dir=cache_dir)
+    )
+    builder = _TreeBuilder(
+        table, objective, beam_width, metric, backend.max_attempts, backend.length
+    )
+    (total, max_guesses), plan = builder.solve(np.arange(n_targets))
+    if plan is None:
+        raise ValueError(
+            f"no strategy finds every target in {backend.max_attempts} attempts."
+        )
+
+    # flatten the plan, reusing shared subplans
+    node_ids = {}
+    stack = [plan]
+    node_ids[id(plan)] = 0
+    plans = [plan]
+    while stack:
+        crt_plan = stack.pop()
+        for sub_plan in crt_plan[1].values():
+            if id(sub_plan) not in node_ids:
+                node_ids[id(sub_plan)] = len(plans)
+                plans.append(sub_plan)
+                stack.append(sub_plan)
+
+    guesses = []
+    child_start = [0]
+    child_code = []
+    child_node = []
+    for crt_plan in plans:
+        guesses.append(crt_plan[0])
+        for code in sorted(crt_plan[1]):
+            child_code.append(code)
+            child_node.append(node_ids[id(crt_plan[1][code])])
+        child_start.append(len(child_code))
+
+    words = backend.database.words
+    meta = {
+        "length": backend.length,
+        "n_targets": n_targets,
+        "max_attempts": backend.max_attempts,
+        "key": dictionary_hash(words, words[:n_targets]),
+        "objective": objective,
+        "exhaustive": exhaustive,
+        "expected_guesses": total / n_targets,
+        "max_guesses": int(max_guesses),
+    }
+    return DecisionTree(
+        backend.database.matrix[guesses],
+        np.array(child_start, dtype=np.int32),
+        np.array(child_code, dtype=np.uint32),
+        np.array(child_node, dtype=np.int32),
+        meta,
+    )
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(description="Build a Clonle decision tree")
+    parser.add_argument(
+        "n_letters", nargs="?", default=5, type=int, help="number of letters per word"
+    )
+    parser.add_argument(
+        "--n-targets", default=3000, type=int, help="number of possible targets"
+    )
+    parser.add_argument(
+        "--max-attempts", default=6, type=int, help="maximum number of attempts"
+    )
+    parser.add_argument(
+        "--objective",
+        default="expected",
+        choices=["expected", "minimax"],
+        help="minimize the expected or the worst-case number of guesses",
+    )
+    parser.add_argument(
+        "--beam",
+        nargs="+",
+        default=[1],
+        type=int,
+        help="number of guesses to try at each depth (a heuristic; see --exhaustive)",
+    )
+    parser.add_argument(
+        "--exhaustive",
+        action="store_true",
+        help="try every guess at every node, giving an optimal tree; only practical "
+        "for small target pools",
+    )
+    parser.add_argument("--output", help="output file (default: in save/)")
+
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    compiled_name = os.path.join("data", "dictionary")
+    if os.path.exists(os.path.join(compiled_name, "meta.json")):
+        database = load_compiled(compiled_name, args.n_letters)
+    else:
+        import pandas as pd
+
+        database = pd.read_csv(os.path.join("data", "dictionary.csv"))
+
+    backend = ClonleBackend(database, args.n_letters, max_attempts=args.max_attempts)
+    backend.start(target_n_cutoff=args.n_targets)
+
+    print("Building decision tree...", end="", flush=True)
+    beam_width = None if args.exhaustive else args.beam
+    tree = build_decision_tree(backend, objective=args.objective, beam_width=beam_width)
+    print(f" done. {tree}")
+
+    output = args.output
+    if output is None:
+        output = os.path.join(
+            "save", f"tree_{args.n_letters}_{backend.n_targets}_{args.objective}.npz"
+        )
+    tree.save(output)
+    print(f"Saved to {output}.")
@@ -0,0 +1,430 @@
+#! /usr/bin/env python
+""" Compiled, memory-mappable word dictionaries. """
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from typing import Dict, Mapping, Optional, Sequence, TYPE_CHECKING
+
+from prefix import PrefixIndex
+from sampler import TargetSampler
+from scoring import encode_words, decode_words
+from instrumentation import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FORMAT_VERSION = 1
+
+
+class WordList:
+    """A list of words of a single length, sorted by decreasing frequency.
+
+    The words are stored as a `uint8` matrix of letter indices (see
+    `scoring.encode_words`), which can be memory-mapped.
+
+    :param matrix: word matrix, shape `(n_words, length)`
+    :param freq: word frequencies, shape `(n_words,)`; words with unknown frequency
+        have `nan` frequency and should come last
+    :param index: mapping from each word to its position in the list, such as a
+        `SortedWordIndex`; by default, a dictionary is built on first access
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        freq: np.ndarray,
+        index: Optional[Mapping[str, int]] = None,
+    ):
+        if matrix.ndim != 2 or len(matrix) != len(freq):
+            raise ValueError("matrix should be 2d with one row for each frequency.")
+
+        self.matrix = matrix
+        self.freq = freq
+        self.length = matrix.shape[1]
+
+        self._words = None
+        self._index = index
+        self._sampler = None
+        self._prefix_index = None
+
+    @classmethod
+    def from_words(cls, words: Sequence[str], freq: Sequence[float]) -> "WordList":
+        """Create a word list from a list of strings. The words are not re-sorted.
+
+        :param words: list of words, all of the same length
+        :param freq: frequency for each word
+        """
+        freq = np.asarray(freq, dtype=float)
+        length = len(words[0]) if len(words) > 0 else 0
+        return cls(encode_words(words, length), freq)
+
+    @property
+    def words(self) -> list:
+        """The words, as a list of strings. Decoded on first access."""
+        if self._words is None:
+            self._words = decode_words(self.matrix) if len(self) > 0 else []
+        return self._words
+
+    def word(self, idx: int) -> str:
+        """Return the word at a given position, without decoding the whole list if
+        `words` was not yet accessed."""
+        if self._words is not None:
+            return self._words[idx]
+        return decode_words(self.matrix[idx : idx + 1])[0]
+
+    @property
+    def index(self) -> Mapping[str, int]:
+        """Mapping from each word to its position in the list."""
+        if self._index is None:
+            words = self.words
+            self._index = dict(zip(words, range(len(words))))
+        return self._index
+
+    @property
+    def sampler(self) -> TargetSampler:
+        """Sampler used to choose targets among the most frequent words. Created on
+        first access."""
+        if self._sampler is None:
+            self._sampler = TargetSampler(self.freq)
+        return self._sampler
+
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        """Alphabetical index used to look up words by prefix. Created on first
+        access."""
+        if self._prefix_index is None:
+            self._prefix_index = PrefixIndex(self.matrix)
+        return self._prefix_index
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """Return the words and frequencies as a Pandas dataframe with columns "word"
+        and "freq", in the same order as the list."""
+        import pandas as pd
+
+        return pd.DataFrame({"word": self.words, "freq": np.asarray(self.freq)})
+
+    def head(self, n: int) -> "WordList":
+        """Return the `n` most frequent words. This does not copy the data.
+
+        The new list also shares the lookup tables that were already built for this
+        one: the decoded words are sliced, and the index is wrapped in a
+        `TruncatedIndex` instead of being rebuilt.
+        """
+        res = WordList(self.matrix[:n], self.freq[:n])
+        n = len(res)
+        if self._words is not None:
+            res._words = self._words[:n]
+        if self._index is not None:
+            if n == len(self):
+                res._index = self._index
+            elif isinstance(self._index, TruncatedIndex):
+                res._index = TruncatedIndex(self._index.index, n)
+            else:
+                res._index = TruncatedIndex(self._index, n)
+        return res
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.index
+
+    def __repr__(self) -> str:
+        return f"WordList(length={self.length}, n_words={len(self)})"
+
+
+class SortedWordIndex(Mapping):
+    """Mapping from words to their positions in a word list, stored in two arrays that
+    can be memory-mapped, instead of in a dictionary.
+
+    Lookups use binary search, so they take `O(log n)` time. Unlike a dictionary, the
+    index takes no per-process memory when memory-mapped.
+
+    :param sorted_words: the words as ASCII byte strings (dtype `S{length}`), sorted
+    :param order: position in the word list of each of the `sorted_words`
+    """
+
+    def __init__(self, sorted_words: np.ndarray, order: np.ndarray):
+        if len(sorted_words) != len(order):
+            raise ValueError("sorted_words and order should have the same length.")
+        self.sorted_words = sorted_words
+        self.order = order
+        self.length = sorted_words.dtype.itemsize
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray) -> "SortedWordIndex":
+        """Build the index for an encoded word matrix (see `scoring.encode_words`)."""
+        n, length = matrix.shape
+        ascii_matrix = np.ascontiguousarray(matrix, dtype=np.uint8) + ord("a")
+        keys = ascii_matrix.view(f"S{length}").reshape(n)
+        order = np.argsort(keys, kind="stable").astype(np.int32)
+        return cls(keys[order], order)
+
+    def get(self, word: str, default: Optional[int] = None) -> Optional[int]:
+        if not isinstance(word, str) or len(word) != self.length or not word.isascii():
+            return default
+        key = word.encode("ascii")
+        sorted_words = self.sorted_words
+        i = int(np.searchsorted(sorted_words, key))
+        if i < len(sorted_words) and sorted_words[i] == key:
+            return int(self.order[i])
+        return default
+
+    def __getitem__(self, word: str) -> int:
+        idx = self.get(word)
+        if idx is None:
+            raise KeyError(word)
+        return idx
+
+    def __contains__(self, word: object) -> bool:
+        return self.get(word) is not None
+
+    def __iter__(self):
+        return (_.decode("ascii") for _ in self.sorted_words.tolist())
+
+    def __len__(self) -> int:
+        return len(self.sorted_words)
+
+    def __repr__(self) -> str:
+        return f"SortedWordIndex(length={self.length}, n_words={len(self)})"
+
+
+class TruncatedIndex(Mapping):
+    """Index of the first `n` words of a word list, as a view of the index of the
+    whole list; words at later positions count as missing.
+
+    :param index: mapping from each word of the whole list to its position
+    :param n: number of words to keep
+    """
+
+    def __init__(self, index: Mapping[str, int], n: int):
+        self.index = index
+        self.n = n
+
+    def get(self, word: str, default: Optional[int] = None) -> Optional[int]:
+        idx = self.index.get(word)
+        if idx is None or idx >= self.n:
+            return default
+        return idx
+
+    def __getitem__(self, word: str) -> int:
+        idx = self.get(word)
+        if idx is None:
+            raise KeyError(word)
+        return idx
+
+    def __contains__(self, word: object) -> bool:
+        return self.get(word) is not None
+
+    def __iter__(self):
+        return (word for word, idx in self.index.items() if idx < self.n)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __repr__(self) -> str:
+        return f"TruncatedIndex(n_words={self.n}, index={self.index!r})"
+
+
+def clean_dataframe(database: "pd.DataFrame") -> "pd.DataFrame":
+    """Ensure a word database has a "freq" column and only contains lowercase words
+    made of the letters a-z.
+
+    If "freq" is missing, it is calculated from "count" using the *whole* database.
+    """
+    clean_db = database.copy()
+
+    if "freq" not in clean_db.columns:
+        clean_db["freq"] = clean_db["count"] / clean_db["count"].sum()
+
+    mask = clean_db["word"].str.fullmatch("[a-z]+", na=False)
+    return clean_db[mask.astype(bool)]
+
+
+@timed("dictionary.from_dataframe")
+def dataframe_to_word_list(
+    database: "pd.DataFrame", length: int, frequency_cutoff: Optional[float] = None
+) -> WordList:
+    """Select the words of a given length from a word database.
+
+    :param database: word database with columns "word" and either "freq" or "count";
+        see `clean_dataframe`
+    :param length: word length
+    :param frequency_cutoff: if provided, words with lower frequency are dropped
+    :return: the words, sorted by decreasing frequency
+    """
+    clean_db = clean_dataframe(database)
+
+    mask = clean_db["word"].str.len() == length
+    if frequency_cutoff:
+        mask = mask & (clean_db["freq"] >= frequency_cutoff)
+
+    # stable, so that words with equal frequency keep their order in the database
+    clean_db = clean_db[mask].sort_values("freq", ascending=False, kind="stable")
+    return WordList.from_words(clean_db["word"].tolist(), clean_db["freq"])
+
+
+@timed("dictionary.from_dataframe_all")
+def dataframe_to_word_lists(
+    database: "pd.DataFrame",
+    lengths: Optional[Sequence[int]] = None,
+    frequency_cutoff: Optional[float] = None,
+) -> Dict[int, WordList]:
+    """Split a word database into word lists of every length.
+
+    The database is cleaned once and then grouped by word length, so this is much
+    faster than calling `dataframe_to_word_list` for each length. Both sorts are
+    stable, so the results are the same, including the order of words with equal
+    frequency.
+
+    :param database: word database with columns "word" and either "freq" or "count";
+        see `clean_dataframe`
+    :param lengths: word lengths to include; by default, all lengths in the database
+    :param frequency_cutoff: if provided, words with lower frequency are dropped
+    :return: dictionary mapping word lengths to word lists sorted by decreasing
+        frequency; when `lengths` is not given, only lengths with words are included
+    """
+    clean_db = clean_dataframe(database)
+    if frequency_cutoff:
+        clean_db = clean_db[clean_db["freq"] >= frequency_cutoff]
+
+    word_lists = {}
+    for length, crt_db in clean_db.groupby(clean_db["word"].str.len(), sort=True):
+        length = int(length)
+        if lengths is not None and length not in lengths:
+            continue
+        crt_db = crt_db.sort_values("freq", ascending=False, kind="stable")
+        word_lists[length] = WordList(
+            encode_words(crt_db["word"].tolist(), length),
+            crt_db["freq"].to_numpy(dtype=float),
+        )
+
+    for length in lengths if lengths is not None else []:
+        if length not in word_lists:
+            empty = np.zeros((0, length), dtype=np.uint8)
+            word_lists[length] = WordList(empty, np.zeros(0))
+
+    return dict(sorted(word_lists.items()))
+
+
+def compile_dictionary(
+    database: "pd.DataFrame", path: str, lengths: Optional[Sequence[int]] = None
+):
+    """Write a word database in compiled form.
+
+    The compiled dictionary is a folder containing, for each word length, a `uint8`
+    word matrix `words_{length:02d}.npy` and a `float32` frequency vector
+    `freq_{length:02d}.npy`, both sorted by decreasing frequency; as well as a
+    `meta.json` file listing the available lengths.
+
+    :param database: word database with columns "word" and either "freq" or "count"
+    :param path: output folder
+    :param lengths: word lengths to include; by default, all lengths in the database
+    """
+    save_compiled(dataframe_to_word_lists(database, lengths), path)
+
+
+def save_compiled(
+    word_lists: Dict[int, WordList],
+    path: str,
+    meta: Optional[dict] = None,
+    index: bool = False,
+):
+    """Write word lists in compiled form; see `compile_dictionary`.
+
+    The `meta.json` file is written last, so a folder is only recognized as a compiled
+    dictionary once all the word lists were saved.
+
+    :param word_lists: dictionary mapping word lengths to already sorted word lists
+    :param path: output folder
+    :param meta: additional information to store in `meta.json`
+    :param index: if true, also save a `SortedWordIndex` for each length, in files
+        `keys_{length:02d}.npy` and `order_{length:02d}.npy`; loading then does not
+        need to build a dictionary of all the words
+    """
+    os.makedirs(path, exist_ok=True)
+    full_meta = dict(meta) if meta is not None else {}
+    full_meta.update({"version": FORMAT_VERSION, "lengths": {}, "index": index})
+    for length, word_list in word_lists.items():
+        freq = np.asarray(word_list.freq, dtype=np.float32)
+        np.save(os.path.join(path, f"words_{length:02d}.npy"), word_list.matrix)
+        np.save(os.path.join(path, f"freq_{length:02d}.npy"), freq)
+        if index:
+            sorted_index = SortedWordIndex.from_matrix(word_list.matrix)
+            np.save(
+                os.path.join(path, f"keys_{length:02d}.npy"), sorted_index.sorted_words
+            )
+            np.save(os.path.join(path, f"order_{length:02d}.npy"), sorted_index.order)
+
+        full_meta["lengths"][str(length)] = len(word_list)
+
+    with open(os.path.join(path, "meta.json"), "wt") as f:
+        json.dump(full_meta, f, indent=2)
+
+
+@timed("dictionary.load_compiled")
+def load_compiled(path: str, length: int, mmap: bool = True) -> WordList:
+    """Load the words of a given length from a compiled dictionary.
+
+    :param path: folder containing the compiled dictionary
+    :param length: word length
+    :param mmap: whether to memory-map the data instead of reading it into memory
+    """
+    with open(os.path.join(path, "meta.json"), "rt") as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported compiled dictionary version in {path}.")
+    if str(length) not in meta["lengths"]:
+        raise ValueError(f"no words of length {length} in {path}.")
+
+    mmap_mode = "r" if mmap else None
+    matrix = np.load(os.path.join(path, f"words_{length:02d}.npy"), mmap_mode=mmap_mode)
+    freq = np.load(os.path.join(path, f"freq_{length:02d}.npy"), mmap_mode=mmap_mode)
+    index = None
+    if meta.get("index"):
+        keys = np.load(
+            os.path.join(path, f"keys_{length:02d}.npy"), mmap_mode=mmap_mode
+        )
+        order = np.load(
+            os.path.join(path, f"order_{length:02d}.npy"), mmap_mode=mmap_mode
+        )
+        index = SortedWordIndex(keys, order)
+    return WordList(matrix, freq, index=index)
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Compile a word dictionary CSV file to a memory-mappable format"
+    )
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=os.path.join("data", "dictionary.csv"),
+        help="CSV file with columns 'word' and 'count' or 'freq'",
+    )
+    parser.add_argument(
+        "target",
+        nargs="?",
+        default=os.path.join("data", "dictionary"),
+        help="output folder",
+    )
+    parser.add_argument(
+        "--lengths", nargs="+", type=int, help="word lengths to include (default: all)"
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    args = parse_command_line()
+
+    print(f"Compiling {args.source} to {args.target}...", end="")
+    compile_dictionary(pd.read_csv(args.source), args.target, lengths=args.lengths)
+    print(" done.")
@@ -0,0 +1,238 @@
+#! /usr/bin/env python
+""" Evaluate a solver by playing a game against every possible target. """
+
+import argparse
+import functools
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from typing import Callable, Optional, Union
+
+from backend import ClonleBackend
+from dictionary import WordList, load_compiled
+from shared import SharedDictionary
+from solver import EntropySolver
+
+# per-process state for worker processes; see `_init_worker`
+_worker = {}
+
+
+def play_game(backend: ClonleBackend, solver, max_guesses: int) -> int:
+    """Play one game using a solver.
+
+    :param backend: a started game
+    :param solver: object with a `next_guess()` method
+    :param max_guesses: give up after this many guesses
+    :return: number of guesses needed to find the target, or `max_guesses + 1` if the
+        target was not found
+    """
+    solved = backend.length * "x"
+    for i in range(max_guesses):
+        if backend.attempt(solver.next_guess()) == solved:
+            return i + 1
+
+    return max_guesses + 1
+
+
+def _init_worker(
+    database: Union[str, WordList],
+    length: int,
+    n_targets: int,
+    solver_factory: Callable,
+    max_guesses: int,
+):
+    """Set up the backend and solver used by a worker process.
+
+    This runs once per process, so the word data is sent (or memory-mapped, if
+    `database` is the path to a compiled dictionary) only once instead of with every
+    task. The pattern table is memory-mapped from the cache and thus shared between
+    processes.
+    """
+    if isinstance(database, str):
+        database = load_compiled(database, length)
+
+    backend = ClonleBackend(database, length, max_attempts=max_guesses)
+    backend.start(target_n_cutoff=n_targets)
+
+    _worker["backend"] = backend
+    _worker["solver"] = solver_factory(backend)
+    _worker["n_targets"] = n_targets
+    _worker["max_guesses"] = max_guesses
+
+
+def _play_targets(idxs: range) -> np.ndarray:
+    """Play games for a range of target indices in a worker process."""
+    backend = _worker["backend"]
+    solver = _worker["solver"]
+    words = backend.database.words
+
+    res = np.empty(len(idxs), dtype=np.int16)
+    for k, idx in enumerate(idxs):
+        backend.start(target_n_cutoff=_worker["n_targets"], target=words[idx])
+        res[k] = play_game(backend, solver, _worker["max_guesses"])
+
+    return res
+
+
+def evaluate(
+    database: Union[str, WordList],
+    length: int,
+    n_targets: int,
+    solver_factory: Optional[Callable] = None,
+    max_guesses: int = 20,
+    n_workers: Optional[int] = None,
+    chunk_size: int = 25,
+    cache_dir: str = "save",
+) -> dict:
+    """Play a game for every possible target and collect statistics.
+
+    :param database: either a `WordList` or the path to a compiled dictionary; the
+        latter is memory-mapped by the workers instead of being sent to them
+    :param length: word length
+    :param n_targets: the number of top-frequency words used as targets
+    :param solver_factory: function that takes a `ClonleBackend` and returns a solver
+        for it, i.e., an object with a `next_guess()` method; it must be picklable;
+        by default an `EntropySolver` is used
+    :param max_guesses: give up on a game after this many guesses
+    :param n_workers: number of worker processes; by default, the number of CPUs; if
+        this is 0, all games are played in the current process
+    :param chunk_size: number of targets sent to a worker at once
+    :param cache_dir: where the default solver caches the pattern table; solvers made
+        by `solver_factory` use their own setting
+    :return: dictionary with keys
+        "n_guesses": number of guesses for each target (`max_guesses + 1` for
+            failures);
+        "distribution": dictionary mapping number of guesses to number of games;
+        "mean": average number of guesses;
+        "max": worst-case number of guesses;
+        "n_failed": number of games where the target was not found;
+        "targets": list of targets;
+        "elapsed": wall-clock time, in seconds;
+        "games_per_second": throughput
+    """
+    if solver_factory is None:
+        solver_factory = functools.partial(EntropySolver, cache_dir=cache_dir)
+
+    t0 = time.perf_counter()
+
+    # find the opening in this process, which also makes solvers that use the pattern
+    # table build and cache it (in their own cache folder), so that the workers can
+    # simply memory-map it
+    main_db = load_compiled(database, length) if isinstance(database, str) else database
+    main_backend = ClonleBackend(main_db, length, max_attempts=max_guesses)
+    main_backend.start(target_n_cutoff=n_targets)
+    opening = solver_factory(main_backend).next_guess()
+    solver_factory = functools.partial(_with_opening, solver_factory, opening)
+
+    n_targets = main_backend.n_targets
+    chunks = [
+        range(start, min(start + chunk_size, n_targets))
+        for start in range(0, n_targets, chunk_size)
+    ]
+    init_args = (database, length, n_targets, solver_factory, max_guesses)
+
+    if n_workers == 0:
+        _init_worker(*init_args)
+        results = [_play_targets(chunk) for chunk in chunks]
+    else:
+        with multiprocessing.Pool(
+            n_workers, initializer=_init_worker, initargs=init_args
+        ) as pool:
+            results = pool.map(_play_targets, chunks)
+
+    elapsed = time.perf_counter() - t0
+
+    n_guesses = np.concatenate(results) if results else np.zeros(0, dtype=np.int16)
+    values, counts = np.unique(n_guesses, return_counts=True)
+    return {
+        "n_guesses": n_guesses,
+        "distribution": dict(zip(values.tolist(), counts.tolist())),
+        "mean": float(np.mean(n_guesses)) if len(n_guesses) > 0 else np.nan,
+        "max": int(np.max(n_guesses)) if len(n_guesses) > 0 else 0,
+        "n_failed": int(np.sum(n_guesses > max_guesses)),
+        "targets": main_db.words[:n_targets],
+        "elapsed": elapsed,
+        "games_per_second": len(n_guesses) / elapsed,
+    }
+
+
+def _with_opening(solver_factory: Callable, opening: str, backend: ClonleBackend):
+    """Create a solver with a precomputed opening, when the solver supports it."""
+    solver = solver_factory(backend)
+    if hasattr(solver, "opening"):
+        solver.opening = opening
+    return solver
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Evaluate the Clonle solver against all possible targets"
+    )
+    parser.add_argument(
+        "n_letters", nargs="?", default=5, type=int, help="number of letters per word"
+    )
+    parser.add_argument(
+        "--n-targets", default=3000, type=int, help="number of possible targets"
+    )
+    parser.add_argument(
+        "--metric",
+        default="mean",
+        choices=["mean", "median", "min"],
+        help="information-gain summary used by the solver",
+    )
+    parser.add_argument(
+        "--weighted", action="store_true", help="weight targets by frequency"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="number of worker processes (default: all CPUs)"
+    )
+    parser.add_argument(
+        "--max-attempts",
+        default=6,
+        type=int,
+        help="games needing more guesses than this count as lost",
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    database = os.path.join("data", "dictionary")
+    if not os.path.exists(os.path.join(database, "meta.json")):
+        # clean the words once and share them, instead of sending each worker a copy
+        shared = SharedDictionary.from_source(
+            os.path.join("data", "dictionary.csv"), [args.n_letters]
+        )
+        database = shared.path
+
+    solver_factory = functools.partial(
+        EntropySolver, metric=args.metric, weighted=args.weighted
+    )
+    res = evaluate(
+        database,
+        args.n_letters,
+        args.n_targets,
+        solver_factory=solver_factory,
+        n_workers=args.workers,
+    )
+
+    n_lost = int(np.sum(res["n_guesses"] > args.max_attempts))
+    print(
+        f"Played {len(res['n_guesses'])} games in {res['elapsed']:.1f} s "
+        f"({res['games_per_second']:.1f} games / s)."
+    )
+    print(f"Average guesses: {res['mean']:.3f}; worst case: {res['max']}.")
+    print(f"Lost {n_lost} games (more than {args.max_attempts} guesses).")
+    print("Distribution:")
+    for n_guesses, count in res["distribution"].items():
+        print(f"  {n_guesses:2d}: {count}")
+
+    worst = np.argsort(-res["n_guesses"], kind="stable")[:10]
+    worst_str = ", ".join(f"{res['targets'][_]} ({res['n_guesses'][_]})" for _ in worst)
+    print(f"Hardest targets: {worst_str}.")
@@ -0,0 +1,420 @@
+#! /usr/bin/env python
+""" Record finished games in an append-only log, and replay and analyze the logs. """
+
+import argparse
+import gzip
+import json
+import os
+import time
+
+import numpy as np
+
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from scoring import FEEDBACK_SYMBOLS, score
+
+LOG_VERSION = 1
+
+# lookup tables from bytes to letter indices and feedback digits, with -1 for bytes
+# that are not allowed
+_LETTERS = np.full(256, -1, dtype=np.int16)
+_LETTERS[ord("a") : ord("z") + 1] = np.arange(26)
+_DIGITS = np.full(256, -1, dtype=np.int16)
+_DIGITS[np.frombuffer(FEEDBACK_SYMBOLS.encode("ascii"), dtype=np.uint8)] = np.arange(
+    len(FEEDBACK_SYMBOLS)
+)
+
+
+class GameLog:
+    """An append-only log of finished games, with one JSON record per line.
+
+    Each record is written with a single call and flushed right away, so concurrent
+    writers and crashes can at worst leave an incomplete last line, which `read_games`
+    skips. Logs whose name ends in ".gz" are compressed.
+
+    :param path: the log file; created if it does not exist
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, record: dict):
+        """Append a record to the log."""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with _open(self.path, "at") as f:
+            f.write(line)
+
+    def record_game(self, backend):
+        """Append the record of a finished game; see `game_record`."""
+        self.append(game_record(backend))
+
+    def __iter__(self) -> Iterator[dict]:
+        return read_games(self.path)
+
+    def __repr__(self) -> str:
+        return f"GameLog(path={self.path!r})"
+
+
+def game_record(backend) -> dict:
+    """Describe a finished game.
+
+    The record contains the back end type, word length, maximum attempts, random seed
+    (if one was given), number of possible targets, the target (or targets, for
+    multi-board games), the guesses and their feedback, the time in seconds from the
+    start of the game to each guess, and whether the game was won.
+
+    :param backend: a `ClonleBackend` or one of its subclasses
+    """
+    history = backend.history
+    solved = getattr(backend, "solved", None)
+    if solved is not None:
+        targets = list(backend.targets)
+        won = bool(np.all(solved))
+    else:
+        targets = [backend.target]
+        won = len(history) > 0 and history[-1][1] == backend.length * "x"
+
+    return {
+        "version": LOG_VERSION,
+        "time": backend.start_time,
+        "backend": type(backend).__name__,
+        "length": backend.length,
+        "max_attempts": backend.max_attempts,
+        "seed": backend.seed,
+        "n_targets": backend.n_targets,
+        "targets": targets,
+        "guesses": [word for word, _ in history],
+        "feedback": [res for _, res in history],
+        "times": [round(_, 3) for _ in backend.guess_times],
+        "won": won,
+    }
+
+
+def read_games(paths: Union[str, Sequence[str]]) -> Iterator[dict]:
+    """Iterate over the records in one or more logs.
+
+    The logs are read one line at a time, so memory use does not grow with their size.
+    Lines that cannot be parsed, such as a last line cut short by a crash, are
+    skipped, as are records from newer versions of the log format.
+
+    :param paths: a log file, or a sequence of log files
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        with _open(path, "rt") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("version") == LOG_VERSION:
+                    yield record
+
+
+def batched(records: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    """Group records into lists of at most `batch_size` elements."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def board_results(record: dict) -> Iterator[Tuple[str, bool, int]]:
+    """Find the outcome for each target of a game.
+
+    :return: iterator over `(target, solved, n_guesses)`, where `n_guesses` is the
+        number of guesses needed to find the target, or the total number of guesses if
+        it was not found
+    """
+    solved = record["length"] * "x"
+    n_guesses = len(record["guesses"])
+    for board, target in enumerate(record["targets"]):
+        result = (target, False, n_guesses)
+        for k, res in enumerate(record["feedback"]):
+            if isinstance(res, list):
+                res = res[board]
+            if res == solved:
+                result = (target, True, k + 1)
+                break
+        yield result
+
+
+def verify_games(
+    records: Iterable[dict], batch_size: int = 4096
+) -> Iterator[Tuple[dict, bool]]:
+    """Check that the feedback recorded in each game matches the targets.
+
+    The records are processed in batches, and all the guesses in a batch are validated
+    and scored at once. Records with missing fields, invalid words, or invalid feedback
+    fail the check.
+
+    :param records: game records
+    :param batch_size: number of games to score at once
+    :return: iterator over `(record, ok)` pairs, in the same order as `records`
+    """
+    for batch in batched(records, batch_size):
+        ok = np.ones(len(batch), dtype=bool)
+        by_length = {}
+        for i, record in enumerate(batch):
+            try:
+                length = record["length"]
+                crt = by_length.get(length)
+                if crt is None:
+                    if not isinstance(length, int) or length <= 0:
+                        raise ValueError("invalid word length.")
+                    crt = by_length[length] = ([], [], [], [])
+                _collect_feedback(record, i, *crt)
+            except (KeyError, IndexError, TypeError, ValueError):
+                ok[i] = False
+
+        for length, (game_idxs, guesses, targets, feedback) in by_length.items():
+            guess_ok, guess_matrix = _encode_checked(guesses, length, _LETTERS)
+            target_ok, target_matrix = _encode_checked(targets, length, _LETTERS)
+            feedback_ok, digits = _encode_checked(feedback, length, _DIGITS)
+
+            codes = score(guess_matrix, target_matrix)
+            expected = digits.astype(np.int64) @ 3 ** np.arange(length, dtype=np.int64)
+            good = guess_ok & target_ok & feedback_ok & (codes == expected)
+            ok[np.asarray(game_idxs)[~good]] = False
+
+        yield from zip(batch, ok.tolist())
+
+
+class GameStats:
+    """Aggregated results of many games, grouped by word length.
+
+    Memory use only grows with the number of distinct targets, not with the number of
+    games.
+    """
+
+    def __init__(self):
+        self.games = Counter()
+        self.wins = Counter()
+        self.invalid = Counter()
+        # distribution of the number of guesses in won games, by length
+        self.guesses = {}
+        # per-length map from target to (games, boards solved, total guesses)
+        self.targets = {}
+
+    def add(self, record: dict, ok: bool = True):
+        """Add a game to the statistics.
+
+        :param record: game record
+        :param ok: whether the game passed verification; games that did not are only
+            counted as invalid
+        """
+        length = record.get("length")
+        if not ok:
+            self.invalid[length] += 1
+            return
+
+        self.games[length] += 1
+        if record["won"]:
+            self.wins[length] += 1
+            crt = self.guesses.setdefault(length, Counter())
+            crt[len(record["guesses"])] += 1
+
+        crt_targets = self.targets.setdefault(length, {})
+        for target, solved, n_guesses in board_results(record):
+            n, n_solved, total = crt_targets.get(target, (0, 0, 0))
+            crt_targets[target] = (n + 1, n_solved + solved, total + n_guesses)
+
+    def win_rate(self, length: int) -> float:
+        n = self.games[length]
+        return self.wins[length] / n if n > 0 else float("nan")
+
+    def hardest(self, length: int, n: int = 10, min_games: int = 1) -> list:
+        """Find the targets that were hardest to find.
+
+        Targets are ranked by how often they were missed, then by the average number
+        of guesses needed.
+
+        :param length: word length
+        :param n: number of targets to return
+        :param min_games: ignore targets that occurred in fewer games
+        :return: list of `(target, games, miss_rate, mean_guesses)` tuples
+        """
+        rows = []
+        for target, (games, solved, total) in self.targets.get(length, {}).items():
+            if games >= min_games:
+                rows.append((target, games, 1 - solved / games, total / games))
+        rows.sort(key=lambda row: (-row[2], -row[3], row[0]))
+        return rows[:n]
+
+    def summary(self, n_hardest: int = 10, min_games: int = 1) -> dict:
+        """Summarize the statistics for every word length."""
+        res = {}
+        lengths = set(self.games) | set(self.invalid)
+        for length in sorted(lengths, key=lambda _: (_ is None, _ or 0)):
+            guesses = self.guesses.get(length, Counter())
+            n_won = sum(guesses.values())
+            mean_guesses = (
+                sum(k * v for k, v in guesses.items()) / n_won if n_won > 0 else None
+            )
+            res[str(length)] = {
+                "games": self.games[length],
+                "invalid": self.invalid[length],
+                "win_rate": self.win_rate(length) if self.games[length] else None,
+                "mean_guesses": mean_guesses,
+                "guess_distribution": {str(k): guesses[k] for k in sorted(guesses)},
+                "hardest": self.hardest(length, n_hardest, min_games),
+            }
+        return res
+
+
+def analyze(
+    paths: Union[str, Sequence[str]], verify: bool = True, batch_size: int = 4096
+) -> GameStats:
+    """Stream the games in one or more logs and aggregate their results.
+
+    :param paths: log file or files
+    :param verify: whether to re-check the recorded feedback; see `verify_games`
+    :param batch_size: number of games verified at once
+    """
+    stats = GameStats()
+    records = read_games(paths)
+    if verify:
+        for record, ok in verify_games(records, batch_size=batch_size):
+            stats.add(record, ok)
+    else:
+        for record in records:
+            stats.add(record)
+    return stats
+
+
+def _collect_feedback(
+    record: dict,
+    idx: int,
+    game_idxs: list,
+    guesses: list,
+    targets: list,
+    feedback: list,
+):
+    """Append the guesses of a game, with their targets and feedback, to the given
+    lists, and `idx` to `game_idxs` for each of them."""
+    crt_targets = record["targets"]
+    crt_guesses = record["guesses"]
+    crt_feedback = record["feedback"]
+    if len(crt_feedback) != len(crt_guesses):
+        raise ValueError("feedback does not match guesses.")
+
+    n = len(crt_guesses)
+    if len(crt_targets) == 1 and not any(isinstance(_, list) for _ in crt_feedback):
+        game_idxs.extend(n * [idx])
+        guesses.extend(crt_guesses)
+        targets.extend(n * crt_targets)
+        feedback.extend(crt_feedback)
+    else:
+        # multi-board game, with feedback for each board that was not yet solved
+        for guess, res in zip(crt_guesses, crt_feedback):
+            if len(res) != len(crt_targets):
+                raise ValueError("feedback does not match targets.")
+            for target, board_res in zip(crt_targets, res):
+                if board_res is not None:
+                    game_idxs.append(idx)
+                    guesses.append(guess)
+                    targets.append(target)
+                    feedback.append(board_res)
+
+
+def _encode_checked(
+    items: list, length: int, table: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert strings of the given length to a matrix using a byte lookup table.
+
+    :param items: the strings
+    :param length: expected length of every string
+    :param table: lookup table from bytes to values, with -1 marking invalid bytes
+    :return: tuple `(valid, matrix)`, where `valid` marks the items that are strings of
+        the right length made only of valid bytes, and `matrix` has shape
+        `(len(items), length)`; rows of invalid items contain arbitrary valid values
+    """
+    valid = np.array(
+        [isinstance(_, str) and len(_) == length for _ in items], dtype=bool
+    )
+    if not np.all(valid):
+        placeholder = chr(int(np.argmax(table >= 0))) * length
+        items = [_ if v else placeholder for _, v in zip(items, valid)]
+
+    data = "".join(items).encode("ascii", "replace")
+    values = table[np.frombuffer(data, dtype=np.uint8)].reshape(len(items), length)
+    valid &= np.all(values >= 0, axis=1)
+    return valid, np.maximum(values, 0).astype(np.uint8)
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    else:
+        return open(path, mode)
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(description="Analyze Clonle game logs")
+    parser.add_argument("logs", nargs="+", help="game log files")
+    parser.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="don't re-check the feedback recorded in the logs",
+    )
+    parser.add_argument(
+        "--hardest", default=10, type=int, help="number of hardest words to show"
+    )
+    parser.add_argument(
+        "--min-games",
+        default=1,
+        type=int,
+        help="only rank words that were the target in at least this many games",
+    )
+    parser.add_argument(
+        "--batch-size", default=4096, type=int, help="number of games verified at once"
+    )
+    parser.add_argument("--json", help="also save the summary as JSON to this file")
+
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    t0 = time.perf_counter()
+    stats = analyze(args.logs, verify=not args.no_verify, batch_size=args.batch_size)
+    summary = stats.summary(n_hardest=args.hardest, min_games=args.min_games)
+    duration = time.perf_counter() - t0
+
+    n_games = sum(stats.games.values()) + sum(stats.invalid.values())
+    print(f"Analyzed {n_games} games in {duration:.1f} seconds.")
+    for length, crt in summary.items():
+        print()
+        print(f"{length} letters: {crt['games']} games", end="")
+        if crt["invalid"]:
+            print(f" ({crt['invalid']} more failed verification)", end="")
+        print()
+        if crt["games"] == 0:
+            continue
+        print(f"  win rate: {100 * crt['win_rate']:.1f}%")
+        if crt["mean_guesses"] is not None:
+            print(f"  mean guesses when won: {crt['mean_guesses']:.2f}")
+        for k, n in crt["guess_distribution"].items():
+            print(f"  {k:>3s} guesses: {n}")
+        if crt["hardest"]:
+            print("  hardest words:")
+            for target, games, miss_rate, mean_guesses in crt["hardest"]:
+                print(
+                    f"    {target}: missed {100 * miss_rate:.0f}% of {games} games, "
+                    f"{mean_guesses:.1f} guesses on average"
+                )
+
+    if args.json is not None:
+        with open(args.json, "wt") as f:
+            json.dump(summary, f, indent=2)
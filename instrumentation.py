@@ -0,0 +1,171 @@
+""" Lightweight timing counters for the hot paths of the game. """
+
+import contextlib
+import functools
+import json
+import time
+
+from typing import Callable, Optional
+
+# durations are histogrammed in powers of two of nanoseconds
+_N_BUCKETS = 64
+
+
+class Timer:
+    """Timing statistics for one operation.
+
+    Attributes:
+        count: number of calls
+        total: total time, in seconds
+        min: shortest call, in seconds
+        max: longest call, in seconds
+        buckets: histogram of durations; bucket `k` counts calls that took between
+            `2 ** (k - 1)` and `2 ** k` nanoseconds
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * _N_BUCKETS
+
+    def add(self, duration_ns: int):
+        """Record a call that took `duration_ns` nanoseconds."""
+        seconds = 1e-9 * duration_ns
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(max(duration_ns, 0).bit_length(), _N_BUCKETS - 1)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile of the call duration, in seconds, from the histogram.
+
+        This returns the upper edge of the bucket containing the percentile, capped at
+        the longest call.
+        """
+        if self.count == 0:
+            return float("nan")
+        threshold = q / 100 * self.count
+        cumulative = 0
+        for k, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= threshold and n > 0:
+                return min(1e-9 * 2**k, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Summarize the statistics, with times in microseconds."""
+        if self.count == 0:
+            return {"count": 0}
+        histogram = {
+            f"<{2**k / 1000:g}": n for k, n in enumerate(self.buckets) if n > 0
+        }
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_us": 1e6 * self.total / self.count,
+            "min_us": 1e6 * self.min,
+            "p50_us": 1e6 * self.percentile(50),
+            "p99_us": 1e6 * self.percentile(99),
+            "max_us": 1e6 * self.max,
+            "histogram_us": histogram,
+        }
+
+
+class Stats:
+    """A collection of named timers that can be switched on and off.
+
+    Instrumentation is disabled by default, in which case timed functions only pay
+    for checking the `enabled` flag.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Forget all recorded timings."""
+        self.timers = {}
+
+    def record(self, name: str, duration_ns: int):
+        """Record a call of the operation `name` that took `duration_ns`
+        nanoseconds."""
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = Timer()
+        timer.add(duration_ns)
+
+    @contextlib.contextmanager
+    def timer(self, name: str):
+        """Time the enclosed block, if instrumentation is enabled."""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - t0)
+
+    def summary(self) -> dict:
+        """Summarize all timers; see `Timer.summary()`."""
+        return {name: self.timers[name].summary() for name in sorted(self.timers)}
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Convert the summary to JSON, optionally writing it to a file.
+
+        :param path: where to write the JSON
+        :return: the JSON string
+        """
+        text = json.dumps(self.summary(), indent=2)
+        if path is not None:
+            with open(path, "wt") as f:
+                f.write(text + "\n")
+        return text
+
+    def report(self) -> str:
+        """Format the summary as a table."""
+        lines = [
+            f"{'operation':<30s} {'count':>8s} {'mean us':>10s} {'p99 us':>10s} "
+            f"{'total ms':>10s}"
+        ]
+        for name, timer in sorted(self.timers.items()):
+            lines.append(
+                f"{name:<30s} {timer.count:8d} {1e6 * timer.total / timer.count:10.1f} "
+                f"{1e6 * timer.percentile(99):10.1f} {1e3 * timer.total:10.2f}"
+            )
+        return "\n".join(lines)
+
+
+# process-wide statistics used by `timed`
+stats = Stats()
+
+
+def timed(name: str) -> Callable:
+    """Decorator that records the duration of every call in `stats` under `name`,
+    when instrumentation is enabled."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not stats.enabled:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.record(name, time.perf_counter_ns() - t0)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,199 @@
+""" Letter and position statistics over a set of words. """
+
+import numpy as np
+
+from typing import Optional
+
+from candidates import ALPHABET_SIZE, CandidateSet
+from dictionary import WordList
+
+
+class LetterStats:
+    """Counts of letters by position, and of letters and letter pairs by word, for a
+    subset of a word list.
+
+    Every statistic comes in two versions: plain word counts, and sums of word
+    frequencies (with unknown frequencies counting as zero). The subset can be shrunk
+    with `update()`, for instance to follow the candidates of a game; this only
+    processes the words that are removed, or the ones that are kept if there are fewer
+    of those.
+
+    :param word_list: the words
+    :param mask: boolean array selecting the words to include; by default, all words
+
+    Attributes:
+        mask: np.ndarray
+            Boolean array marking the words that are included.
+        n_words: int
+            Number of included words.
+        total_weight: float
+            Total frequency of the included words.
+        position_counts: np.ndarray
+            Array of shape `(length, 26)`; `position_counts[i, c]` is the number of
+            words with letter `c` at position `i`.
+        position_weights: np.ndarray
+            Like `position_counts`, but summing word frequencies.
+        letter_counts: np.ndarray
+            Number of words containing each letter at least once.
+        letter_weights: np.ndarray
+            Like `letter_counts`, but summing word frequencies.
+        pair_counts: np.ndarray
+            Array of shape `(26, 26)`; `pair_counts[c, d]` is the number of words
+            containing both letters `c` and `d`. The diagonal equals `letter_counts`.
+        pair_weights: np.ndarray
+            Like `pair_counts`, but summing word frequencies.
+    """
+
+    def __init__(self, word_list: WordList, mask: Optional[np.ndarray] = None):
+        self.word_list = word_list
+        self.length = word_list.length
+        self.weights = np.nan_to_num(np.asarray(word_list.freq, dtype=float))
+
+        length = self.length
+        self.n_words = 0
+        self.total_weight = 0.0
+        self.position_counts = np.zeros((length, ALPHABET_SIZE), dtype=np.int64)
+        self.position_weights = np.zeros((length, ALPHABET_SIZE))
+        self.letter_counts = np.zeros(ALPHABET_SIZE, dtype=np.int64)
+        self.letter_weights = np.zeros(ALPHABET_SIZE)
+        self.pair_counts = np.zeros((ALPHABET_SIZE, ALPHABET_SIZE), dtype=np.int64)
+        self.pair_weights = np.zeros((ALPHABET_SIZE, ALPHABET_SIZE))
+
+        if mask is None:
+            mask = np.ones(len(word_list), dtype=bool)
+        self.mask = np.array(mask, dtype=bool)
+        self._accumulate(np.flatnonzero(self.mask), 1)
+
+    @classmethod
+    def from_candidates(cls, candidates: CandidateSet) -> "LetterStats":
+        """Statistics for the words in a candidate set."""
+        return cls(candidates.word_list, _candidate_mask(candidates))
+
+    def update(self, mask: np.ndarray):
+        """Keep only the words that are also selected by `mask`.
+
+        :param mask: boolean array with one element for each word in the word list
+        """
+        removed = np.flatnonzero(self.mask & ~mask)
+        if len(removed) == 0:
+            return
+
+        self.mask &= mask
+        if 2 * len(removed) <= self.n_words:
+            self._accumulate(removed, -1)
+        else:
+            # fewer words are left than were removed, so start over from those
+            self._reset()
+            self._accumulate(np.flatnonzero(self.mask), 1)
+
+    def update_from_candidates(self, candidates: CandidateSet):
+        """Keep only the words that are in a candidate set."""
+        self.update(_candidate_mask(candidates))
+
+    def position_distribution(self, weighted: bool = False) -> np.ndarray:
+        """Distribution of letters at each position.
+
+        :param weighted: if true, weigh each word by its frequency
+        :return: array of shape `(length, 26)` whose rows sum to 1 (or 0 if no words
+            are included)
+        """
+        values = self.position_weights if weighted else self.position_counts
+        total = self.total_weight if weighted else self.n_words
+        return values / total if total > 0 else np.zeros(values.shape)
+
+    def letter_distribution(self, weighted: bool = False) -> np.ndarray:
+        """Fraction of words that contain each letter.
+
+        :param weighted: if true, weigh each word by its frequency
+        """
+        values = self.letter_weights if weighted else self.letter_counts
+        total = self.total_weight if weighted else self.n_words
+        return values / total if total > 0 else np.zeros(values.shape)
+
+    def pair_distribution(self, weighted: bool = False) -> np.ndarray:
+        """Fraction of words that contain each pair of letters.
+
+        :param weighted: if true, weigh each word by its frequency
+        """
+        values = self.pair_weights if weighted else self.pair_counts
+        total = self.total_weight if weighted else self.n_words
+        return values / total if total > 0 else np.zeros(values.shape)
+
+    def most_common(
+        self, n: int = 5, position: Optional[int] = None, weighted: bool = False
+    ) -> list:
+        """Find the most common letters, overall or at a given position.
+
+        :param n: number of letters to return
+        :param position: if provided, rank letters by how often they occur at this
+            position; otherwise, by how many words contain them
+        :param weighted: if true, weigh each word by its frequency
+        :return: list of letters, most common first
+        """
+        if position is None:
+            values = self.letter_weights if weighted else self.letter_counts
+        else:
+            values = (self.position_weights if weighted else self.position_counts)[
+                position
+            ]
+        order = np.argsort(-values, kind="stable")[:n]
+        return [chr(ord("a") + _) for _ in order if values[_] > 0]
+
+    def _accumulate(self, idxs: np.ndarray, sign: int):
+        """Add (`sign = 1`) or subtract (`sign = -1`) the statistics of the given
+        words."""
+        if len(idxs) == 0:
+            return
+
+        matrix = np.asarray(self.word_list.matrix[idxs])
+        weights = self.weights[idxs]
+        n, length = matrix.shape
+
+        # a single bincount over position-letter pairs gives all the positional counts
+        flat = (ALPHABET_SIZE * np.arange(length) + matrix).ravel()
+        size = length * ALPHABET_SIZE
+        position_counts = np.bincount(flat, minlength=size)
+        position_weights = np.bincount(
+            flat, weights=np.repeat(weights, length), minlength=size
+        )
+
+        presence = np.zeros((n, ALPHABET_SIZE))
+        presence[np.arange(n)[:, None], matrix] = 1
+
+        self.n_words += sign * n
+        self.total_weight += sign * weights.sum()
+        self.position_counts += sign * position_counts.reshape(length, ALPHABET_SIZE)
+        self.position_weights += sign * position_weights.reshape(length, ALPHABET_SIZE)
+        self.letter_counts += sign * presence.sum(axis=0).astype(np.int64)
+        self.letter_weights += sign * (weights @ presence)
+        self.pair_counts += sign * np.rint(presence.T @ presence).astype(np.int64)
+        self.pair_weights += sign * ((presence * weights[:, None]).T @ presence)
+
+    def _reset(self):
+        self.n_words = 0
+        self.total_weight = 0.0
+        for values in [
+            self.position_counts,
+            self.position_weights,
+            self.letter_counts,
+            self.letter_weights,
+            self.pair_counts,
+            self.pair_weights,
+        ]:
+            values[:] = 0
+
+    def __len__(self) -> int:
+        return self.n_words
+
+    def __repr__(self) -> str:
+        return (
+            f"LetterStats("
+            f"length={self.length}, "
+            f"n_words={self.n_words}, "
+            f"total_weight={self.total_weight}"
+            f")"
+        )
+
+
+def _candidate_mask(candidates: CandidateSet) -> np.ndarray:
+    return np.unpackbits(candidates.bits, count=candidates.masks.n_words).astype(bool)
@@ -0,0 +1,285 @@
+""" Play several boards at once, in the style of Quordle and Octordle. """
+
+import time
+
+import numpy as np
+
+from string import ascii_lowercase
+from typing import List, Optional, Sequence, Union
+
+from backend import ClonleBackend, ClonleState, GameOverError, NotInitializedError
+from candidates import ALPHABET_SIZE, CandidateMasks, CandidateSet
+from instrumentation import timed
+from scoring import (
+    FEEDBACK_SYMBOLS,
+    LOCATED,
+    MISS,
+    encode_words,
+    feedback_digits,
+    score_guess,
+    solved_code,
+)
+
+# letter states as stored in `MultiBoardBackend.states`
+_STATE_BY_VALUE = {_.value: _ for _ in ClonleState}
+_UNKNOWN = ClonleState.UNKNOWN.value
+_CONTAINED = ClonleState.CONTAINED.value
+_LOCATED = ClonleState.LOCATED.value
+_MISSING = ClonleState.MISSING.value
+
+_SYMBOLS = np.frombuffer(FEEDBACK_SYMBOLS.encode("ascii"), dtype=np.uint8)
+
+
+class MultiBoardBackend(ClonleBackend):
+    """A game with several targets, each on its own board.
+
+    Every attempt is played on all the boards that are not yet solved, and the game is
+    won when all boards are solved. Each guess is scored against all the unsolved
+    targets at once.
+
+    :param database: word database; see `ClonleBackend`
+    :param length: word length
+    :param n_boards: number of boards
+    :param max_attempts: maximum number of attempts; by default, `n_boards + 5`
+    :param kwargs: other arguments are passed to `ClonleBackend`
+
+    Attributes:
+        targets: list or None
+            Target for each board. Set to `None` before `start()`.
+        solved: np.ndarray or None
+            Whether each board is solved. Set to `None` before `start()`.
+        solved_at: np.ndarray or None
+            Number of attempts needed to solve each board, or 0 for unsolved boards.
+            Set to `None` before `start()`.
+        states: np.ndarray or None
+            Array of shape `(n_boards, 26)` giving the value of the `ClonleState` of
+            each letter on each board. Set to `None` before `start()`.
+        history: list or None
+            List of `(word, feedback)` pairs, where `feedback` is a list with the
+            feedback string for each board, or `None` for boards that were already
+            solved. Set to `None` before `start()`.
+    """
+
+    def __init__(
+        self,
+        database,
+        length: int,
+        n_boards: int = 4,
+        max_attempts: Optional[int] = None,
+        **kwargs,
+    ):
+        if n_boards < 1:
+            raise ValueError("need at least one board.")
+        if kwargs.get("hard_mode") is not None:
+            raise ValueError("hard mode is not supported with several boards.")
+        self.n_boards = n_boards
+        if max_attempts is None:
+            max_attempts = n_boards + 5
+
+        self.targets = None
+        self.solved = None
+        self.solved_at = None
+        self.states = None
+        self._board_history = None
+        self._target_matrix = None
+        self._board_candidates = None
+
+        super().__init__(database, length, max_attempts=max_attempts, **kwargs)
+
+    @timed("backend.start")
+    def start(
+        self,
+        target_frequency_cutoff: Optional[float] = None,
+        target_n_cutoff: Optional[int] = None,
+        targets: Optional[Sequence[str]] = None,
+        weighted: bool = False,
+    ):
+        """Start a new game.
+
+        This chooses a different target for each board. The parameters have the same
+        meaning as for `ClonleBackend.start()`, except that `targets` should contain
+        one word for each board.
+        """
+        if targets is not None:
+            if len(targets) != self.n_boards:
+                raise ValueError(f"need {self.n_boards} targets, got {len(targets)}.")
+            if any(_ not in self._word_index for _ in targets):
+                raise ValueError("target word not in dictionary.")
+
+        self.attempts = 0
+        self.start_time = time.time()
+        self.guess_times = []
+        self._board_history = []
+        self.n_targets = self._n_targets(target_frequency_cutoff, target_n_cutoff)
+        if targets is None:
+            targets = self._select_targets(self.n_targets, weighted)
+        self.targets = list(targets)
+
+        self._target_matrix = encode_words(self.targets, self.length)
+        self._target_counts = np.zeros((self.n_boards, ALPHABET_SIZE), dtype=np.int8)
+        for i in range(self.length):
+            np.add.at(
+                self._target_counts,
+                (np.arange(self.n_boards), self._target_matrix[:, i]),
+                1,
+            )
+
+        self.solved = np.zeros(self.n_boards, dtype=bool)
+        self.solved_at = np.zeros(self.n_boards, dtype=int)
+        self.states = np.full((self.n_boards, ALPHABET_SIZE), _UNKNOWN, dtype=np.int8)
+        self._board_candidates = [None] * self.n_boards
+
+    @timed("backend.attempt")
+    def attempt(self, word: str) -> List[Optional[str]]:
+        """Attempt a word on all unsolved boards.
+
+        :param word: word to test; should be length `self.length`.
+        :return: list with the feedback for each board (see `ClonleBackend.attempt()`),
+            or `None` for boards that were solved earlier
+        """
+        if self.targets is None:
+            raise NotInitializedError("attempt() called before start()")
+        if np.all(self.solved):
+            raise GameOverError("all boards solved.")
+        self._check_attempt(word)
+
+        active = np.flatnonzero(~self.solved)
+        guess = encode_words([word], self.length)
+        codes = score_guess(
+            guess[0], self._target_matrix[active], self._target_counts[active]
+        )
+        digits = feedback_digits(codes, self.length)
+        self._update_states(guess[0], active, digits)
+
+        # convert all the feedback to strings at once
+        data = _SYMBOLS[digits].tobytes().decode("ascii")
+        res = [None] * self.n_boards
+        for k, board in enumerate(active.tolist()):
+            res[board] = data[k * self.length : (k + 1) * self.length]
+            if self._board_candidates[board] is not None:
+                self._board_candidates[board].update(guess[0], int(codes[k]))
+
+        self.attempts += 1
+        newly_solved = active[codes == solved_code(self.length)]
+        self.solved[newly_solved] = True
+        self.solved_at[newly_solved] = self.attempts
+
+        self._board_history.append((word, res))
+        self.guess_times.append(time.time() - self.start_time)
+        if self.game_log is not None and self.is_over:
+            self.game_log.record_game(self)
+        return res
+
+    @property
+    def history(self) -> Optional[list]:
+        """List of `(word, feedback)` pairs, where `feedback` has one entry per
+        board."""
+        return self._board_history
+
+    @property
+    def is_over(self) -> bool:
+        """Whether the game is over, either because all boards are solved or because
+        the maximum number of attempts was reached."""
+        if self.targets is None:
+            return False
+        return bool(np.all(self.solved)) or self.attempts >= self.max_attempts
+
+    def get_state(self, board: Optional[int] = None) -> Union[dict, list]:
+        """Return the current information state.
+
+        :param board: which board to return the state for
+        :return: a dictionary in which each letter is mapped to one of the `ClonleState`
+            options; if `board` is not provided, a list with a dictionary for each board
+        """
+        if self.states is None:
+            raise NotInitializedError("get_state() called before start()")
+        if board is None:
+            return [self.get_state(_) for _ in range(self.n_boards)]
+
+        values = self.states[board].tolist()
+        return {ch: _STATE_BY_VALUE[v] for ch, v in zip(ascii_lowercase, values)}
+
+    def board_candidates(self, board: int) -> CandidateSet:
+        """The words that are consistent with all the feedback on a board.
+
+        The candidate set is created on first access and afterwards updated
+        incrementally by `attempt()`.
+        """
+        if self.history is None:
+            raise NotInitializedError("candidates accessed before start()")
+
+        if self._board_candidates[board] is None:
+            if self._candidate_masks is None:
+                self._candidate_masks = CandidateMasks(self.database.matrix)
+            cands = CandidateSet(self.database, self._candidate_masks)
+            for word, res in self.history:
+                if res[board] is not None:
+                    cands.update(word, res[board])
+            self._board_candidates[board] = cands
+
+        return self._board_candidates[board]
+
+    @property
+    def candidates(self):
+        raise AttributeError("use board_candidates() for multi-board games.")
+
+    def _update_states(self, guess: np.ndarray, active: np.ndarray, digits: np.ndarray):
+        """Update the letter states of the active boards, following the same rules as
+        `ClonleBackend`.
+
+        :param guess: encoded guess
+        :param active: indices of the boards that were played
+        :param digits: feedback digits for each active board, shape
+            `(len(active), length)`; see `scoring.feedback_digits`
+        """
+        # same[i, j] is true if guess letters i and j are equal
+        same = (guess[:, None] == guess[None, :]).astype(np.int16)
+        n_exact = (digits == LOCATED).astype(np.int16) @ same
+        any_found = (digits != MISS).astype(np.int16) @ same > 0
+        count = self._target_counts[active][:, guess]
+
+        # repeated letters get identical values, so the assignment below is consistent
+        crt = self.states[active][:, guess]
+        crt = np.where(any_found & (crt != _LOCATED), _CONTAINED, crt)
+        crt = np.where(n_exact == count, _LOCATED, crt)
+        crt = np.where(count == 0, _MISSING, crt)
+        self.states[active[:, None], guess[None, :]] = crt
+
+    def _snapshot_targets(self) -> list:
+        return self.targets
+
+    def _start_from_snapshot(self, n_targets: int, targets: list):
+        self.start(target_n_cutoff=n_targets, targets=targets)
+
+    def _select_targets(self, n: int, weighted: bool) -> list:
+        """Select a different target for each board among the first `n` words."""
+        if n < self.n_boards:
+            raise ValueError(f"only {n} possible targets for {self.n_boards} boards.")
+
+        p = None
+        if weighted:
+            # same weights as `TargetSampler`: unknown frequencies count as zero, and
+            # if all the weights vanish, all words are equally likely
+            freq = np.nan_to_num(np.asarray(self.database.freq[:n], dtype=float))
+            n_nonzero = np.count_nonzero(freq)
+            if n_nonzero > 0:
+                if n_nonzero < self.n_boards:
+                    raise ValueError(
+                        f"only {n_nonzero} possible targets with non-zero frequency "
+                        f"for {self.n_boards} boards."
+                    )
+                p = freq / np.sum(freq)
+
+        idxs = self.rng.choice(n, size=self.n_boards, replace=False, p=p)
+        return [self.database.word(int(_)) for _ in idxs]
+
+    def __str__(self):
+        n_solved = int(np.sum(self.solved)) if self.solved is not None else None
+        return (
+            f"MultiBoardBackend("
+            f"length={self.length}, "
+            f"n_boards={self.n_boards}, "
+            f"solved={n_solved}, "
+            f"attempts={self.attempts} / {self.max_attempts}"
+            f")"
+        )
@@ -0,0 +1,87 @@
+""" Build, cache, and memory-map guess x target feedback-pattern tables. """
+
+import hashlib
+import os
+
+import numpy as np
+
+from typing import Sequence
+
+from scoring import encode_words, score_matrix
+
+
+def dictionary_hash(guesses: Sequence[str], targets: Sequence[str]) -> str:
+    """Return a hash identifying a pair of guess and target word lists.
+
+    The hash changes whenever the words or their order change, which is what a cached
+    pattern table depends on.
+    """
+    hasher = hashlib.sha1()
+    for words in (guesses, targets):
+        hasher.update(str(len(words)).encode("ascii") + b":")
+        hasher.update("".join(words).encode("ascii"))
+    return hasher.hexdigest()
+
+
+def pattern_table_path(cache_dir: str, length: int, n_targets: int, key: str) -> str:
+    """Return the file name used to cache a pattern table."""
+    return os.path.join(cache_dir, f"patterns_{length}_{n_targets}_{key[:16]}.npy")
+
+
+def build_pattern_table(
+    guesses: Sequence[str], targets: Sequence[str], chunk_size: int = 256
+) -> np.ndarray:
+    """Calculate the feedback code for every guess and every target.
+
+    :param guesses: list of guess words, all of the same length
+    :param targets: list of target words, same length as `guesses`
+    :param chunk_size: number of guesses to score at once
+    :return: array of shape `(len(guesses), len(targets))`, with the smallest
+        unsigned integer type that fits `3 ** length` codes (`uint8` up to length 5)
+    """
+    length = len(guesses[0]) if len(guesses) > 0 else len(targets[0])
+    return score_matrix(
+        encode_words(guesses, length),
+        encode_words(targets, length),
+        chunk_size=chunk_size,
+    )
+
+
+def load_pattern_table(
+    guesses: Sequence[str],
+    targets: Sequence[str],
+    cache_dir: str = "save",
+    rebuild: bool = False,
+) -> np.ndarray:
+    """Load a pattern table from the cache, building it if necessary.
+
+    The cache is keyed by `dictionary_hash(guesses, targets)`, so a change in the
+    dictionary automatically triggers a rebuild. Tables for other dictionaries are left
+    alone, since they may belong to other games or processes sharing `cache_dir`; old
+    tables can simply be deleted by hand.
+
+    :param guesses: list of guess words
+    :param targets: list of target words
+    :param cache_dir: folder where to store the table
+    :param rebuild: if true, rebuild the table even if a cached version exists
+    :return: the pattern table (see `build_pattern_table`), memory-mapped read-only
+    """
+    length = len(guesses[0]) if len(guesses) > 0 else len(targets[0])
+    key = dictionary_hash(guesses, targets)
+    path = pattern_table_path(cache_dir, length, len(targets), key)
+
+    if not rebuild and os.path.exists(path):
+        table = np.load(path, mmap_mode="r")
+        if table.shape == (len(guesses), len(targets)):
+            return table
+
+    table = build_pattern_table(guesses, targets)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temporary file first so that readers never see a partial table
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp_path, path)
+
+    return np.load(path, mmap_mode="r")
@@ -0,0 +1,137 @@
+""" Look up words by prefix, for completion and early rejection of typos. """
+
+import bisect
+
+import numpy as np
+
+from typing import Optional, Tuple
+
+from scoring import decode_words
+
+# letter-state values, as in `backend.ClonleState`
+_MISSING = -1
+_CONTAINED = 1
+_LOCATED = 2
+
+# sorts after every lowercase letter, so `prefix + _END` bounds all words with `prefix`
+_END = "{"
+
+
+class PrefixIndex:
+    """An alphabetically sorted copy of a word list, searched with `bisect`.
+
+    All the words starting with a given prefix form a contiguous range, which is found
+    in `O(log n)` time. Filtering by letter state uses a list of consistent words that
+    is only recomputed when the states change, so lookups stay `O(log n)` as well.
+
+    :param matrix: encoded words, shape `(n_words, length)`; see `scoring.encode_words`
+
+    Attributes:
+        words: list
+            The words, in alphabetical order.
+        order: np.ndarray
+            Position in the original word list of each word in `words`.
+        letter_masks: np.ndarray
+            Bitmask of the letters contained in each word in `words`, with bit `c` set
+            if the word contains letter `c`.
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        self.order = np.lexsort(matrix.T[::-1])
+        sorted_matrix = matrix[self.order]
+        self.words = decode_words(sorted_matrix) if len(matrix) > 0 else []
+        self.letter_masks = np.bitwise_or.reduce(
+            np.left_shift(np.uint32(1), sorted_matrix.astype(np.uint32)), axis=1
+        )
+        self._filter = None
+
+    def span(self, prefix: str) -> Tuple[int, int]:
+        """Find the range of positions in `words` of the words starting with
+        `prefix`."""
+        lo = bisect.bisect_left(self.words, prefix)
+        hi = bisect.bisect_left(self.words, prefix + _END, lo)
+        return lo, hi
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Check whether any word starts with `prefix`."""
+        lo = bisect.bisect_left(self.words, prefix)
+        return lo < len(self.words) and self.words[lo].startswith(prefix)
+
+    def longest_prefix(self, word: str) -> int:
+        """Find the length of the longest prefix of `word` that some word in the index
+        starts with."""
+        lo = bisect.bisect_left(self.words, word)
+        best = 0
+        # the closest words in alphabetical order share the longest prefixes
+        for i in [lo - 1, lo]:
+            if 0 <= i < len(self.words):
+                other = self.words[i]
+                n = 0
+                for a, b in zip(word, other):
+                    if a != b:
+                        break
+                    n += 1
+                best = max(best, n)
+        return best
+
+    def complete(
+        self,
+        prefix: str,
+        letter_states: Optional[np.ndarray] = None,
+        limit: Optional[int] = None,
+    ) -> list:
+        """Find the words starting with `prefix`, in alphabetical order.
+
+        :param prefix: the prefix
+        :param letter_states: if provided, only return words that contain all the
+            letters known to be in the target and none of the letters known to be
+            missing; should hold the value of the `ClonleState` of each letter (see
+            `ClonleBackend.letter_states`)
+        :param limit: maximum number of words to return
+        :return: list of words
+        """
+        lo, hi = self.span(prefix)
+        if letter_states is None:
+            return self.words[lo : hi if limit is None else min(hi, lo + limit)]
+
+        positions = self._consistent_positions(letter_states)
+        start = bisect.bisect_left(positions, lo)
+        end = bisect.bisect_left(positions, hi, start)
+        if limit is not None:
+            end = min(end, start + limit)
+        words = self.words
+        return [words[_] for _ in positions[start:end]]
+
+    def _consistent_positions(self, letter_states: np.ndarray) -> list:
+        """Find the positions in `words` of the words that are consistent with the
+        letter states.
+
+        The letter states only change after an attempt, so the result for the last
+        states is cached.
+        """
+        if not isinstance(letter_states, np.ndarray) or letter_states.dtype != np.int8:
+            letter_states = np.asarray(letter_states, dtype=np.int8)
+        key = letter_states.tobytes()
+        cached = self._filter
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        letter_states = np.frombuffer(key, dtype=np.int8)
+        bits = np.uint32(1) << np.arange(len(letter_states), dtype=np.uint32)
+        forbidden = np.bitwise_or.reduce(bits[letter_states == _MISSING])
+        found = (letter_states == _CONTAINED) | (letter_states == _LOCATED)
+        required = np.bitwise_or.reduce(bits[found])
+
+        masks = self.letter_masks
+        ok = ((masks & forbidden) == 0) & ((masks & required) == required)
+        positions = np.flatnonzero(ok).tolist()
+
+        # a single assignment, so concurrent readers always see a consistent pair
+        self._filter = (key, positions)
+        return positions
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __repr__(self) -> str:
+        return f"PrefixIndex(n_words={len(self)})"
@@ -0,0 +1,195 @@
+#! /usr/bin/env python
+""" Build a compiled dictionary from a word list and word-frequency data. """
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from typing import Dict, Iterator, Optional, Sequence
+
+from dictionary import FORMAT_VERSION, WordList, save_compiled
+from scoring import encode_words
+
+# bump this when the build procedure changes in a way that affects the output
+BUILD_VERSION = 1
+
+
+def read_word_list(path: str) -> Iterator[str]:
+    """Iterate over the words in a word list, one per line.
+
+    Lines that are not made up of letters only, like the header of the CSW list, are
+    skipped. Words are converted to lowercase.
+    """
+    with open(path, "rt") as f:
+        for line in f:
+            word = line.strip()
+            if word.isascii() and word.isalpha():
+                yield word.lower()
+
+
+def read_frequencies(path: str, counts: Dict[str, float]) -> float:
+    """Fill in the counts of the words in `counts` from a CSV file with columns "word"
+    and "count", such as the Kaggle unigram frequencies.
+
+    The file is streamed line by line, and only words that are already keys of `counts`
+    are stored.
+
+    :param path: CSV file
+    :param counts: dictionary whose keys are the words of interest; updated in place
+    :return: the total count of all the words in the file, including those that are not
+        in `counts`
+    """
+    total = 0.0
+    with open(path, "rt", newline="") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if len(row) < 2:
+                continue
+            try:
+                count = float(row[1])
+            except ValueError:
+                # header
+                continue
+
+            total += count
+            word = row[0].lower()
+            if word in counts:
+                counts[word] = count
+
+    return total
+
+
+def hash_inputs(paths: Sequence[str], lengths: Optional[Sequence[int]]) -> str:
+    """Hash the contents of the input files together with the build settings."""
+    digest = hashlib.sha256()
+    settings = {
+        "build": BUILD_VERSION,
+        "format": FORMAT_VERSION,
+        "lengths": sorted(lengths) if lengths is not None else None,
+    }
+    digest.update(json.dumps(settings).encode("utf-8"))
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def is_up_to_date(output: str, input_hash: str) -> bool:
+    """Check whether a compiled dictionary was built from inputs with the given hash."""
+    meta_name = os.path.join(output, "meta.json")
+    if not os.path.exists(meta_name):
+        return False
+    with open(meta_name, "rt") as f:
+        meta = json.load(f)
+    if meta.get("version") != FORMAT_VERSION or meta.get("inputs") != input_hash:
+        return False
+
+    for length in meta["lengths"]:
+        for prefix in ["words", "freq"]:
+            name = os.path.join(output, f"{prefix}_{int(length):02d}.npy")
+            if not os.path.exists(name):
+                return False
+    return True
+
+
+def build_dictionary(
+    word_path: str,
+    frequency_path: str,
+    output: str,
+    lengths: Optional[Sequence[int]] = None,
+    force: bool = False,
+) -> bool:
+    """Build a compiled dictionary, unless it is already up to date.
+
+    The words are taken from `word_path` and their frequencies from `frequency_path`;
+    the frequencies are normalized by the total count of *all* the words in
+    `frequency_path`. Words without frequency data get frequency `nan` and are placed
+    after all the others. Words with equal frequency keep the order of `word_path`.
+
+    :param word_path: word list, one word per line; see `read_word_list`
+    :param frequency_path: CSV file with word counts; see `read_frequencies`
+    :param output: folder for the compiled dictionary
+    :param lengths: word lengths to include; by default, all lengths
+    :param force: rebuild even if the inputs have not changed
+    :return: true if the dictionary was rebuilt
+    """
+    input_hash = hash_inputs([word_path, frequency_path], lengths)
+    if not force and is_up_to_date(output, input_hash):
+        return False
+
+    length_set = set(lengths) if lengths is not None else None
+    counts = {}
+    for word in read_word_list(word_path):
+        if length_set is None or len(word) in length_set:
+            counts[word] = np.nan
+    total = read_frequencies(frequency_path, counts)
+
+    by_length = {}
+    for word, count in counts.items():
+        by_length.setdefault(len(word), []).append((word, count))
+
+    word_lists = {}
+    for length in sorted(by_length):
+        words, crt_counts = zip(*by_length[length])
+        freq = np.array(crt_counts) / total if total > 0 else np.array(crt_counts)
+        order = np.argsort(-freq, kind="stable")
+        matrix = encode_words([words[_] for _ in order], length)
+        word_lists[length] = WordList(matrix, freq[order])
+
+    # remove the old metadata first, so an interrupted build is not taken as complete
+    meta_name = os.path.join(output, "meta.json")
+    if os.path.exists(meta_name):
+        os.remove(meta_name)
+    save_compiled(word_lists, output, meta={"inputs": input_hash})
+
+    return True
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Build a compiled dictionary from a word list and frequency data"
+    )
+    parser.add_argument(
+        "--words",
+        default=os.path.join("data", "csw_2019.txt"),
+        help="word list, one word per line",
+    )
+    parser.add_argument(
+        "--frequencies",
+        default=os.path.join("data", "unigram_freq.csv"),
+        help="CSV file with columns 'word' and 'count'",
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join("data", "dictionary"),
+        help="output folder",
+    )
+    parser.add_argument(
+        "--lengths", nargs="+", type=int, help="word lengths to include (default: all)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="rebuild even if the inputs are unchanged"
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_command_line()
+
+    print(f"Building {args.output} from {args.words} and {args.frequencies}...", end="")
+    rebuilt = build_dictionary(
+        args.words,
+        args.frequencies,
+        args.output,
+        lengths=args.lengths,
+        force=args.force,
+    )
+    print(" done." if rebuilt else " already up to date.")
@@ -0,0 +1,125 @@
+""" Share cleaned word lists between games in the same process. """
+
+import os
+import threading
+
+import numpy as np
+
+from collections import OrderedDict
+from typing import Optional
+
+from dictionary import WordList, dataframe_to_word_list, load_compiled
+from instrumentation import timed
+
+
+class DictionaryRegistry:
+    """Cache of cleaned, sorted word lists, keyed by source, word length, and frequency
+    cutoff.
+
+    Each word list is built once and then handed out to every caller. The word arrays
+    are made read-only, since they are shared. When more than `max_size` word lists
+    are cached, the least recently used one is dropped (it stays alive for as long as
+    some game still uses it).
+
+    :param max_size: maximum number of cached word lists
+
+    Attributes:
+        hits: int
+            Number of requests served from the cache.
+        misses: int
+            Number of requests that required building a word list.
+    """
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    @timed("registry.get")
+    def get(
+        self, source: str, length: int, frequency_cutoff: Optional[float] = None
+    ) -> WordList:
+        """Return the word list for a given source, word length, and cutoff.
+
+        :param source: path to either a compiled dictionary (see
+            `dictionary.compile_dictionary`) or a CSV file with columns "word" and
+            "count" or "freq"
+        :param length: word length
+        :param frequency_cutoff: words with lower frequency are dropped; see
+            `ClonleBackend`
+        """
+        key = (os.path.abspath(source), length, frequency_cutoff or None)
+        with self._lock:
+            word_list = self._entries.get(key)
+            if word_list is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return word_list
+
+            self.misses += 1
+            if frequency_cutoff:
+                # the list is sorted by frequency, so the cutoff keeps a prefix, which
+                # shares the arrays, decoded words, and index of the full list
+                full = self.get(source, length)
+                n = int(np.count_nonzero(full.freq >= frequency_cutoff))
+                word_list = full.head(n)
+            else:
+                word_list = _load_word_list(source, length)
+
+            _freeze(word_list)
+            self._entries[key] = word_list
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+            return word_list
+
+    def clear(self):
+        """Drop all cached word lists."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"DictionaryRegistry("
+            f"size={len(self)} / {self.max_size}, "
+            f"hits={self.hits}, "
+            f"misses={self.misses}"
+            f")"
+        )
+
+
+def _load_word_list(source: str, length: int) -> WordList:
+    """Load and clean the words of a given length from a compiled dictionary or a CSV
+    file."""
+    if os.path.exists(os.path.join(source, "meta.json")):
+        return load_compiled(source, length)
+    else:
+        # Pandas is slow to import, so only load it when we need to parse the CSV
+        import pandas as pd
+
+        return dataframe_to_word_list(pd.read_csv(source), length)
+
+
+def _freeze(word_list: WordList):
+    """Make the arrays of a word list read-only and build its lookup tables."""
+    word_list.matrix.flags.writeable = False
+    word_list.freq.flags.writeable = False
+    word_list.index
+    word_list.sampler
+
+
+default_registry = DictionaryRegistry()
+
+
+def get_word_list(
+    source: str, length: int, frequency_cutoff: Optional[float] = None
+) -> WordList:
+    """Return a shared word list from the process-wide registry. See
+    `DictionaryRegistry.get`."""
+    return default_registry.get(source, length, frequency_cutoff)
@@ -0,0 +1,75 @@
+""" Choose target words among the most frequent words of a dictionary. """
+
+import numpy as np
+
+from typing import Optional
+
+
+class TargetSampler:
+    """Count and sample possible targets in a frequency-sorted word list.
+
+    The possible targets are always the most frequent words, so they are described by
+    their number `n`. Finding `n` for a frequency cutoff and drawing a
+    frequency-weighted target both use binary search, so they take `O(log n)` time
+    after an `O(n)` setup.
+
+    :param freq: word frequencies, sorted in decreasing order; words with unknown (`nan`)
+        frequency should come last and are never selected by weighted sampling
+    """
+
+    def __init__(self, freq: np.ndarray):
+        # increasing order, as required by `np.searchsorted`; `nan`s stay at the end
+        self._neg_freq = -np.asarray(freq, dtype=float)
+        self._cum_freq = None
+
+    def count(
+        self, cutoff: Optional[float] = None, n_cutoff: Optional[int] = None
+    ) -> int:
+        """Find the number of possible targets.
+
+        :param cutoff: lowest frequency to consider
+        :param n_cutoff: largest number of words to consider
+        """
+        if cutoff:
+            n = int(np.searchsorted(self._neg_freq, -cutoff, side="right"))
+        else:
+            n = len(self._neg_freq)
+
+        if n_cutoff:
+            n = min(n, n_cutoff)
+        return n
+
+    def sample(self, rng: np.random.Generator, n: int, weighted: bool = False) -> int:
+        """Choose the index of a target among the first `n` words.
+
+        :param rng: random number generator
+        :param n: number of possible targets; see `count()`
+        :param weighted: if true, the probability of choosing a word is proportional to
+            its frequency; otherwise all words are equally likely
+        """
+        if n <= 0:
+            raise ValueError("no possible targets.")
+
+        if weighted:
+            cum_freq = self.cum_freq
+            total = cum_freq[n - 1]
+            if total > 0:
+                idx = np.searchsorted(cum_freq, rng.random() * total, side="right")
+                return int(min(idx, n - 1))
+
+        # this matches `pd.Series.sample`, keeping seeded target choices unchanged
+        return int(rng.choice(n, size=1, replace=False)[0])
+
+    @property
+    def cum_freq(self) -> np.ndarray:
+        """Cumulative word frequencies, with unknown frequencies counting as zero.
+        Calculated on first access."""
+        if self._cum_freq is None:
+            self._cum_freq = np.cumsum(np.nan_to_num(-self._neg_freq))
+        return self._cum_freq
+
+    def __len__(self) -> int:
+        return len(self._neg_freq)
+
+    def __repr__(self) -> str:
+        return f"TargetSampler(n_words={len(self)})"
@@ -0,0 +1,312 @@
+#! /usr/bin/env python
+""" Precomputed schedules of daily and hourly target words. """
+
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from collections import deque
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence, Union
+
+from dictionary import WordList, load_compiled
+from scoring import decode_words
+
+SCHEDULE_VERSION = 1
+PERIODS = ["daily", "hourly"]
+
+# header: magic, format version, number of tables, first day (proleptic Gregorian
+# ordinal, as in `date.toordinal()`)
+_MAGIC = b"CLSC"
+_HEADER = struct.Struct("<4sBxHI")
+# one entry per table: period index, word length, number of possible targets, number
+# of slots, no-repeat window, offset of the words from the start of the file
+_ENTRY = struct.Struct("<BBIIIQ")
+
+
+def draw_schedule(
+    n_targets: int, n_slots: int, window: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Draw a sequence of targets in which no target repeats within `window` slots.
+
+    Each target is chosen uniformly among those that were not used in the previous
+    `window` slots. The targets that are not blocked are kept in a list, and a chosen
+    target is swapped with the one whose block expires, so each slot takes `O(1)`
+    time.
+
+    :param n_targets: number of possible targets
+    :param n_slots: length of the sequence
+    :param window: a target used in slot `i` is not used again in slots `i + 1` to
+        `i + window`; must be smaller than `n_targets`
+    :param rng: random number generator
+    :return: array of target indices, each between 0 and `n_targets - 1`
+    """
+    if not 0 <= window < n_targets:
+        raise ValueError("window should be non-negative and less than n_targets.")
+
+    available = list(range(n_targets))
+    recent = deque()
+    draws = rng.random(n_slots).tolist()
+    res = np.empty(n_slots, dtype=np.int64)
+    for t, u in enumerate(draws):
+        i = int(u * len(available))
+        chosen = available[i]
+        res[t] = chosen
+
+        recent.append(chosen)
+        if len(recent) > window:
+            # the oldest blocked target becomes available again
+            available[i] = recent.popleft()
+        else:
+            available[i] = available[-1]
+            available.pop()
+
+    return res
+
+
+def build_schedule(
+    word_lists: Dict[int, WordList],
+    path: str,
+    start: date,
+    n_days: int,
+    periods: Sequence[str] = PERIODS,
+    n_targets: int = 3000,
+    window: int = 365,
+    seed: int = 0,
+):
+    """Precompute the targets for every day or hour in a range and save them.
+
+    The schedule file holds the words themselves, so that looking up a target does not
+    require loading the dictionary. Each length and period uses its own random stream
+    derived from `seed`, so the same inputs always give the same schedule.
+
+    :param word_lists: dictionary mapping word lengths to word lists sorted by
+        decreasing frequency
+    :param path: output file
+    :param start: first day in the schedule
+    :param n_days: number of days in the schedule
+    :param periods: which schedules to build: "daily", "hourly", or both
+    :param n_targets: the targets are chosen among this many top-frequency words; see
+        `ClonleBackend.start()`
+    :param window: no target repeats within this many days (for the daily schedule)
+        or hours (for the hourly one); reduced if there are not enough targets
+    :param seed: random seed
+    """
+    tables = []
+    for period in periods:
+        if period not in PERIODS:
+            raise ValueError(f"unknown period '{period}'.")
+        period_idx = PERIODS.index(period)
+        n_slots = n_days if period == "daily" else 24 * n_days
+        for length, word_list in sorted(word_lists.items()):
+            crt_n_targets = word_list.sampler.count(None, n_targets)
+            crt_window = min(window, crt_n_targets - 1)
+            rng = np.random.default_rng([seed, length, period_idx])
+            idxs = draw_schedule(crt_n_targets, n_slots, crt_window, rng)
+            # encoded letters are 0-25, stored as ASCII
+            words = np.asarray(word_list.matrix[:crt_n_targets])[idxs] + ord("a")
+            entry = (period_idx, length, crt_n_targets, n_slots, crt_window)
+            tables.append((entry, words.astype(np.uint8).tobytes()))
+
+    offset = _HEADER.size + len(tables) * _ENTRY.size
+    header = _HEADER.pack(_MAGIC, SCHEDULE_VERSION, len(tables), start.toordinal())
+    entries = []
+    for entry, data in tables:
+        entries.append(_ENTRY.pack(*entry, offset))
+        offset += len(data)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"".join(entries))
+        for _, data in tables:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+class Schedule:
+    """A target schedule saved by `build_schedule()`.
+
+    Only the small index at the start of the file is read on creation; each lookup
+    then reads a single word from the file. Days and hours are taken in local time,
+    so every machine in the same time zone using the same file agrees on the target.
+
+    :param path: schedule file
+
+    Attributes:
+        start: date
+            First day in the schedule.
+        tables: dict
+            Dictionary mapping `(period, length)` pairs to tuples `(n_targets, n_slots,
+            window, offset)`, where `n_targets` is the number of top-frequency words
+            the targets were drawn from, and `window` is the number of slots within
+            which no target repeats.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            data = f.read(_HEADER.size)
+            if len(data) < _HEADER.size:
+                raise ValueError("schedule file too short.")
+            magic, version, n_tables, start = _HEADER.unpack(data)
+            if magic != _MAGIC:
+                raise ValueError("not a Clonle schedule.")
+            if version != SCHEDULE_VERSION:
+                raise ValueError(f"unsupported schedule version {version}.")
+
+            data = f.read(n_tables * _ENTRY.size)
+            if len(data) < n_tables * _ENTRY.size:
+                raise ValueError("schedule file too short.")
+
+        self.start = date.fromordinal(start)
+        self.tables = {}
+        for entry in _ENTRY.iter_unpack(data):
+            period_idx, length = entry[:2]
+            self.tables[PERIODS[period_idx], length] = entry[2:]
+
+    def slot(self, when: Union[date, datetime], period: str = "daily") -> int:
+        """Find the index of the day or hour containing a given time.
+
+        :param when: the time; for the hourly schedule, a `date` refers to its first
+            hour
+        :param period: "daily" or "hourly"
+        """
+        if period not in PERIODS:
+            raise ValueError(f"unknown period '{period}'.")
+        day = when.toordinal() - self.start.toordinal()
+        if period == "daily":
+            return day
+        hour = when.hour if isinstance(when, datetime) else 0
+        return 24 * day + hour
+
+    def target(
+        self,
+        length: int,
+        when: Optional[Union[date, datetime]] = None,
+        period: str = "daily",
+    ) -> Optional[str]:
+        """Look up the target for a given time.
+
+        :param length: word length
+        :param when: the time; by default, now
+        :param period: "daily" or "hourly"
+        :return: the target, or `None` if the schedule does not cover this length,
+            period, and time
+        """
+        table = self.tables.get((period, length))
+        if table is None:
+            return None
+        _, n_slots, _, offset = table
+
+        if when is None:
+            when = datetime.now()
+        slot = self.slot(when, period)
+        if not 0 <= slot < n_slots:
+            return None
+
+        with open(self.path, "rb") as f:
+            f.seek(offset + slot * length)
+            data = f.read(length)
+        if len(data) != length:
+            raise ValueError("schedule file is truncated.")
+        return data.decode("ascii")
+
+    def targets(self, length: int, period: str = "daily") -> list:
+        """All the targets in the schedule for a given length and period, in order."""
+        n_targets, n_slots, _, offset = self.tables[period, length]
+        matrix = np.fromfile(
+            self.path, dtype=np.uint8, count=n_slots * length, offset=offset
+        )
+        if len(matrix) != n_slots * length:
+            raise ValueError("schedule file is truncated.")
+        return decode_words(matrix.reshape(n_slots, length) - ord("a"))
+
+    def n_targets(self, length: int, period: str = "daily") -> int:
+        """Number of top-frequency words from which the targets were drawn."""
+        return self.tables[period, length][0]
+
+    def __repr__(self) -> str:
+        return (
+            f"Schedule("
+            f"path={self.path}, "
+            f"start={self.start}, "
+            f"tables={sorted(self.tables)}"
+            f")"
+        )
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(
+        description="Precompute the daily and hourly targets for a range of days"
+    )
+    parser.add_argument(
+        "--dictionary",
+        default=os.path.join("data", "dictionary"),
+        help="compiled dictionary (see dictionary.py)",
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join("data", "schedule.bin"),
+        help="output file",
+    )
+    parser.add_argument(
+        "--lengths",
+        nargs="+",
+        type=int,
+        help="word lengths to include (default: all in the dictionary)",
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="first day, as YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--years", type=int, default=5, help="number of years to schedule"
+    )
+    parser.add_argument(
+        "--n-targets",
+        type=int,
+        default=3000,
+        help="number of top-frequency words to choose targets from",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=365,
+        help="no target repeats within this many days (or hours, for the hourly "
+        "schedule)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+
+    args = parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    import json
+
+    args = parse_command_line()
+
+    lengths = args.lengths
+    if lengths is None:
+        with open(os.path.join(args.dictionary, "meta.json"), "rt") as f:
+            lengths = sorted(int(_) for _ in json.load(f)["lengths"])
+
+    n_days = round(365.25 * args.years)
+    print(f"Scheduling {n_days} days starting {args.start}...", end="")
+    word_lists = {_: load_compiled(args.dictionary, _) for _ in lengths}
+    build_schedule(
+        word_lists,
+        args.output,
+        args.start,
+        n_days,
+        n_targets=args.n_targets,
+        window=args.window,
+        seed=args.seed,
+    )
+    print(f" done. Saved to {args.output}.")
@@ -0,0 +1,236 @@
+""" Score guesses against targets, one pair at a time or in whole batches. """
+
+import numpy as np
+
+from typing import Sequence, Union
+
+# per-letter feedback digits; a word's feedback code is sum(digit[i] * 3 ** i)
+MISS = 0
+CONTAINED = 1
+LOCATED = 2
+
+FEEDBACK_SYMBOLS = " .x"
+
+
+def code_dtype(length: int) -> np.dtype:
+    """Return the smallest unsigned integer type that can hold all feedback codes for
+    words of the given length."""
+    n_codes = 3**length
+    if n_codes <= 2**8:
+        return np.dtype(np.uint8)
+    elif n_codes <= 2**16:
+        return np.dtype(np.uint16)
+    else:
+        return np.dtype(np.uint32)
+
+
+def encode_words(words: Sequence[str], length: int = None) -> np.ndarray:
+    """Convert a list of words to a matrix of letter indices.
+
+    :param words: sequence of lowercase words, all of the same length
+    :param length: word length; only needed when `words` may be empty
+    :return: `uint8` array of shape `(len(words), length)`, where 'a' is mapped to 0,
+        'b' to 1, etc.
+    """
+    if length is None:
+        length = len(words[0]) if len(words) > 0 else 0
+    data = "".join(words).encode("ascii")
+    if len(data) != length * len(words):
+        raise ValueError("all words should have the same length.")
+
+    matrix = np.frombuffer(data, dtype=np.uint8).reshape(len(words), length)
+    return matrix - np.uint8(ord("a"))
+
+
+def decode_words(matrix: np.ndarray) -> list:
+    """Convert a matrix of letter indices back to a list of words. This is the inverse
+    of `encode_words`."""
+    matrix = np.asarray(matrix, dtype=np.uint8)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    length = matrix.shape[1]
+    data = (matrix + np.uint8(ord("a"))).tobytes().decode("ascii")
+    return [data[i : i + length] for i in range(0, len(data), length)]
+
+
+def score_word(guess: str, target: str) -> int:
+    """Score a single guess against a single target.
+
+    This is a pure-Python implementation that is faster than `score` for a single pair.
+
+    :param guess: guessed word
+    :param target: target word; should have the same length as `guess`
+    :return: the feedback code; see `score`
+    """
+    digits = [MISS] * len(guess)
+    remaining = {}
+    for i, (g, t) in enumerate(zip(guess, target)):
+        if g == t:
+            digits[i] = LOCATED
+        else:
+            remaining[t] = remaining.get(t, 0) + 1
+
+    for i, g in enumerate(guess):
+        if digits[i] == MISS and remaining.get(g, 0) > 0:
+            digits[i] = CONTAINED
+            remaining[g] -= 1
+
+    code = 0
+    for digit in reversed(digits):
+        code = 3 * code + digit
+    return code
+
+
+def score(guesses: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Score encoded guesses against encoded targets.
+
+    Each letter of the guess is assigned a digit: `LOCATED` if it matches the target
+    letter at the same position; `CONTAINED` if it occurs elsewhere in the target (with
+    repeated letters being matched left to right, and only as many times as they occur
+    in the target outside of exact matches); and `MISS` otherwise. The feedback code is
+    `sum(digit[i] * 3 ** i)`.
+
+    The leading dimensions of `guesses` and `targets` are broadcast against each other,
+    so e.g. `score(guesses[:, None, :], targets[None, :, :])` scores every guess against
+    every target.
+
+    :param guesses: `uint8` array of letter indices with shape `(..., length)`, as
+        returned by `encode_words`
+    :param targets: `uint8` array of letter indices with shape `(..., length)`
+    :return: array of feedback codes, with dtype given by `code_dtype(length)`
+    """
+    guesses = np.asarray(guesses, dtype=np.uint8)
+    targets = np.asarray(targets, dtype=np.uint8)
+    length = guesses.shape[-1]
+    if targets.shape[-1] != length:
+        raise ValueError("guesses and targets should have the same length.")
+
+    exact = guesses == targets
+    unmatched = ~exact
+    shape = exact.shape[:-1]
+
+    dtype = code_dtype(length)
+    codes = np.zeros(shape, dtype=dtype)
+    for i in range(length):
+        g = guesses[..., i]
+
+        # number of occurrences of `g` in the target outside of exact matches...
+        n_available = np.zeros(shape, dtype=np.uint8)
+        for j in range(length):
+            n_available += (targets[..., j] == g) & unmatched[..., j]
+
+        # ...minus the number already claimed by earlier non-exact letters of the guess
+        n_claimed = np.zeros(shape, dtype=np.uint8)
+        for k in range(i):
+            n_claimed += (guesses[..., k] == g) & unmatched[..., k]
+
+        contained = unmatched[..., i] & (n_available > n_claimed)
+        digits = LOCATED * exact[..., i].astype(dtype) + contained
+        codes += digits * dtype.type(3**i)
+
+    return codes
+
+
+def score_guess(
+    guess: np.ndarray, targets: np.ndarray, target_counts: np.ndarray = None
+) -> np.ndarray:
+    """Score a single encoded guess against many encoded targets.
+
+    This gives the same result as `score(guess, targets)` but uses a fixed number of
+    vectorized operations instead of a number that grows with the square of the word
+    length, which makes it faster for a moderate number of targets.
+
+    :param guess: encoded guess, shape `(length,)`
+    :param targets: encoded targets, shape `(n_targets, length)`
+    :param target_counts: number of occurrences of each letter in each target, shape
+        `(n_targets, 26)`; calculated if not provided
+    :return: array of feedback codes, with dtype given by `code_dtype(length)`
+    """
+    guess = np.asarray(guess, dtype=np.uint8)
+    targets = np.asarray(targets, dtype=np.uint8)
+    length = len(guess)
+    if targets.shape[-1] != length:
+        raise ValueError("guesses and targets should have the same length.")
+    if target_counts is None:
+        target_counts = np.zeros((len(targets), 26), dtype=np.int16)
+        for i in range(length):
+            target_counts[np.arange(len(targets)), targets[:, i]] += 1
+
+    exact = guess == targets
+    unmatched = ~exact
+
+    # same[i, j] is true if guess letters i and j are equal
+    same = (guess[:, None] == guess[None, :]).astype(np.int16)
+
+    # occurrences of each guess letter in the target outside of exact matches...
+    n_available = target_counts[:, guess] - exact.astype(np.int16) @ same
+    # ...minus those already claimed by earlier non-exact letters of the guess
+    n_claimed = unmatched.astype(np.int16) @ np.triu(same, k=1)
+
+    contained = unmatched & (n_available > n_claimed)
+    digits = LOCATED * exact.astype(np.int64) + contained
+    dtype = code_dtype(length)
+    return (digits @ 3 ** np.arange(length, dtype=np.int64)).astype(dtype)
+
+
+def score_matrix(
+    guesses: np.ndarray, targets: np.ndarray, chunk_size: int = 256
+) -> np.ndarray:
+    """Score every guess against every target.
+
+    :param guesses: encoded guesses, shape `(n_guesses, length)`
+    :param targets: encoded targets, shape `(n_targets, length)`
+    :param chunk_size: number of guesses to process at once; limits memory use
+    :return: array of feedback codes with shape `(n_guesses, n_targets)`
+    """
+    guesses = np.asarray(guesses, dtype=np.uint8)
+    targets = np.asarray(targets, dtype=np.uint8)
+    length = guesses.shape[1]
+
+    res = np.empty((len(guesses), len(targets)), dtype=code_dtype(length))
+    for start in range(0, len(guesses), chunk_size):
+        crt_guesses = guesses[start : start + chunk_size]
+        res[start : start + len(crt_guesses)] = score(
+            crt_guesses[:, None, :], targets[None, :, :]
+        )
+
+    return res
+
+
+def feedback_to_str(code: int, length: int) -> str:
+    """Convert a feedback code to a string in which a space indicates no match; '.'
+    indicates a letter contained in the target but not at that position; and 'x'
+    indicates a letter at the correct position."""
+    code = int(code)
+    res = []
+    for _ in range(length):
+        code, digit = divmod(code, 3)
+        res.append(FEEDBACK_SYMBOLS[digit])
+    return "".join(res)
+
+
+def str_to_feedback(feedback: str) -> int:
+    """Convert a feedback string to a feedback code. This is the inverse of
+    `feedback_to_str`."""
+    code = 0
+    for symbol in reversed(feedback):
+        code = 3 * code + FEEDBACK_SYMBOLS.index(symbol)
+    return code
+
+
+def solved_code(length: int) -> int:
+    """Return the feedback code corresponding to a perfect match."""
+    return 3**length - 1
+
+
+def feedback_digits(codes: Union[int, np.ndarray], length: int) -> np.ndarray:
+    """Split feedback codes into per-letter digits.
+
+    :param codes: feedback code or array of codes
+    :param length: word length
+    :return: array of shape `codes.shape + (length,)` containing `MISS`, `CONTAINED`,
+        or `LOCATED` for each letter
+    """
+    codes = np.asarray(codes)
+    powers = 3 ** np.arange(length)
+    return ((codes[..., None] // powers) % 3).astype(np.uint8)
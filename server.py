@@ -0,0 +1,264 @@
+#! /usr/bin/env python
+""" Host many independent games in a single process over a line-based JSON protocol. """
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+
+import numpy as np
+
+from typing import Optional, Union
+
+from backend import ClonleBackend, GameOverError
+from dictionary import WordList
+from registry import get_word_list
+from schedule import Schedule
+
+
+class ClonleServer:
+    """Manage a collection of game sessions that share one word list.
+
+    Requests and responses are dictionaries; over the network, each is sent as one line
+    of JSON. Every request has a "cmd" key:
+        "new": start a new game; optional key "seed", a non-negative integer, fixes
+            the target choice, and optional key "period" ("daily" or "hourly")
+            instead uses the current target from the schedule; the response contains
+            "session", "length", and "max_attempts"
+        "guess": make an attempt; needs "session" and "word"; the response contains
+            "feedback" (see `ClonleBackend.attempt()`), "attempts", and "status",
+            which is "playing", "won", or "lost"; once a game is over, its response
+            also contains "target" and the session is closed
+        "state": needs "session"; the response contains "attempts", "max_attempts",
+            "history", and "letters", which maps each letter to the name of its
+            `ClonleState`
+        "quit": close a session; needs "session"
+    Every response has an "ok" key; if this is false, "error" describes the problem.
+
+    The word list is shared by all sessions and is never modified, so creating a
+    session does not copy any word data.
+
+    :param database: word list, sorted by decreasing frequency
+    :param max_attempts: maximum number of attempts per game
+    :param n_targets: number of top-frequency words from which targets are chosen
+    :param max_sessions: when this many sessions are open, starting a new one closes
+        the oldest
+    :param rng: random number generator used for sessions started without a seed;
+        either a seed or a `numpy.random.Generator`
+    :param schedule: precomputed daily and hourly targets (see `schedule.py`), used by
+        "new" requests with a "period"
+    """
+
+    def __init__(
+        self,
+        database: WordList,
+        max_attempts: int = 6,
+        n_targets: Optional[int] = 3000,
+        max_sessions: int = 100_000,
+        rng: Optional[Union[int, np.random.Generator]] = None,
+        schedule: Optional[Schedule] = None,
+    ):
+        self.database = database
+        self.length = database.length
+        self.max_attempts = max_attempts
+        self.n_targets = n_targets
+        self.max_sessions = max_sessions
+        self.rng = np.random.default_rng(rng)
+        self.schedule = schedule
+
+        # dictionaries keep insertion order, so the first session is the oldest
+        self.sessions = {}
+        self._next_id = itertools.count()
+
+        # build the hashed index once, before any session needs it
+        database.index
+
+    def handle(self, request: dict) -> dict:
+        """Process one request and return the response."""
+        cmd = request.get("cmd")
+        handler = self._handlers.get(cmd)
+        if handler is None:
+            return {"ok": False, "error": f"unknown command {cmd!r}."}
+
+        try:
+            return handler(self, request)
+        except (ValueError, KeyError, TypeError, GameOverError) as err:
+            return {"ok": False, "error": str(err)}
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Serve requests from one connection until it is closed."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # the line is over the reader's limit; the rest of it can't be
+                    # told apart from the next request, so end the connection
+                    error = {"ok": False, "error": "request too long."}
+                    writer.write(json.dumps(error).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "malformed request."}
+                else:
+                    if isinstance(request, dict):
+                        response = self.handle(request)
+                    else:
+                        response = {"ok": False, "error": "malformed request."}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        """Start listening for connections.
+
+        :return: the `asyncio.Server`; use its `sockets` attribute to find the port
+            if `port` was 0
+        """
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def _new(self, request: dict) -> dict:
+        seed = request.get("seed")
+        # `bool` is a subclass of `int`, and floats (including the `inf` that JSON
+        # numbers like 1e999 parse to) can't seed a generator
+        if seed is not None and (
+            not isinstance(seed, int) or isinstance(seed, bool) or seed < 0
+        ):
+            raise ValueError("seed should be a non-negative integer.")
+        period = request.get("period")
+        target = None
+        if period is not None:
+            if self.schedule is None:
+                raise ValueError("no target schedule.")
+            # only reads the target from the file; `start()` checks that it is in
+            # the dictionary
+            target = self.schedule.target(self.length, period=str(period))
+            if target is None:
+                raise ValueError(f"no scheduled {period} target.")
+
+        backend = ClonleBackend(
+            self.database,
+            self.length,
+            max_attempts=self.max_attempts,
+            rng=self.rng if seed is None else seed,
+        )
+        backend.start(target_n_cutoff=self.n_targets, target=target)
+
+        while len(self.sessions) >= self.max_sessions:
+            del self.sessions[next(iter(self.sessions))]
+
+        session = next(self._next_id)
+        self.sessions[session] = backend
+        return {
+            "ok": True,
+            "session": session,
+            "length": self.length,
+            "max_attempts": self.max_attempts,
+        }
+
+    def _guess(self, request: dict) -> dict:
+        session = self._session_id(request)
+        backend = self.sessions[session]
+        feedback = backend.attempt(str(request["word"]))
+
+        response = {"ok": True, "feedback": feedback, "attempts": backend.attempts}
+        if feedback == self.length * "x":
+            response["status"] = "won"
+        elif backend.attempts >= backend.max_attempts:
+            response["status"] = "lost"
+        else:
+            response["status"] = "playing"
+            return response
+
+        response["target"] = backend.target
+        del self.sessions[session]
+        return response
+
+    def _state(self, request: dict) -> dict:
+        backend = self.sessions[self._session_id(request)]
+        return {
+            "ok": True,
+            "attempts": backend.attempts,
+            "max_attempts": backend.max_attempts,
+            "history": backend.history,
+            "letters": {ch: s.name.lower() for ch, s in backend.get_state().items()},
+        }
+
+    def _quit(self, request: dict) -> dict:
+        del self.sessions[self._session_id(request)]
+        return {"ok": True}
+
+    def _session_id(self, request: dict) -> int:
+        session = request["session"]
+        if session not in self.sessions:
+            raise ValueError(f"unknown session {session!r}.")
+        return session
+
+    _handlers = {"new": _new, "guess": _guess, "state": _state, "quit": _quit}
+
+
+def parse_command_line():
+    parser = argparse.ArgumentParser(description="Clonle game server")
+    parser.add_argument(
+        "n_letters", nargs="?", default=5, type=int, help="number of letters per word"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", default=8765, type=int, help="port to listen on")
+    parser.add_argument(
+        "--max-attempts", default=6, type=int, help="maximum number of attempts"
+    )
+    parser.add_argument(
+        "--n-targets", default=3000, type=int, help="number of possible targets"
+    )
+    parser.add_argument(
+        "--max-sessions",
+        default=100_000,
+        type=int,
+        help="maximum number of open sessions",
+    )
+    parser.add_argument(
+        "--schedule",
+        nargs="?",
+        const=os.path.join("data", "schedule.bin"),
+        help="serve the daily and hourly targets from a schedule built by "
+        "schedule.py (default file: data/schedule.bin)",
+    )
+
+    args = parser.parse_args()
+    return args
+
+
+async def main(args):
+    source = os.path.join("data", "dictionary")
+    if not os.path.exists(os.path.join(source, "meta.json")):
+        source = os.path.join("data", "dictionary.csv")
+    database = get_word_list(source, args.n_letters)
+
+    server = ClonleServer(
+        database,
+        max_attempts=args.max_attempts,
+        n_targets=args.n_targets,
+        max_sessions=args.max_sessions,
+        schedule=Schedule(args.schedule) if args.schedule else None,
+    )
+    listener = await server.serve(args.host, args.port)
+    print(f"Serving {args.n_letters}-letter Clonle on {args.host}:{args.port}.")
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_command_line()))
+    except KeyboardInterrupt:
+        pass
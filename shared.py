@@ -0,0 +1,124 @@
+""" Publish word lists in shared memory for use by many worker processes. """
+
+import os
+import shutil
+import tempfile
+import uuid
+import weakref
+
+from typing import Dict, Optional, Sequence
+
+from dictionary import WordList, load_compiled, save_compiled
+from registry import get_word_list
+
+
+def shared_memory_dir() -> str:
+    """Folder on a memory-backed file system: `/dev/shm` where available (this is
+    also where `multiprocessing.shared_memory` keeps its blocks on Linux), otherwise
+    the temporary folder."""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+class SharedDictionary:
+    """Word lists published once in shared memory, for other processes to map.
+
+    The word lists are saved as a compiled dictionary (see `dictionary.save_compiled`),
+    together with sorted word indices, in a folder in `shared_memory_dir()`. Other
+    processes use `path` like any compiled dictionary, e.g., with
+    `ClonleBackend.from_source()` or `dictionary.load_compiled()`. The files are
+    memory-mapped, so all processes share the same physical memory, and each one only
+    keeps a small amount of private data per word list. Use `WordList.word()` rather
+    than `WordList.words` to keep it that way.
+
+    The process that publishes the word lists owns the folder, which is deleted by
+    `close()`, when the object is garbage-collected, or when the process exits.
+    Processes that already loaded the word lists can keep using them, since the memory
+    is only released once no process maps it any more.
+
+    :param word_lists: dictionary mapping word lengths to word lists sorted by
+        decreasing frequency
+    :param name: name of the folder; by default, a unique name is generated
+    :param directory: where to create the folder; by default, `shared_memory_dir()`
+
+    Attributes:
+        path: str
+            Folder containing the compiled dictionary.
+        lengths: list
+            Word lengths in the dictionary.
+    """
+
+    def __init__(
+        self,
+        word_lists: Dict[int, WordList],
+        name: Optional[str] = None,
+        directory: Optional[str] = None,
+    ):
+        if directory is None:
+            directory = shared_memory_dir()
+        if name is None:
+            name = f"clonle_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+        self.path = os.path.join(directory, name)
+        self.lengths = sorted(word_lists)
+
+        # fails if the folder exists, so another publisher's data is never overwritten
+        os.makedirs(self.path)
+        self._finalizer = weakref.finalize(self, _remove, self.path, os.getpid())
+        try:
+            save_compiled(word_lists, self.path, index=True)
+        except BaseException:
+            self.close()
+            raise
+
+    @classmethod
+    def from_source(
+        cls,
+        source: str,
+        lengths: Sequence[int],
+        frequency_cutoff: Optional[float] = None,
+        **kwargs,
+    ) -> "SharedDictionary":
+        """Load word lists from a compiled dictionary or a CSV file and publish them.
+
+        :param source: dictionary source; see `registry.DictionaryRegistry.get`
+        :param lengths: word lengths to publish
+        :param frequency_cutoff: words with lower frequency are dropped
+        :param kwargs: passed to the constructor
+        """
+        word_lists = {_: get_word_list(source, _, frequency_cutoff) for _ in lengths}
+        return cls(word_lists, **kwargs)
+
+    def word_list(self, length: int) -> WordList:
+        """Load a shared word list in this process, without copying it."""
+        return load_compiled(self.path, length)
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self):
+        """Remove the shared files. Word lists that were already loaded stay valid."""
+        self._finalizer()
+
+    def __enter__(self) -> "SharedDictionary":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"SharedDictionary("
+            f"path={self.path}, "
+            f"lengths={self.lengths}, "
+            f"closed={self.closed}"
+            f")"
+        )
+
+
+def _remove(path: str, owner_pid: int):
+    # forked children inherit the finalizer, but should not remove the parent's data
+    if os.getpid() == owner_pid:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,313 @@
+"""Choose guesses that maximize the expected information about the target."""
+
+import numpy as np
+
+from typing import Callable, Optional, Union
+
+from backend import ClonleBackend, NotInitializedError
+
+
+def _xlog2x(counts: np.ndarray) -> np.ndarray:
+    """Calculate `counts * log2(counts)`, with `0 log 0 = 0`."""
+    if np.issubdtype(counts.dtype, np.integer):
+        # counts are bounded by the number of targets, so use a lookup table
+        values = np.arange(int(counts.max()) + 1 if counts.size > 0 else 1)
+        lut = np.zeros(len(values))
+        lut[1:] = values[1:] * np.log2(values[1:])
+        return lut[counts]
+    else:
+        # most classes are typically empty, so only take logarithms where needed
+        res = np.zeros(counts.shape)
+        mask = counts > 0
+        nonzero = counts[mask]
+        res[mask] = nonzero * np.log2(nonzero)
+        return res
+
+
+def mean_information(counts: np.ndarray) -> np.ndarray:
+    """Expected information gain, in bits, i.e., the entropy of the feedback.
+
+    :param counts: array of shape `(n_guesses, n_classes)` giving the number (or total
+        weight) of targets in each feedback class for each guess; empty classes have
+        zero count
+    :return: score for each guess; higher is better
+    """
+    total = counts.sum(axis=1)
+    return np.log2(total) - _xlog2x(counts).sum(axis=1) / total
+
+
+def median_information(counts: np.ndarray) -> np.ndarray:
+    """Median information gain, in bits, over targets. See `mean_information`."""
+    # information decreases with class size, so the median target is in the class at
+    # which the cumulative count, starting from the largest class, reaches half the
+    # total; equivalently, it is preceded (in increasing order of size) by all the
+    # classes whose cumulative count stays within the other half
+    total = counts.sum(axis=1)
+    if np.issubdtype(counts.dtype, np.integer) and counts.max(initial=0) < 2**16:
+        # 16-bit integers sort several times faster
+        sorted_counts = np.sort(counts.astype(np.uint16), axis=1)
+        # empty classes come first, and don't change the result
+        first = int(np.argmax(np.any(sorted_counts > 0, axis=0)))
+        sorted_counts = sorted_counts[:, first:]
+        cum_counts = np.cumsum(sorted_counts, axis=1, dtype=np.int64)
+        rest = total - (total + 1) // 2
+    else:
+        sorted_counts = np.sort(counts, axis=1)
+        cum_counts = np.cumsum(sorted_counts, axis=1)
+        rest = total - 0.5 * total * (1 - 1e-9)
+    idx = np.count_nonzero(cum_counts[:, :-1] <= rest[:, None], axis=1)
+    median_count = sorted_counts[np.arange(len(counts)), idx]
+    return np.log2(total / median_count)
+
+
+def min_information(counts: np.ndarray) -> np.ndarray:
+    """Worst-case information gain, in bits, over targets. See `mean_information`."""
+    return np.log2(counts.sum(axis=1) / np.max(counts, axis=1))
+
+
+METRICS = {
+    "mean": mean_information,
+    "median": median_information,
+    "min": min_information,
+}
+
+
+def feedback_histograms(
+    codes: np.ndarray, weights: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Count the targets yielding each feedback class, separately for each guess.
+
+    :param codes: feedback codes, shape `(n_guesses, n_targets)`
+    :param weights: weight for each target; by default all targets count as 1
+    :return: array of shape `(n_guesses, n_classes)`, where the classes are not
+        necessarily in the same order for every guess and unused classes have zero
+        count; the counts are integers unless `weights` is provided
+    """
+    m, n = codes.shape
+    n_codes = int(codes.max()) + 1 if codes.size > 0 else 1
+
+    if n_codes <= max(n, 1024):
+        # few possible codes: use them directly as class indices
+        n_classes = n_codes
+        class_idx = codes
+        crt_weights = weights
+    else:
+        # many possible codes: number the distinct codes in each row instead
+        n_classes = n
+        order = np.argsort(codes, axis=1, kind="stable")
+        sorted_codes = np.take_along_axis(codes, order, axis=1)
+        is_new = np.zeros((m, n), dtype=np.uint32)
+        is_new[:, 1:] = sorted_codes[:, 1:] != sorted_codes[:, :-1]
+        class_idx = np.cumsum(is_new, axis=1, dtype=np.uint32)
+        crt_weights = weights[order] if weights is not None else None
+
+    # process a few rows at a time so that the flattened indices fit in 16 bits when
+    # possible, which is a lot faster than using 64-bit indices
+    if n_classes <= 2**15:
+        idx_dtype = np.uint16
+        chunk_size = 2**16 // n_classes
+    else:
+        idx_dtype = np.intp
+        chunk_size = m
+    offsets = (n_classes * np.arange(chunk_size, dtype=idx_dtype))[:, None]
+
+    counts = np.empty((m, n_classes), dtype=float if weights is not None else np.intp)
+    for start in range(0, m, chunk_size):
+        crt_idx = class_idx[start : start + chunk_size]
+        k = len(crt_idx)
+        flat_idx = (crt_idx.astype(idx_dtype) + offsets[:k]).ravel()
+        if crt_weights is not None:
+            if crt_weights.ndim == 1:
+                crt_w = np.broadcast_to(crt_weights, (k, n)).ravel()
+            else:
+                crt_w = crt_weights[start : start + k].ravel()
+        else:
+            crt_w = None
+        counts[start : start + k] = np.bincount(
+            flat_idx, weights=crt_w, minlength=k * n_classes
+        ).reshape(k, n_classes)
+
+    return counts
+
+
+def information_scores(
+    table: np.ndarray,
+    targets: np.ndarray,
+    metric: Callable = mean_information,
+    weights: Optional[np.ndarray] = None,
+    chunk_size: int = 512,
+) -> np.ndarray:
+    """Score every row of a pattern table as a guess.
+
+    :param table: pattern table, shape `(n_guesses, n_all_targets)`; see
+        `patterns.build_pattern_table`
+    :param targets: indices of the columns to use, i.e., the possible targets
+    :param metric: function mapping feedback-class counts to scores; see
+        `mean_information`
+    :param weights: weight for each of the `targets`
+    :param chunk_size: number of guesses to evaluate at once; the feedback counts for
+        a chunk should fit in the CPU cache, which matters more for speed than the
+        number of chunks
+    :return: score for each guess
+    """
+    # all targets are possible; avoid a copy
+    all_targets = len(targets) == table.shape[1]
+
+    res = np.empty(len(table))
+    for start in range(0, len(table), chunk_size):
+        codes = np.asarray(table[start : start + chunk_size])
+        if not all_targets:
+            # `np.take` is faster than fancy indexing here
+            codes = np.take(codes, targets, axis=1)
+        # empty feedback classes have zero count, which all metrics allow for
+        counts = feedback_histograms(codes, weights)
+        res[start : start + len(codes)] = metric(counts)
+
+    return res
+
+
+class EntropySolver:
+    """Suggest the next guess for a `ClonleBackend` game.
+
+    Each possible guess is scored by how much information its feedback is expected to
+    give about the target, given the targets that are still consistent with the game
+    history. The feedback is looked up in the backend's pattern table (see
+    `ClonleBackend.pattern_table()`). In hard mode, only the guesses allowed by the
+    backend are considered.
+
+    With all 12,972 five-letter words of the Collins list as guesses and 3000 possible
+    targets, a hint after the first guess takes less than 50 ms with any of the
+    built-in metrics (see `test_solver_hint` in `benchmarks/bench_backend.py`).
+    Weighted targets are slower, since the feedback counts are then floating point.
+
+    :param backend: the game; should be started before calling `next_guess()`
+    :param metric: how to summarize the information gain over targets: "mean",
+        "median", "min", or a function mapping an `(n_guesses, n_classes)` array of
+        feedback-class counts to a score for each guess (higher is better); see
+        `mean_information`
+    :param weighted: if true, targets are weighted by their frequency; otherwise all
+        possible targets are equally likely
+    :param cache_dir: where to cache the pattern table
+    :param chunk_size: number of guesses to evaluate at once; limits memory use
+    :param opening: opening guess to use; by default this is calculated on the first
+        call to `next_guess()` and then cached
+    :param memo_size: the guess chosen for each game history is remembered, so that
+        replaying the same history (e.g., in a new game) is instantaneous; the memo is
+        cleared when it reaches this many entries
+    """
+
+    def __init__(
+        self,
+        backend: ClonleBackend,
+        metric: Union[str, Callable] = "mean",
+        weighted: bool = False,
+        cache_dir: str = "save",
+        chunk_size: int = 512,
+        opening: Optional[str] = None,
+        memo_size: int = 100_000,
+    ):
+        self.backend = backend
+        self.metric = METRICS[metric] if isinstance(metric, str) else metric
+        self.weighted = weighted
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+
+        self._table = None
+        self._table_n_targets = None
+        self.opening = opening
+        self.memo_size = memo_size
+        self._memo = {}
+
+    def scores(self, targets: Optional[np.ndarray] = None) -> np.ndarray:
+        """Score every word in the backend database as a guess.
+
+        :param targets: indices of the possible targets; by default, the candidates
+            of the current game
+        :return: array of scores, one for each word in `backend.database`
+        """
+        table = self._get_table()
+        if targets is None:
+            targets = self.candidate_targets()
+
+        if self.weighted:
+            weights = np.nan_to_num(
+                np.asarray(self.backend.database.freq[targets], dtype=float)
+            )
+            if weights.sum() <= 0:
+                weights = None
+        else:
+            weights = None
+
+        return information_scores(
+            table, targets, self.metric, weights=weights, chunk_size=self.chunk_size
+        )
+
+    def candidate_targets(self) -> np.ndarray:
+        """Indices of the possible targets that are consistent with the game so far."""
+        if self.backend.n_targets is None:
+            raise NotInitializedError("solver used before start()")
+        idxs = self.backend.candidates.indices()
+        return idxs[idxs < self.backend.n_targets]
+
+    def next_guess(self) -> str:
+        """Suggest the next guess.
+
+        Among the guesses with the highest score, those that could be the target are
+        preferred, and then the more frequent ones.
+        """
+        targets = self.candidate_targets()
+        words = self.backend.database.words
+        if len(targets) == 0:
+            raise ValueError("no target is consistent with the feedback so far.")
+        if len(targets) <= 2:
+            return words[targets[0]]
+
+        # the cached opening and guesses only hold for the same target pool
+        self._check_target_pool()
+        is_opening = len(self.backend.history) == 0
+        if is_opening and self.opening is not None:
+            return self.opening
+
+        # the choice only depends on the history, since the history determines the
+        # candidates
+        key = tuple(self.backend.history)
+        guess = self._memo.get(key)
+        if guess is not None:
+            return guess
+
+        scores = self.scores(targets)
+        if self.backend.constraints is not None:
+            # in hard mode, only consider the guesses that respect the hints
+            scores = np.where(self.backend.valid_guesses(), scores, -np.inf)
+        best = np.flatnonzero(scores >= np.max(scores) - 1e-9)
+        best_targets = np.intersect1d(best, targets)
+        guess = words[best_targets[0] if len(best_targets) > 0 else best[0]]
+
+        if is_opening:
+            self.opening = guess
+        else:
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[key] = guess
+        return guess
+
+    def _check_target_pool(self):
+        """Drop the pattern table and the cached guesses if the number of possible
+        targets changed since they were calculated."""
+        n_targets = self.backend.n_targets
+        if n_targets is None:
+            raise NotInitializedError("solver used before start()")
+        if self._table_n_targets != n_targets:
+            if self._table_n_targets is not None:
+                self._table = None
+                self.opening = None
+                self._memo.clear()
+            self._table_n_targets = n_targets
+
+    def _get_table(self) -> np.ndarray:
+        self._check_target_pool()
+        if self._table is None:
+            self._table = self.backend.pattern_table(
+                target_n_cutoff=self._table_n_targets, cache_dir=self.cache_dir
+            )
+        return self._table
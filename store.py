@@ -0,0 +1,148 @@
+""" Word lists of many lengths, and backends created from them for any length. """
+
+import json
+import os
+
+import numpy as np
+
+from typing import Dict, Optional, Sequence, Type, Union, TYPE_CHECKING
+
+from backend import ClonleBackend
+from dictionary import WordList, dataframe_to_word_lists, load_compiled
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class WordStore:
+    """Cleaned word lists for a range of word lengths.
+
+    The store is built in one pass over the source, and backends for any of its
+    lengths are then created without filtering the words again; see
+    `create_backend()`.
+
+    :param word_lists: dictionary mapping word lengths to word lists sorted by
+        decreasing frequency
+
+    Attributes:
+        word_lists: dict
+            Dictionary mapping each word length to its `WordList`.
+        lengths: list
+            The available word lengths, in increasing order. Lengths without any
+            words are left out.
+    """
+
+    def __init__(self, word_lists: Dict[int, WordList]):
+        self.word_lists = {
+            length: word_list
+            for length, word_list in sorted(word_lists.items())
+            if len(word_list) > 0
+        }
+        self.lengths = list(self.word_lists)
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        database: "pd.DataFrame",
+        lengths: Optional[Sequence[int]] = None,
+        frequency_cutoff: Optional[float] = None,
+    ) -> "WordStore":
+        """Build the word lists from a word database; see
+        `dictionary.dataframe_to_word_lists`."""
+        return cls(dataframe_to_word_lists(database, lengths, frequency_cutoff))
+
+    @classmethod
+    def from_compiled(
+        cls,
+        path: str,
+        lengths: Optional[Sequence[int]] = None,
+        frequency_cutoff: Optional[float] = None,
+    ) -> "WordStore":
+        """Memory-map the word lists of a compiled dictionary.
+
+        :param path: folder containing the compiled dictionary
+        :param lengths: word lengths to include; by default, all lengths in the
+            dictionary; lengths that are not in the dictionary are skipped
+        :param frequency_cutoff: if provided, words with lower frequency are dropped
+        """
+        with open(os.path.join(path, "meta.json"), "rt") as f:
+            available = [int(_) for _ in json.load(f)["lengths"]]
+        if lengths is not None:
+            available = [_ for _ in available if _ in lengths]
+
+        word_lists = {}
+        for length in available:
+            word_list = load_compiled(path, length)
+            if frequency_cutoff:
+                # the word list is sorted, so this keeps a prefix without copying
+                word_list = word_list.head(word_list.sampler.count(frequency_cutoff))
+            word_lists[length] = word_list
+        return cls(word_lists)
+
+    @classmethod
+    def load(
+        cls,
+        source: str,
+        lengths: Optional[Sequence[int]] = None,
+        frequency_cutoff: Optional[float] = None,
+    ) -> "WordStore":
+        """Load the word lists from a compiled dictionary or a CSV file.
+
+        :param source: path to either a compiled dictionary or a CSV file with columns
+            "word" and "count" or "freq"
+        :param lengths: word lengths to include; by default, all available lengths
+        :param frequency_cutoff: if provided, words with lower frequency are dropped
+        """
+        if os.path.exists(os.path.join(source, "meta.json")):
+            return cls.from_compiled(source, lengths, frequency_cutoff)
+        else:
+            # Pandas is slow to import, so only load it when we need to parse the CSV
+            import pandas as pd
+
+            return cls.from_dataframe(pd.read_csv(source), lengths, frequency_cutoff)
+
+    def create_backend(
+        self,
+        length: int,
+        backend_class: Type[ClonleBackend] = ClonleBackend,
+        **kwargs,
+    ) -> ClonleBackend:
+        """Create a backend for words of a given length.
+
+        The backend uses the word list from the store directly, so this is fast.
+
+        :param length: word length
+        :param backend_class: type of backend, e.g., `ClonleBackend` or
+            `AdversarialBackend`
+        :param kwargs: additional arguments are passed to the constructor; a frequency
+            cutoff should instead be given when building the store
+        """
+        return backend_class(self[length], length, **kwargs)
+
+    def random_length(
+        self, rng: Optional[Union[int, np.random.Generator]] = None
+    ) -> int:
+        """Choose a word length uniformly at random, in constant time.
+
+        :param rng: random number generator or seed; see `ClonleBackend`
+        """
+        if len(self.lengths) == 0:
+            raise ValueError("no words in store.")
+        rng = np.random.default_rng(rng)
+        return self.lengths[int(rng.integers(len(self.lengths)))]
+
+    def __getitem__(self, length: int) -> WordList:
+        word_list = self.word_lists.get(length)
+        if word_list is None:
+            raise KeyError(f"no words of length {length} in store.")
+        return word_list
+
+    def __contains__(self, length: object) -> bool:
+        return length in self.word_lists
+
+    def __len__(self) -> int:
+        return len(self.word_lists)
+
+    def __repr__(self) -> str:
+        n_words = sum(len(_) for _ in self.word_lists.values())
+        return f"WordStore(lengths={self.lengths}, n_words={n_words})"
@@ -0,0 +1,114 @@
+import pytest
+
+import numpy as np
+
+from adversarial import AdversarialBackend, feedback_classes
+from backend import ClonleState, NotInitializedError
+from dictionary import WordList
+from scoring import encode_words, feedback_to_str, score
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    words = ["cakes", "bakes", "rakes", "makes", "hello", "world", "abode", "zeros"]
+    return WordList.from_words(words, np.arange(len(words), 0, -1.0))
+
+
+@pytest.fixture
+def clonle(word_list) -> AdversarialBackend:
+    clonle = AdversarialBackend(word_list, 5)
+    clonle.start()
+    return clonle
+
+
+@pytest.mark.parametrize("length", [2, 10])
+def test_feedback_classes(length):
+    codes = np.array([5, 3, 5, 0, 3, 5])
+    class_codes, counts = feedback_classes(codes, length)
+    np.testing.assert_equal(class_codes, [0, 3, 5])
+    np.testing.assert_equal(counts, [1, 2, 3])
+
+
+def test_start_does_not_choose_target(clonle):
+    assert clonle.target is None
+    assert len(clonle.remaining) == 8
+
+
+def test_attempt_keeps_largest_class(clonle):
+    res = clonle.attempt("cakes")
+    assert res == " xxxx"
+    assert sorted(clonle.database.words[_] for _ in clonle.remaining) == [
+        "bakes",
+        "makes",
+        "rakes",
+    ]
+
+
+def test_remaining_targets_consistent_with_feedback(clonle, word_list):
+    for word in ["hello", "abode"]:
+        res = clonle.attempt(word)
+        guess = encode_words([word])
+        for idx in clonle.remaining:
+            code = score(guess, word_list.matrix[idx : idx + 1])[0]
+            assert feedback_to_str(code, 5) == res
+
+
+def test_solved_only_when_single_target_left(clonle):
+    for word in ["cakes", "bakes", "rakes"]:
+        assert clonle.attempt(word) != "xxxxx"
+        assert clonle.target is None
+    assert clonle.attempt("makes") == "xxxxx"
+    assert clonle.target == "makes"
+
+
+def test_target_fixed_when_attempts_run_out(word_list):
+    clonle = AdversarialBackend(word_list, 5, max_attempts=2)
+    clonle.start()
+    clonle.attempt("hello")
+    clonle.attempt("world")
+    assert clonle.target in [word_list.words[_] for _ in clonle.remaining]
+
+
+def test_least_revealing_policy(word_list):
+    clonle = AdversarialBackend(word_list, 5, policy="least_revealing")
+    clonle.start()
+    res = clonle.attempt("rakes")
+    # "hello" and "world" give one contained letter and no located ones; ties go to
+    # the lower feedback code
+    assert res == ".    "
+    assert clonle.remaining.tolist() == [5]
+
+
+def test_state_only_uses_common_information(clonle):
+    clonle.attempt("cakes")
+    state = clonle.get_state()
+    assert state["c"] == ClonleState.MISSING
+    for ch in "akes":
+        assert state[ch] == ClonleState.LOCATED
+
+
+def test_candidates_match_remaining(clonle):
+    clonle.attempt("hello")
+    cands = clonle.candidates.indices()
+    np.testing.assert_equal(cands[cands < clonle.n_targets], clonle.remaining)
+
+
+def test_attempt_before_start_raises(word_list):
+    clonle = AdversarialBackend(word_list, 5)
+    with pytest.raises(NotInitializedError):
+        clonle.attempt("hello")
+
+
+def test_invalid_policy_raises(word_list):
+    with pytest.raises(ValueError):
+        AdversarialBackend(word_list, 5, policy="nice")
+
+
+def test_snapshot_restore(clonle, word_list):
+    clonle.attempt("cakes")
+    clonle.attempt("bakes")
+    restored = AdversarialBackend(word_list, 5)
+    restored.restore(clonle.snapshot())
+    np.testing.assert_equal(restored.remaining, clonle.remaining)
+    assert restored.history == clonle.history
+    assert restored.target is None
@@ -1,10 +1,19 @@
 import pytest
 
+import subprocess
+import sys
 import pandas as pd
 import numpy as np
 
 from string import ascii_lowercase
-from backend import ClonleBackend, NotInitializedError, ClonleState, GameOverError
+from backend import (
+    ClonleBackend,
+    NotInitializedError,
+    ClonleState,
+    GameOverError,
+    snapshot_length,
+)
+from dictionary import WordList
 
 
 @pytest.fixture
@@ -409,3 +418,213 @@ def test_located_letters_stay_located():
 
     clonle.attempt("panders")  # this shouldn't un-locate "n"
     assert clonle.state["n"] == ClonleState.LOCATED
+
+
+def test_word_index_follows_database_updates(dummy_db3):
+    clonle = ClonleBackend(dummy_db3, 3)
+    clonle.database = pd.DataFrame({"word": ["baz"], "count": [1], "freq": [1.0]})
+    clonle.start()
+
+    assert clonle.attempt("baz") == "xxx"
+    with pytest.raises(ValueError):
+        clonle.attempt("foo")
+
+
+def test_database_accepts_word_list(dummy_db3):
+    clonle = ClonleBackend(dummy_db3, 3)
+    clonle.database = WordList.from_words(["baz"], [1.0])
+    clonle.start()
+
+    assert clonle.attempt("baz") == "xxx"
+
+
+def test_database_to_dataframe(dummy_db3):
+    clonle = ClonleBackend(dummy_db3, 3)
+    df = clonle.database.to_dataframe()
+
+    assert df["word"].tolist() == ["foo", "bar"]
+    assert np.allclose(df["freq"], [4 / 7, 3 / 7])
+    assert df.loc[df["word"] == "bar", "freq"].item() == pytest.approx(3 / 7)
+
+
+def test_from_words_matches_dataframe(special_db7):
+    clonle1 = ClonleBackend(special_db7, 7)
+    clonle2 = ClonleBackend.from_words(
+        special_db7["word"].tolist() + ["foo"], 7, freq=[4, 1, 1, 1, 10]
+    )
+
+    assert clonle1.database.words == clonle2.database.words
+    clonle1.start()
+    clonle2.start()
+    assert clonle1.target == clonle2.target
+
+
+def test_from_words_default_frequencies_are_equal():
+    clonle = ClonleBackend.from_words(["foo", "bar", "quux"], 3)
+    assert clonle.database.words == ["foo", "bar"]
+
+
+def test_importing_game_does_not_import_pandas():
+    code = "import sys, clonle; assert 'pandas' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_start_with_given_target(special_db7):
+    clonle = ClonleBackend(special_db7, 7)
+    clonle.start(target="maximum")
+    assert clonle.target == "maximum"
+    assert clonle.attempt("maximum") == "xxxxxxx"
+
+
+def test_start_raises_for_target_not_in_dictionary(special_db7):
+    clonle = ClonleBackend(special_db7, 7)
+    with pytest.raises(ValueError):
+        clonle.start(target="bazooka")
+
+
+def test_start_weighted_selects_frequent_targets(long_db5):
+    clonle = ClonleBackend(long_db5, 5, rng=1)
+    n_frequent = 0
+    for _ in range(20):
+        clonle.start(weighted=True)
+        n_frequent += clonle.target == "fooob"
+    assert n_frequent >= 10
+
+
+def test_seeded_target_unchanged(long_db5):
+    clonle = ClonleBackend(long_db5, 5, rng=3)
+    clonle.start()
+    n = len(clonle.database)
+    idx = np.random.default_rng(3).choice(n, size=1, replace=False)[0]
+    assert clonle.target == clonle.database.words[idx]
+
+
+def test_letter_states_array_matches_state(special_db7):
+    clonle = ClonleBackend(special_db7, 7)
+    clonle.start(target="snorkle")
+    clonle.attempt("snipers")
+    assert clonle.letter_states.dtype == np.int8
+    for i, ch in enumerate(ascii_lowercase):
+        assert clonle.state[ch].value == clonle.letter_states[i]
+
+
+def test_history_is_stored_compactly(special_db7):
+    clonle = ClonleBackend(special_db7, 7)
+    clonle.start(target="snorkle")
+    assert clonle.history == []
+    res1 = clonle.attempt("snipers")
+    res2 = clonle.attempt("maximum")
+    assert clonle.history == [("snipers", res1), ("maximum", res2)]
+
+
+def test_history_grows_when_max_attempts_increased(special_db7):
+    clonle = ClonleBackend(special_db7, 7, max_attempts=1)
+    clonle.start(target="snorkle")
+    clonle.attempt("snipers")
+    clonle.max_attempts = 2
+    clonle.attempt("maximum")
+    assert [_[0] for _ in clonle.history] == ["snipers", "maximum"]
+
+
+def test_snapshot_restore_roundtrip(special_db7):
+    clonle = ClonleBackend(special_db7, 7, max_attempts=5)
+    clonle.start(target="targets")
+    clonle.attempt("snipers")
+    clonle.attempt("maximum")
+    data = clonle.snapshot()
+    assert len(data) == 16 + 3 * 7
+
+    restored = ClonleBackend(special_db7, 7)
+    restored.restore(data)
+    assert restored.target == "targets"
+    assert restored.max_attempts == 5
+    assert restored.attempts == 2
+    assert restored.history == clonle.history
+    assert restored.get_state() == clonle.get_state()
+    assert restored.attempt("targets") == "xxxxxxx"
+
+
+def test_snapshot_before_start_raises(special_db7):
+    clonle = ClonleBackend(special_db7, 7)
+    with pytest.raises(NotInitializedError):
+        clonle.snapshot()
+
+
+def test_restore_rejects_bad_snapshots(special_db7, dummy_db3):
+    clonle = ClonleBackend(special_db7, 7)
+    clonle.start(target="targets")
+    clonle.attempt("snipers")
+    data = clonle.snapshot()
+
+    with pytest.raises(ValueError):
+        clonle.restore(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        clonle.restore(data[:-1])
+    with pytest.raises(ValueError):
+        clonle.restore(data[:10])
+
+    clonle3 = ClonleBackend(dummy_db3, 3)
+    with pytest.raises(ValueError):
+        clonle3.restore(data)
+
+
+def test_snapshot_length(special_db7):
+    clonle = ClonleBackend(special_db7, 7)
+    clonle.start(target="targets")
+    clonle.attempt("snipers")
+    data = clonle.snapshot()
+
+    assert snapshot_length(data) == 7
+    with pytest.raises(ValueError):
+        snapshot_length(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        snapshot_length(data[:10])
+
+
+def test_hard_mode_rejects_guess_ignoring_hints():
+    words = ["cakes", "rakes", "zeros", "hello", "salve"]
+    clonle = ClonleBackend.from_words(words, 5, hard_mode="standard")
+    clonle.start(target="rakes")
+    clonle.attempt("cakes")
+
+    with pytest.raises(ValueError, match="must be 'a'"):
+        clonle.attempt("zeros")
+    assert clonle.attempts == 1
+    assert clonle.attempt("rakes") == "xxxxx"
+
+
+def test_hard_mode_valid_guesses():
+    words = ["cakes", "rakes", "zeros", "hello", "salve"]
+    clonle = ClonleBackend.from_words(words, 5, hard_mode="strict")
+    clonle.start(target="rakes")
+    assert np.all(clonle.valid_guesses())
+
+    clonle.attempt("hello")
+    valid = [w for w, ok in zip(clonle.database.words, clonle.valid_guesses()) if ok]
+    assert valid == ["cakes", "rakes"]
+
+
+def test_hard_mode_is_reset_by_start():
+    words = ["cakes", "rakes", "zeros", "hello"]
+    clonle = ClonleBackend.from_words(words, 5, hard_mode="standard")
+    clonle.start(target="rakes")
+    clonle.attempt("cakes")
+    clonle.start(target="rakes")
+    clonle.attempt("hello")
+
+
+def test_hard_mode_survives_snapshot():
+    words = ["cakes", "rakes", "zeros", "hello"]
+    clonle = ClonleBackend.from_words(words, 5, hard_mode="standard")
+    clonle.start(target="rakes")
+    clonle.attempt("cakes")
+
+    restored = ClonleBackend.from_words(words, 5, hard_mode="standard")
+    restored.restore(clonle.snapshot())
+    with pytest.raises(ValueError):
+        restored.attempt("zeros")
+
+
+def test_unknown_hard_mode():
+    with pytest.raises(ValueError):
+        ClonleBackend.from_words(["cakes"], 5, hard_mode="impossible")
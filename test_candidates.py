@@ -0,0 +1,96 @@
+import pytest
+
+import pandas as pd
+import numpy as np
+
+from string import ascii_lowercase
+from backend import ClonleBackend, NotInitializedError
+from candidates import CandidateSet
+from dictionary import WordList
+from scoring import score_word
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    rng = np.random.default_rng(1)
+    # use a small alphabet to get plenty of repeated letters
+    letters = np.array(list(ascii_lowercase[:5]))
+    words = sorted(set("".join(rng.choice(letters, size=5)) for _ in range(400)))
+    return WordList.from_words(words, np.ones(len(words)))
+
+
+@pytest.fixture
+def clonle7() -> ClonleBackend:
+    db = pd.DataFrame(
+        {"word": ["snorkle", "targets", "snipers", "maximum"], "count": [4, 1, 1, 1]}
+    )
+    clonle = ClonleBackend(db, 7)
+    clonle.start(target_frequency_cutoff=0.5)
+    return clonle
+
+
+def test_new_candidate_set_contains_all_words(word_list):
+    candidates = CandidateSet(word_list)
+    assert candidates.count == len(word_list)
+    assert candidates.words == word_list.words
+
+
+def test_update_matches_brute_force(word_list):
+    words = word_list.words
+    for guess, target in [(words[0], words[1]), (words[5], words[-1])]:
+        candidates = CandidateSet(word_list)
+        feedback = score_word(guess, target)
+        candidates.update(guess, feedback)
+
+        expected = [_ for _ in words if score_word(guess, _) == feedback]
+        assert candidates.words == expected
+        assert candidates.count == len(expected)
+
+
+def test_multiple_updates_match_brute_force(word_list):
+    words = word_list.words
+    target = words[17]
+    guesses = [words[3], words[100], words[200]]
+
+    candidates = CandidateSet(word_list)
+    expected = words
+    for guess in guesses:
+        feedback = score_word(guess, target)
+        candidates.update(guess, feedback)
+        expected = [_ for _ in expected if score_word(guess, _) == feedback]
+
+    assert candidates.words == expected
+    assert target in candidates
+
+
+def test_update_accepts_feedback_strings():
+    word_list = WordList.from_words(["sakes", "rakes", "asses", "cakes"], np.ones(4))
+    candidates = CandidateSet(word_list)
+    candidates.update("asses", ".  xx")
+    assert candidates.words == ["rakes", "cakes"]
+
+
+def test_backend_candidates_raise_before_start(word_list):
+    clonle = ClonleBackend(word_list, 5)
+    with pytest.raises(NotInitializedError):
+        clonle.candidates
+
+
+def test_backend_candidates_track_attempts(clonle7):
+    assert clonle7.candidates.count == 4
+
+    clonle7.attempt("targets")
+    assert clonle7.candidates.words == ["snorkle"]
+
+
+def test_backend_candidates_replay_history_on_first_access(clonle7):
+    clonle7.attempt("maximum")
+    clonle7.attempt("targets")
+    assert clonle7.candidates.words == ["snorkle"]
+
+
+def test_backend_candidates_reset_on_start(clonle7):
+    clonle7.attempt("targets")
+    clonle7.candidates
+    clonle7.start()
+    assert clonle7.candidates.count == 4
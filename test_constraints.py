@@ -0,0 +1,103 @@
+import pytest
+
+import numpy as np
+
+from candidates import CandidateMasks
+from constraints import HardModeConstraints, HardModeError
+from dictionary import WordList
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    words = ["hello", "world", "abode", "zeros", "carts", "cakes", "rakes", "erase"]
+    return WordList.from_words(words, np.linspace(1, 0.1, len(words)))
+
+
+def test_fresh_constraints_allow_everything(word_list):
+    constraints = HardModeConstraints(5)
+    assert all(constraints.allows(_) for _ in word_list.words)
+    assert np.all(constraints.mask(CandidateMasks(word_list.matrix)))
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        HardModeConstraints(5, "extreme")
+
+
+def test_located_letter_must_stay():
+    constraints = HardModeConstraints(5)
+    constraints.update("cakes", "  xx ")
+    assert constraints.allows("rakes")
+    with pytest.raises(HardModeError, match="3rd letter must be 'k'"):
+        constraints.check("zeros")
+
+
+def test_contained_letter_must_be_reused():
+    constraints = HardModeConstraints(5)
+    constraints.update("zeros", " .   ")
+    assert constraints.allows("hello")
+    with pytest.raises(HardModeError, match="must contain 'e'"):
+        constraints.check("carts")
+
+
+def test_repeated_letters_need_minimum_count():
+    constraints = HardModeConstraints(5)
+    constraints.update("erase", ".   x")
+    assert constraints.allows("geese")
+    with pytest.raises(HardModeError, match="'e' 2 times"):
+        constraints.check("abode")
+
+
+def test_standard_mode_ignores_misses_and_positions():
+    constraints = HardModeConstraints(5)
+    constraints.update("zeros", " .   ")
+    # 'e' at the same position and 'z' are both allowed
+    assert constraints.allows("zesty")
+
+
+def test_strict_mode_forbids_positions_and_letters():
+    constraints = HardModeConstraints(5, "strict")
+    constraints.update("zeros", " .   ")
+    with pytest.raises(HardModeError, match="'e' cannot be the 2nd letter"):
+        constraints.check("hello")
+    with pytest.raises(HardModeError, match="cannot contain 's'"):
+        constraints.check("salve")
+    assert constraints.allows("abode") is False
+    assert constraints.allows("abide")
+    assert constraints.allows("eight")
+
+
+def test_strict_mode_limits_counts():
+    constraints = HardModeConstraints(5, "strict")
+    constraints.update("eerie", "x    ")
+    with pytest.raises(HardModeError, match="'e' more than once"):
+        constraints.check("eject")
+
+    constraints = HardModeConstraints(5, "strict")
+    constraints.update("eerie", "xx   ")
+    with pytest.raises(HardModeError, match="'e' more than 2 times"):
+        constraints.check("eeeth")
+
+
+def test_mask_matches_check(word_list):
+    masks = CandidateMasks(word_list.matrix)
+    for mode in ["standard", "strict"]:
+        constraints = HardModeConstraints(5, mode)
+        constraints.update("cakes", " .  x")
+        constraints.update("zeros", " x  x")
+        expected = [constraints.allows(_) for _ in word_list.words]
+        np.testing.assert_array_equal(constraints.mask(masks), expected)
+
+
+def test_update_accepts_codes(word_list):
+    from scoring import encode_words, str_to_feedback
+
+    c1 = HardModeConstraints(5, "strict")
+    c1.update("cakes", " .  x")
+    c2 = HardModeConstraints(5, "strict")
+    c2.update(encode_words(["cakes"])[0], str_to_feedback(" .  x"))
+
+    np.testing.assert_array_equal(c1.required, c2.required)
+    np.testing.assert_array_equal(c1.min_count, c2.min_count)
+    np.testing.assert_array_equal(c1.max_count, c2.max_count)
+    np.testing.assert_array_equal(c1.forbidden, c2.forbidden)
@@ -0,0 +1,151 @@
+import pytest
+
+import numpy as np
+
+from string import ascii_lowercase
+from backend import ClonleBackend, NotInitializedError
+from decision_tree import DecisionTree, build_decision_tree
+from dictionary import WordList
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    rng = np.random.default_rng(3)
+    letters = np.array(list(ascii_lowercase[:6]))
+    words = sorted(set("".join(rng.choice(letters, size=5)) for _ in range(300)))
+    freq = rng.random(len(words))
+    order = np.argsort(-freq)
+    return WordList.from_words([words[_] for _ in order], freq[order])
+
+
+@pytest.fixture
+def clonle(word_list) -> ClonleBackend:
+    clonle = ClonleBackend(word_list, 5, max_attempts=8)
+    clonle.start(target_n_cutoff=100)
+    return clonle
+
+
+def play(clonle: ClonleBackend, tree: DecisionTree, target: str) -> int:
+    clonle.start(target_n_cutoff=tree.meta["n_targets"], target=target)
+    for i in range(clonle.max_attempts):
+        if clonle.attempt(tree.next_guess(clonle.history)) == "xxxxx":
+            return i + 1
+    return clonle.max_attempts + 1
+
+
+@pytest.mark.parametrize("objective", ["expected", "minimax"])
+def test_tree_solves_every_target(clonle, tmp_path, objective):
+    tree = build_decision_tree(clonle, objective=objective, cache_dir=tmp_path)
+    targets = clonle.database.words[: clonle.n_targets]
+    n_guesses = [play(clonle, tree, target) for target in targets]
+
+    assert max(n_guesses) == tree.meta["max_guesses"]
+    assert max(n_guesses) <= clonle.max_attempts
+    assert np.mean(n_guesses) == pytest.approx(tree.meta["expected_guesses"])
+
+
+def test_wider_beam_is_not_worse(clonle, tmp_path):
+    narrow = build_decision_tree(clonle, beam_width=1, cache_dir=tmp_path)
+    wide = build_decision_tree(clonle, beam_width=[4, 2], cache_dir=tmp_path)
+    expected_narrow = narrow.meta["expected_guesses"]
+    assert wide.meta["expected_guesses"] <= expected_narrow + 1e-12
+
+
+def test_save_and_load(clonle, tmp_path):
+    tree = build_decision_tree(clonle, cache_dir=tmp_path)
+    fname = tmp_path / "tree.npz"
+    tree.save(fname)
+    loaded = DecisionTree.load(fname)
+
+    assert loaded.meta == tree.meta
+    assert len(loaded) == len(tree)
+    assert loaded.matches(clonle)
+
+    target = clonle.database.words[17]
+    assert play(clonle, loaded, target) == play(clonle, tree, target)
+
+
+def test_matches_checks_target_pool(clonle, tmp_path):
+    tree = build_decision_tree(clonle, cache_dir=tmp_path)
+    clonle.start(target_n_cutoff=50)
+    assert not tree.matches(clonle)
+
+
+def test_next_guess_raises_on_deviating_history(clonle, tmp_path):
+    tree = build_decision_tree(clonle, cache_dir=tmp_path)
+    opening = tree.next_guess([])
+    other = next(_ for _ in clonle.database.words if _ != opening)
+    with pytest.raises(ValueError):
+        tree.next_guess([(other, "     ")])
+
+
+def test_build_raises_if_not_started(word_list, tmp_path):
+    clonle = ClonleBackend(word_list, 5)
+    with pytest.raises(NotInitializedError):
+        build_decision_tree(clonle, cache_dir=tmp_path)
+
+
+def test_build_raises_if_too_few_attempts(clonle, tmp_path):
+    clonle.max_attempts = 2
+    with pytest.raises(ValueError):
+        build_decision_tree(clonle, cache_dir=tmp_path)
+
+
+def test_matches_checks_max_attempts(clonle, tmp_path):
+    tree = build_decision_tree(clonle, cache_dir=tmp_path)
+    clonle.max_attempts = tree.meta["max_guesses"]
+    assert tree.matches(clonle)
+    clonle.max_attempts = tree.meta["max_guesses"] - 1
+    assert not tree.matches(clonle)
+
+
+def _brute_force_total(table, max_attempts, cands: list, depth: int = 0) -> float:
+    """Smallest total number of guesses over `cands`, trying every guess."""
+    if depth >= max_attempts:
+        return np.inf
+    if len(cands) == 1:
+        return 1
+
+    best = np.inf
+    for guess in range(len(table)):
+        groups = {}
+        for target in cands:
+            groups.setdefault(int(table[guess, target]), []).append(target)
+        if len(groups) == 1 and guess not in cands:
+            continue
+        total = len(cands)
+        for group in groups.values():
+            if group != [guess]:
+                total += _brute_force_total(table, max_attempts, group, depth + 1)
+        best = min(best, total)
+    return best
+
+
+@pytest.mark.parametrize("objective", ["expected", "minimax"])
+def test_exhaustive_is_not_worse_than_beam(clonle, tmp_path, objective):
+    clonle.start(target_n_cutoff=20)
+    beam = build_decision_tree(
+        clonle, objective=objective, beam_width=[4, 2], cache_dir=tmp_path
+    )
+    best = build_decision_tree(
+        clonle, objective=objective, beam_width=None, cache_dir=tmp_path
+    )
+    assert best.meta["exhaustive"]
+    assert not beam.meta["exhaustive"]
+
+    key = "expected_guesses" if objective == "expected" else "max_guesses"
+    assert best.meta[key] <= beam.meta[key] + 1e-12
+
+    targets = clonle.database.words[: clonle.n_targets]
+    n_guesses = [play(clonle, best, target) for target in targets]
+    assert np.mean(n_guesses) == pytest.approx(best.meta["expected_guesses"])
+
+
+def test_exhaustive_is_optimal(word_list, tmp_path):
+    clonle = ClonleBackend(word_list.head(12), 5, max_attempts=4)
+    clonle.start(target_n_cutoff=6)
+    tree = build_decision_tree(clonle, beam_width=None, cache_dir=tmp_path)
+
+    table = clonle.pattern_table(target_n_cutoff=6, cache_dir=tmp_path)
+    total = _brute_force_total(table, clonle.max_attempts, list(range(6)))
+    assert tree.meta["expected_guesses"] * 6 == pytest.approx(total)
@@ -0,0 +1,188 @@
+import pytest
+
+import os
+import pandas as pd
+import numpy as np
+
+from backend import ClonleBackend
+from dictionary import (
+    SortedWordIndex,
+    TruncatedIndex,
+    WordList,
+    compile_dictionary,
+    load_compiled,
+    save_compiled,
+)
+
+
+@pytest.fixture
+def mixed_db() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "word": ["foo", "snorkle", "bar", "targets", "baz", "sn1pers", "maximum"],
+            "count": [4, 5, 3, 1, 2, 8, 6],
+        }
+    )
+
+
+@pytest.fixture
+def compiled_path(mixed_db, tmp_path) -> str:
+    path = os.path.join(tmp_path, "dictionary")
+    compile_dictionary(mixed_db, path)
+    return path
+
+
+def test_word_list_from_words():
+    word_list = WordList.from_words(["foo", "bar"], [0.5, 0.2])
+    assert len(word_list) == 2
+    assert word_list.length == 3
+    assert word_list.words == ["foo", "bar"]
+    assert "bar" in word_list
+    assert "baz" not in word_list
+
+
+def test_word_list_head_does_not_copy():
+    word_list = WordList.from_words(["foo", "bar", "baz"], [0.5, 0.2, 0.1])
+    head = word_list.head(2)
+    assert head.words == ["foo", "bar"]
+    assert np.shares_memory(head.matrix, word_list.matrix)
+
+
+def test_word_list_head_shares_lookup_tables():
+    word_list = WordList.from_words(["foo", "bar", "baz"], [0.5, 0.2, 0.1])
+    word_list.index
+    head = word_list.head(2)
+    assert head.words == ["foo", "bar"]
+    assert head.words[0] is word_list.words[0]
+    assert isinstance(head.index, TruncatedIndex)
+    assert head.index.index is word_list.index
+    assert "bar" in head
+    assert "baz" not in head
+    assert head.index.get("baz") is None
+    assert dict(head.index) == {"foo": 0, "bar": 1}
+
+    # heads of heads wrap the original index, and whole-list heads share it
+    assert head.head(1).index.index is word_list.index
+    assert word_list.head(10).index is word_list.index
+
+
+def test_compile_writes_per_length_files(compiled_path):
+    names = set(os.listdir(compiled_path))
+    assert names == {
+        "meta.json",
+        "words_03.npy",
+        "freq_03.npy",
+        "words_07.npy",
+        "freq_07.npy",
+    }
+
+
+def test_load_compiled_sorted_by_frequency(compiled_path):
+    word_list = load_compiled(compiled_path, 7)
+    assert word_list.words == ["maximum", "snorkle", "targets"]
+    assert word_list.freq.dtype == np.float32
+    assert np.all(np.diff(word_list.freq) <= 0)
+
+
+def test_load_compiled_frequencies_use_whole_database(compiled_path, mixed_db):
+    word_list = load_compiled(compiled_path, 3)
+    total = mixed_db["count"].sum()
+    np.testing.assert_allclose(word_list.freq, np.array([4, 3, 2]) / total, rtol=1e-6)
+
+
+def test_load_compiled_is_memory_mapped(compiled_path):
+    word_list = load_compiled(compiled_path, 3)
+    assert isinstance(word_list.matrix, np.memmap)
+
+
+def test_load_compiled_raises_for_missing_length(compiled_path):
+    with pytest.raises(ValueError):
+        load_compiled(compiled_path, 5)
+
+
+def test_backend_accepts_compiled_dictionary(compiled_path, mixed_db):
+    clonle1 = ClonleBackend(load_compiled(compiled_path, 7), 7)
+    clonle2 = ClonleBackend(mixed_db, 7)
+
+    assert clonle1.database.words == clonle2.database.words
+
+    clonle1.start()
+    clonle2.start()
+    assert clonle1.target == clonle2.target
+    assert clonle1.attempt("targets") == clonle2.attempt("targets")
+
+
+def test_backend_frequency_cutoff_on_compiled_dictionary(compiled_path):
+    clonle = ClonleBackend(load_compiled(compiled_path, 3), 3, frequency_cutoff=0.1)
+    assert clonle.database.words == ["foo", "bar"]
+
+
+def test_backend_raises_for_wrong_word_list_length(compiled_path):
+    with pytest.raises(ValueError):
+        ClonleBackend(load_compiled(compiled_path, 3), 7)
+
+
+def test_word_list_word():
+    word_list = WordList.from_words(["foo", "bar", "baz"], [0.5, 0.2, 0.1])
+    assert word_list.word(1) == "bar"
+    assert word_list._words is None
+    assert [word_list.word(_) for _ in range(3)] == word_list.words
+
+
+def test_sorted_word_index():
+    words = ["rakes", "crane", "zeros", "abode", "carts"]
+    index = SortedWordIndex.from_matrix(WordList.from_words(words, [1] * 5).matrix)
+    assert len(index) == 5
+    assert list(index) == sorted(words)
+    for i, word in enumerate(words):
+        assert word in index
+        assert index[word] == i
+        assert index.get(word) == i
+    assert dict(index) == {word: i for i, word in enumerate(words)}
+
+
+@pytest.mark.parametrize("word", ["crank", "cran", "cranes", "CRANE", "cräne", 5, None])
+def test_sorted_word_index_missing(word):
+    index = SortedWordIndex.from_matrix(WordList.from_words(["crane"], [1]).matrix)
+    assert word not in index
+    assert index.get(word) is None
+    assert index.get(word, -1) == -1
+    with pytest.raises(KeyError):
+        index[word]
+
+
+def test_load_compiled_with_index(compiled_path, tmp_path):
+    word_lists = {_: load_compiled(compiled_path, _) for _ in [3, 7]}
+    path = os.path.join(tmp_path, "indexed")
+    save_compiled(word_lists, path, index=True)
+
+    for length, word_list in word_lists.items():
+        loaded = load_compiled(path, length)
+        assert isinstance(loaded.index, SortedWordIndex)
+        assert isinstance(loaded.index.sorted_words, np.memmap)
+        assert loaded.words == word_list.words
+        assert dict(loaded.index) == word_list.index
+
+
+def test_head_keeps_sorted_word_index(compiled_path, tmp_path):
+    path = os.path.join(tmp_path, "indexed")
+    save_compiled({7: load_compiled(compiled_path, 7)}, path, index=True)
+
+    word_list = load_compiled(path, 7)
+    head = word_list.head(2)
+    assert head.index.index is word_list.index
+    assert isinstance(head.index.index, SortedWordIndex)
+    assert head._words is None
+    assert "snorkle" in head
+    assert "targets" not in head
+
+
+def test_backend_with_sorted_word_index(compiled_path, tmp_path):
+    path = os.path.join(tmp_path, "indexed")
+    save_compiled({7: load_compiled(compiled_path, 7)}, path, index=True)
+
+    clonle = ClonleBackend(load_compiled(path, 7), 7)
+    clonle.start(target="targets")
+    assert clonle.attempt("maximum") == " x     "
+    with pytest.raises(ValueError):
+        clonle.attempt("xxxxxxx")
@@ -0,0 +1,69 @@
+import pytest
+
+import functools
+import os
+import numpy as np
+
+from string import ascii_lowercase
+from backend import ClonleBackend
+from dictionary import WordList
+from evaluate import evaluate, play_game
+from solver import EntropySolver
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    rng = np.random.default_rng(5)
+    letters = np.array(list(ascii_lowercase[:6]))
+    words = sorted(set("".join(rng.choice(letters, size=4)) for _ in range(200)))
+    return WordList.from_words(words, np.linspace(1, 0.1, len(words)))
+
+
+def test_play_game_finds_target(word_list, tmp_path):
+    clonle = ClonleBackend(word_list, 4, max_attempts=20)
+    clonle.start(target_n_cutoff=50, target=word_list.words[7])
+    n_guesses = play_game(clonle, EntropySolver(clonle, cache_dir=tmp_path), 20)
+
+    assert 1 <= n_guesses <= 20
+    assert clonle.history[-1][0] == word_list.words[7]
+
+
+def test_evaluate_plays_every_target(word_list, tmp_path):
+    res = evaluate(word_list, 4, 50, n_workers=0, cache_dir=tmp_path)
+
+    assert len(res["n_guesses"]) == 50
+    assert res["targets"] == word_list.words[:50]
+    assert res["n_failed"] == 0
+    assert sum(res["distribution"].values()) == 50
+    assert res["mean"] == pytest.approx(np.mean(res["n_guesses"]))
+
+
+def test_evaluate_in_parallel_matches_serial(word_list, tmp_path):
+    res1 = evaluate(word_list, 4, 50, n_workers=0, cache_dir=tmp_path)
+    res2 = evaluate(word_list, 4, 50, n_workers=2, chunk_size=7, cache_dir=tmp_path)
+
+    np.testing.assert_equal(res1["n_guesses"], res2["n_guesses"])
+
+
+def test_evaluate_with_custom_solver(word_list, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache_dir = tmp_path / "cache"
+    factory = functools.partial(EntropySolver, metric="min", cache_dir=cache_dir)
+    res = evaluate(
+        word_list, 4, 20, solver_factory=factory, n_workers=0, cache_dir=cache_dir
+    )
+    assert res["n_failed"] == 0
+
+    # the table is only built once, in the solver's cache folder
+    assert len(os.listdir(cache_dir)) == 1
+    assert not os.path.exists(tmp_path / "save")
+
+
+def test_evaluate_uses_solver_cache_dir(word_list, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache_dir = tmp_path / "cache"
+    factory = functools.partial(EntropySolver, cache_dir=cache_dir)
+    evaluate(word_list, 4, 20, solver_factory=factory, n_workers=0)
+
+    assert len(os.listdir(cache_dir)) == 1
+    assert not os.path.exists(tmp_path / "save")
@@ -0,0 +1,163 @@
+import pytest
+
+import gzip
+import json
+import numpy as np
+
+from adversarial import AdversarialBackend
+from backend import ClonleBackend
+from dictionary import WordList
+from gamelog import GameLog, analyze, read_games, verify_games
+from multiboard import MultiBoardBackend
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    words = ["hello", "world", "abode", "zeros", "carts", "cakes", "rakes", "erase"]
+    return WordList.from_words(words, np.linspace(1, 0.1, len(words)))
+
+
+@pytest.fixture
+def log(tmp_path) -> GameLog:
+    return GameLog(str(tmp_path / "logs" / "games.jsonl"))
+
+
+def play(clonle: ClonleBackend, guesses: list):
+    for guess in guesses[: clonle.max_attempts]:
+        if clonle.attempt(guess) == clonle.length * "x":
+            break
+
+
+def test_finished_games_are_logged(word_list, log):
+    clonle = ClonleBackend(word_list, 5, rng=3, game_log=log)
+    clonle.start(target="rakes")
+    clonle.attempt("cakes")
+    with pytest.raises(FileNotFoundError):
+        list(log)
+    clonle.attempt("rakes")
+
+    (record,) = read_games(log.path)
+    assert record["backend"] == "ClonleBackend"
+    assert record["seed"] == 3
+    assert record["targets"] == ["rakes"]
+    assert record["guesses"] == ["cakes", "rakes"]
+    assert record["feedback"] == [" xxxx", "xxxxx"]
+    assert len(record["times"]) == 2
+    assert record["won"]
+
+
+def test_lost_games_are_logged(word_list, log):
+    clonle = ClonleBackend(word_list, 5, max_attempts=2, game_log=log)
+    clonle.start(target="rakes")
+    clonle.attempt("cakes")
+    clonle.attempt("hello")
+
+    (record,) = read_games(log.path)
+    assert not record["won"]
+
+
+def test_unfinished_games_are_not_logged(word_list, log):
+    clonle = ClonleBackend(word_list, 5, game_log=log)
+    clonle.start(target="rakes")
+    clonle.attempt("cakes")
+    clonle.start(target="rakes")
+    with pytest.raises(FileNotFoundError):
+        list(read_games(log.path))
+
+
+def test_restore_does_not_log_again(word_list, log):
+    clonle = ClonleBackend(word_list, 5, game_log=log)
+    clonle.start(target="rakes")
+    clonle.attempt("rakes")
+
+    restored = ClonleBackend(word_list, 5, game_log=log)
+    restored.restore(clonle.snapshot())
+    assert len(list(read_games(log.path))) == 1
+
+
+def test_adversarial_game_logs_final_target(word_list, log):
+    clonle = AdversarialBackend(word_list, 5, max_attempts=3, game_log=log)
+    clonle.start()
+    for guess in ["cakes", "hello", "zeros"]:
+        clonle.attempt(guess)
+
+    (record,) = read_games(log.path)
+    assert record["targets"] == [clonle.target]
+    assert all(ok for _, ok in verify_games([record]))
+
+
+def test_multiboard_game_is_logged(word_list, log):
+    clonle = MultiBoardBackend(word_list, 5, n_boards=2, game_log=log)
+    clonle.start(targets=["rakes", "hello"])
+    for guess in ["rakes", "cakes", "hello"]:
+        clonle.attempt(guess)
+
+    (record,) = read_games(log.path)
+    assert record["targets"] == ["rakes", "hello"]
+    assert record["feedback"][2][0] is None
+    assert record["won"]
+    assert all(ok for _, ok in verify_games([record]))
+
+
+def test_verify_detects_bad_records(word_list, log):
+    clonle = ClonleBackend(word_list, 5, game_log=log)
+    for target in ["rakes", "hello", "zeros"]:
+        clonle.start(target=target)
+        clonle.attempt("cakes")
+        clonle.attempt(target)
+
+    records = list(read_games(log.path))
+    records[1]["feedback"][0] = "xxxx "
+    records[2]["guesses"][0] = "CAKES"
+    results = [ok for _, ok in verify_games(records, batch_size=2)]
+    assert results == [True, False, False]
+
+
+def test_read_games_skips_broken_lines(word_list, log):
+    clonle = ClonleBackend(word_list, 5, game_log=log)
+    clonle.start(target="rakes")
+    clonle.attempt("rakes")
+    with open(log.path, "at") as f:
+        f.write('{"version": 1, "targ')
+
+    assert len(list(read_games(log.path))) == 1
+
+
+def test_compressed_log(word_list, tmp_path):
+    log = GameLog(str(tmp_path / "games.jsonl.gz"))
+    clonle = ClonleBackend(word_list, 5, game_log=log)
+    for _ in range(2):
+        clonle.start(target="rakes")
+        clonle.attempt("rakes")
+
+    with gzip.open(log.path, "rt") as f:
+        assert len(f.readlines()) == 2
+    assert len(list(read_games(log.path))) == 2
+
+
+def test_analyze(word_list, tmp_path):
+    log1 = GameLog(str(tmp_path / "one.jsonl"))
+    log2 = GameLog(str(tmp_path / "two.jsonl"))
+    clonle = ClonleBackend(word_list, 5, max_attempts=3, game_log=log1)
+    for target in ["rakes", "hello", "zeros"]:
+        clonle.start(target=target)
+        play(clonle, ["cakes", "rakes", "hello"])
+
+    clonle.game_log = log2
+    clonle.start(target="erase")
+    play(clonle, ["cakes", "rakes", "hello"])
+    with open(log2.path, "at") as f:
+        record = json.loads(open(log1.path).readline())
+        record["feedback"][0] = "xxxxx"
+        f.write(json.dumps(record) + "\n")
+
+    stats = analyze([log1.path, log2.path], batch_size=2)
+    assert stats.games[5] == 4
+    assert stats.invalid[5] == 1
+    assert stats.win_rate(5) == pytest.approx(0.5)
+
+    summary = stats.summary()
+    assert summary["5"]["guess_distribution"] == {"2": 1, "3": 1}
+    hardest = [_[0] for _ in summary["5"]["hardest"]]
+    assert set(hardest[:2]) == {"zeros", "erase"}
+    assert hardest[-1] == "rakes"
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from backend import ClonleBackend
+from dictionary import WordList
+from instrumentation import Stats, Timer, stats, timed
+
+
+@pytest.fixture
+def enabled_stats():
+    stats.reset()
+    stats.enable()
+    yield stats
+    stats.disable()
+    stats.reset()
+
+
+def test_timer_statistics():
+    timer = Timer()
+    for duration in [1000, 2000, 3000, 1_000_000]:
+        timer.add(duration)
+    assert timer.count == 4
+    assert timer.total == pytest.approx(1.006e-3)
+    assert timer.min == pytest.approx(1e-6)
+    assert timer.max == pytest.approx(1e-3)
+    assert sum(timer.buckets) == 4
+
+    assert timer.percentile(50) <= 4.1e-6
+    assert timer.percentile(100) == pytest.approx(1e-3)
+
+
+def test_timer_summary_is_json_serializable():
+    timer = Timer()
+    timer.add(5000)
+    summary = json.loads(json.dumps(timer.summary()))
+    assert summary["count"] == 1
+    assert summary["mean_us"] == pytest.approx(5)
+    assert sum(summary["histogram_us"].values()) == 1
+
+
+def test_stats_timer_context():
+    crt = Stats()
+    with crt.timer("block"):
+        pass
+    assert crt.timers == {}
+
+    crt.enable()
+    with crt.timer("block"):
+        pass
+    assert crt.timers["block"].count == 1
+
+
+def test_timed_does_nothing_when_disabled():
+    stats.reset()
+
+    @timed("test.func")
+    def func(x):
+        return 2 * x
+
+    assert func(3) == 6
+    assert "test.func" not in stats.timers
+
+
+def test_timed_records_when_enabled(enabled_stats):
+    @timed("test.func")
+    def func(x):
+        return 2 * x
+
+    func(1)
+    func(2)
+    assert enabled_stats.timers["test.func"].count == 2
+
+
+def test_timed_records_exceptions(enabled_stats):
+    @timed("test.fail")
+    def fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        fail()
+    assert enabled_stats.timers["test.fail"].count == 1
+
+
+def test_backend_is_instrumented(enabled_stats, tmp_path):
+    word_list = WordList.from_words(["hello", "world", "abode"], [3, 2, 1])
+    clonle = ClonleBackend(word_list, 5)
+    clonle.start()
+    clonle.attempt("hello")
+    with pytest.raises(ValueError):
+        clonle.attempt("zzzzz")
+
+    timers = enabled_stats.timers
+    for name in ["backend.clean_db", "backend.start", "backend.select_target"]:
+        assert timers[name].count == 1
+    assert timers["backend.attempt"].count == 2
+    assert timers["backend.attempt.validate"].count == 2
+    assert timers["backend.attempt.score"].count == 1
+
+    fname = tmp_path / "stats.json"
+    enabled_stats.dump(fname)
+    with open(fname) as f:
+        data = json.load(f)
+    assert data["backend.attempt"]["count"] == 2
+    assert "backend.attempt" in enabled_stats.report()
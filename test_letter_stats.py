@@ -0,0 +1,125 @@
+import pytest
+
+import numpy as np
+
+from backend import ClonleBackend
+from candidates import CandidateSet
+from dictionary import WordList
+from letter_stats import LetterStats
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    words = ["hello", "world", "abode", "zeros", "carts", "cakes", "rakes", "erase"]
+    freq = [0.3, 0.2, 0.1, 0.1, 0.1, np.nan, 0.05, 0.05]
+    return WordList.from_words(words, freq)
+
+
+def brute_force(words: list, freq: list) -> dict:
+    freq = np.nan_to_num(np.asarray(freq, dtype=float))
+    length = len(words[0]) if words else 5
+    res = {
+        "position_counts": np.zeros((length, 26)),
+        "position_weights": np.zeros((length, 26)),
+        "letter_counts": np.zeros(26),
+        "letter_weights": np.zeros(26),
+        "pair_counts": np.zeros((26, 26)),
+        "pair_weights": np.zeros((26, 26)),
+    }
+    for word, w in zip(words, freq):
+        letters = sorted(set(ord(_) - ord("a") for _ in word))
+        for i, ch in enumerate(word):
+            res["position_counts"][i, ord(ch) - ord("a")] += 1
+            res["position_weights"][i, ord(ch) - ord("a")] += w
+        for c in letters:
+            res["letter_counts"][c] += 1
+            res["letter_weights"][c] += w
+            for d in letters:
+                res["pair_counts"][c, d] += 1
+                res["pair_weights"][c, d] += w
+    return res
+
+
+def check_stats(stats: LetterStats, words: list, freq: list):
+    expected = brute_force(words, freq)
+    assert stats.n_words == len(words)
+    assert stats.total_weight == pytest.approx(np.nansum(freq))
+    for key, value in expected.items():
+        np.testing.assert_allclose(getattr(stats, key), value, atol=1e-12)
+
+
+def test_stats_match_brute_force(word_list):
+    stats = LetterStats(word_list)
+    check_stats(stats, word_list.words, word_list.freq)
+
+
+def test_stats_on_subset(word_list):
+    mask = np.zeros(len(word_list), dtype=bool)
+    mask[[1, 4, 5]] = True
+    stats = LetterStats(word_list, mask)
+    check_stats(stats, [word_list.words[_] for _ in [1, 4, 5]], word_list.freq[mask])
+
+
+@pytest.mark.parametrize("removed", [[0], [0, 2, 3, 6], list(range(8))])
+def test_update_matches_recomputing(word_list, removed):
+    stats = LetterStats(word_list)
+    mask = np.ones(len(word_list), dtype=bool)
+    mask[removed] = False
+    stats.update(mask)
+
+    kept = np.flatnonzero(mask)
+    check_stats(stats, [word_list.words[_] for _ in kept], word_list.freq[kept])
+
+
+def test_update_never_adds_words(word_list):
+    mask = np.zeros(len(word_list), dtype=bool)
+    mask[:3] = True
+    stats = LetterStats(word_list, mask)
+    stats.update(np.ones(len(word_list), dtype=bool))
+    assert stats.n_words == 3
+
+
+def test_distributions(word_list):
+    stats = LetterStats(word_list)
+    np.testing.assert_allclose(stats.position_distribution().sum(axis=1), 1)
+    np.testing.assert_allclose(
+        stats.position_distribution(weighted=True).sum(axis=1), 1
+    )
+    assert stats.letter_distribution()[ord("e") - ord("a")] == pytest.approx(6 / 8)
+    np.testing.assert_allclose(
+        np.diag(stats.pair_distribution()), stats.letter_distribution()
+    )
+
+    stats.update(np.zeros(len(word_list), dtype=bool))
+    assert np.all(stats.position_distribution() == 0)
+
+
+def test_most_common(word_list):
+    stats = LetterStats(word_list)
+    assert stats.most_common(1) == ["e"]
+    assert stats.most_common(2, position=4) == ["s", "e"]
+    assert stats.most_common(1, position=0, weighted=True) == ["h"]
+
+
+def test_follows_candidates(word_list):
+    cands = CandidateSet(word_list)
+    stats = LetterStats.from_candidates(cands)
+    cands.update("cakes", " xx x")
+    stats.update_from_candidates(cands)
+    assert stats.n_words == len(cands)
+    check_stats(stats, cands.words, [word_list.freq[_] for _ in cands.indices()])
+
+
+def test_backend_letter_stats(word_list):
+    clonle = ClonleBackend(word_list, 5)
+    clonle.start(target="rakes")
+    stats = clonle.letter_stats
+    assert stats.n_words == len(word_list)
+
+    clonle.attempt("cakes")
+    assert clonle.letter_stats is stats
+    assert stats.n_words == len(clonle.candidates)
+    assert stats.most_common(1, position=0) == ["r"]
+
+    clonle.start(target="rakes")
+    assert clonle.letter_stats.n_words == len(word_list)
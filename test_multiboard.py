@@ -0,0 +1,152 @@
+import pytest
+
+import numpy as np
+
+from string import ascii_lowercase
+from backend import ClonleBackend, GameOverError, NotInitializedError
+from dictionary import WordList
+from multiboard import MultiBoardBackend
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    rng = np.random.default_rng(5)
+    letters = np.array(list(ascii_lowercase[:8]))
+    words = sorted(set("".join(rng.choice(letters, size=5)) for _ in range(500)))
+    return WordList.from_words(words, np.ones(len(words)))
+
+
+@pytest.fixture
+def clonle(word_list) -> MultiBoardBackend:
+    clonle = MultiBoardBackend(word_list, 5, n_boards=4, rng=1)
+    clonle.start()
+    return clonle
+
+
+def test_default_max_attempts(word_list):
+    assert MultiBoardBackend(word_list, 5, n_boards=8).max_attempts == 13
+
+
+def test_start_chooses_distinct_targets(clonle, word_list):
+    assert len(set(clonle.targets)) == 4
+    assert all(_ in word_list for _ in clonle.targets)
+    assert not np.any(clonle.solved)
+
+
+def test_start_with_targets(clonle, word_list):
+    targets = word_list.words[:4]
+    clonle.start(targets=targets)
+    assert clonle.targets == targets
+
+
+def test_start_with_wrong_number_of_targets_raises(clonle, word_list):
+    with pytest.raises(ValueError):
+        clonle.start(targets=word_list.words[:3])
+
+
+def test_start_with_too_few_possible_targets_raises(clonle):
+    with pytest.raises(ValueError):
+        clonle.start(target_n_cutoff=3)
+
+
+def test_weighted_start_chooses_distinct_targets(word_list):
+    freq = np.zeros(len(word_list))
+    freq[:4] = [0.4, 0.3, 0.2, 0.1]
+    weighted_list = WordList(word_list.matrix, freq)
+    clonle = MultiBoardBackend(weighted_list, 5, n_boards=4, rng=1)
+    clonle.start(weighted=True)
+    assert sorted(clonle.targets) == sorted(word_list.words[:4])
+
+
+def test_weighted_start_with_too_few_nonzero_frequencies_raises(word_list):
+    freq = np.zeros(len(word_list))
+    freq[:3] = 1.0
+    weighted_list = WordList(word_list.matrix, freq)
+    clonle = MultiBoardBackend(weighted_list, 5, n_boards=4, rng=1)
+    with pytest.raises(ValueError):
+        clonle.start(weighted=True)
+
+
+def test_attempt_matches_single_board(clonle, word_list):
+    guesses = word_list.words[10:15]
+    singles = []
+    for target in clonle.targets:
+        single = ClonleBackend(word_list, 5, max_attempts=10)
+        single.start(target=target)
+        singles.append(single)
+
+    for guess in guesses:
+        res = clonle.attempt(guess)
+        for board, single in enumerate(singles):
+            assert res[board] == single.attempt(guess)
+            assert clonle.get_state(board) == single.get_state()
+
+
+def test_solved_boards_are_skipped(clonle):
+    target = clonle.targets[2]
+    res = clonle.attempt(target)
+    assert res[2] == "xxxxx"
+    assert clonle.solved.tolist() == [False, False, True, False]
+    assert clonle.solved_at[2] == 1
+
+    res = clonle.attempt(clonle.targets[0])
+    assert res[2] is None
+    assert res[0] == "xxxxx"
+    assert clonle.solved_at[0] == 2
+
+
+def test_game_over(clonle):
+    for target in clonle.targets:
+        assert not clonle.is_over
+        clonle.attempt(target)
+    assert clonle.is_over
+    with pytest.raises(GameOverError):
+        clonle.attempt(clonle.targets[0])
+
+
+def test_max_attempts(word_list):
+    clonle = MultiBoardBackend(word_list, 5, n_boards=2, max_attempts=1)
+    clonle.start()
+    clonle.attempt(next(_ for _ in word_list.words if _ not in clonle.targets))
+    assert clonle.is_over
+    with pytest.raises(GameOverError):
+        clonle.attempt(clonle.targets[0])
+
+
+def test_board_candidates(clonle, word_list):
+    clonle.attempt(word_list.words[0])
+    cands = clonle.board_candidates(1)
+    clonle.attempt(word_list.words[1])
+    assert clonle.targets[1] in cands
+
+    fresh = MultiBoardBackend(word_list, 5, n_boards=4)
+    fresh.start(targets=clonle.targets)
+    fresh.attempt(word_list.words[0])
+    fresh.attempt(word_list.words[1])
+    assert fresh.board_candidates(1).words == cands.words
+
+
+def test_get_state_for_all_boards(clonle):
+    states = clonle.get_state()
+    assert len(states) == 4
+    assert states[0] == clonle.get_state(0)
+
+
+def test_attempt_before_start_raises(word_list):
+    clonle = MultiBoardBackend(word_list, 5)
+    with pytest.raises(NotInitializedError):
+        clonle.attempt(word_list.words[0])
+
+
+def test_snapshot_restore(clonle, word_list):
+    clonle.attempt(clonle.targets[1])
+    clonle.attempt(word_list.words[0])
+    data = clonle.snapshot()
+    assert len(data) == 16 + (4 + 2) * 5
+
+    restored = MultiBoardBackend(word_list, 5, n_boards=4)
+    restored.restore(data)
+    assert restored.targets == clonle.targets
+    assert restored.history == clonle.history
+    np.testing.assert_equal(restored.solved, clonle.solved)
+    np.testing.assert_equal(restored.states, clonle.states)
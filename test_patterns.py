@@ -0,0 +1,72 @@
+import pytest
+
+import os
+import pandas as pd
+import numpy as np
+
+from backend import ClonleBackend
+from scoring import score_word
+from patterns import build_pattern_table, load_pattern_table, dictionary_hash
+
+
+@pytest.fixture
+def words5() -> list:
+    return ["cakes", "asses", "sakes", "rakes", "fooob", "barzz"]
+
+
+def test_build_pattern_table_matches_score_word(words5):
+    table = build_pattern_table(words5, words5[:3])
+
+    assert table.shape == (len(words5), 3)
+    assert table.dtype == np.uint8
+    for i, guess in enumerate(words5):
+        for j, target in enumerate(words5[:3]):
+            assert table[i, j] == score_word(guess, target)
+
+
+def test_dictionary_hash_depends_on_targets(words5):
+    assert dictionary_hash(words5, words5[:3]) != dictionary_hash(words5, words5[:4])
+
+
+def test_load_pattern_table_writes_cache(words5, tmp_path):
+    table = load_pattern_table(words5, words5, cache_dir=tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+    assert isinstance(table, np.memmap)
+
+
+def test_load_pattern_table_uses_cache(words5, tmp_path):
+    load_pattern_table(words5, words5, cache_dir=tmp_path)
+    (name,) = os.listdir(tmp_path)
+    mtime = os.path.getmtime(os.path.join(tmp_path, name))
+
+    table = load_pattern_table(words5, words5, cache_dir=tmp_path)
+    assert os.path.getmtime(os.path.join(tmp_path, name)) == mtime
+    np.testing.assert_equal(table, build_pattern_table(words5, words5))
+
+
+def test_load_pattern_table_keeps_other_dictionaries(words5, tmp_path):
+    load_pattern_table(words5, words5, cache_dir=tmp_path)
+    (old_name,) = os.listdir(tmp_path)
+    mtime = os.path.getmtime(os.path.join(tmp_path, old_name))
+
+    changed = words5[:-1] + ["other"]
+    table = load_pattern_table(changed, changed, cache_dir=tmp_path)
+    np.testing.assert_equal(table, build_pattern_table(changed, changed))
+
+    # another dictionary with the same length and number of targets may still be in
+    # use, so its table is neither removed nor rebuilt
+    assert len(os.listdir(tmp_path)) == 2
+    assert old_name in os.listdir(tmp_path)
+    table = load_pattern_table(words5, words5, cache_dir=tmp_path)
+    assert os.path.getmtime(os.path.join(tmp_path, old_name)) == mtime
+    np.testing.assert_equal(table, build_pattern_table(words5, words5))
+
+
+def test_backend_pattern_table_columns_are_targets(words5, tmp_path):
+    db = pd.DataFrame({"word": words5, "count": [6, 5, 4, 3, 2, 1]})
+    clonle = ClonleBackend(db, 5)
+    table = clonle.pattern_table(target_n_cutoff=2, cache_dir=tmp_path)
+
+    assert table.shape == (len(words5), 2)
+    words = clonle.database.words
+    assert table[2, 1] == score_word(words[2], words[1])
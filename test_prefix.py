@@ -0,0 +1,73 @@
+import pytest
+
+import numpy as np
+
+from backend import ClonleBackend, ClonleState
+from dictionary import WordList
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    words = ["hello", "world", "abode", "zeros", "carts", "cakes", "rakes", "crane"]
+    return WordList.from_words(words, np.linspace(1, 0.1, len(words)))
+
+
+def test_words_are_sorted(word_list):
+    index = word_list.prefix_index
+    assert index.words == sorted(word_list.words)
+    assert [word_list.words[_] for _ in index.order] == index.words
+
+
+def test_prefix_index_is_cached(word_list):
+    assert word_list.prefix_index is word_list.prefix_index
+
+
+def test_complete(word_list):
+    index = word_list.prefix_index
+    assert index.complete("ca") == ["cakes", "carts"]
+    assert index.complete("c") == ["cakes", "carts", "crane"]
+    assert index.complete("c", limit=2) == ["cakes", "carts"]
+    assert index.complete("crane") == ["crane"]
+    assert index.complete("cx") == []
+    assert index.complete("") == index.words
+
+
+def test_has_prefix(word_list):
+    index = word_list.prefix_index
+    assert index.has_prefix("")
+    assert index.has_prefix("zer")
+    assert index.has_prefix("hello")
+    assert not index.has_prefix("zz")
+    assert not index.has_prefix("helloo")
+
+
+def test_longest_prefix(word_list):
+    index = word_list.prefix_index
+    assert index.longest_prefix("crane") == 5
+    assert index.longest_prefix("crank") == 4
+    assert index.longest_prefix("cxxxx") == 1
+    assert index.longest_prefix("xxxxx") == 0
+    assert index.longest_prefix("zzzzz") == 1
+
+
+def test_complete_filters_by_letter_state(word_list):
+    index = word_list.prefix_index
+    states = np.zeros(26, dtype=np.int8)
+    states[ord("t") - ord("a")] = ClonleState.MISSING.value
+    states[ord("e") - ord("a")] = ClonleState.CONTAINED.value
+    assert index.complete("c", states) == ["cakes", "crane"]
+
+    states[ord("k") - ord("a")] = ClonleState.LOCATED.value
+    assert index.complete("", states) == ["cakes", "rakes"]
+    assert index.complete("", states, limit=1) == ["cakes"]
+
+
+def test_complete_with_backend_state(word_list):
+    clonle = ClonleBackend(word_list, 5)
+    clonle.start(target="rakes")
+    clonle.attempt("crane")
+
+    index = word_list.prefix_index
+    completions = index.complete("", clonle.letter_states)
+    assert completions == ["rakes"]
+    assert all(_ in clonle.candidates for _ in completions)
@@ -0,0 +1,88 @@
+import pytest
+
+import os
+import numpy as np
+
+from dictionary import load_compiled
+from prepare_dictionary import build_dictionary, read_frequencies, read_word_list
+
+
+@pytest.fixture
+def word_path(tmp_path) -> str:
+    fname = str(tmp_path / "words.txt")
+    with open(fname, "wt") as f:
+        f.write(
+            "Some Word List (2022). 7 words.\n\nBAR\nFOO\nNAN\nBAZ\nTARGETS\nMAXIMUM\n"
+        )
+    return fname
+
+
+@pytest.fixture
+def frequency_path(tmp_path) -> str:
+    fname = str(tmp_path / "unigram_freq.csv")
+    with open(fname, "wt") as f:
+        f.write("word,count\nthe,50\nfoo,20\nmaximum,15\nbar,10\nnan,5\n")
+    return fname
+
+
+@pytest.fixture
+def output(tmp_path) -> str:
+    return str(tmp_path / "dictionary")
+
+
+def test_read_word_list_skips_header(word_path):
+    words = list(read_word_list(word_path))
+    assert words == ["bar", "foo", "nan", "baz", "targets", "maximum"]
+
+
+def test_read_frequencies_only_keeps_requested_words(frequency_path):
+    counts = {"foo": np.nan, "baz": np.nan}
+    total = read_frequencies(frequency_path, counts)
+    assert total == 100
+    assert counts["foo"] == 20
+    assert np.isnan(counts["baz"])
+    assert "the" not in counts
+
+
+def test_build_sorts_by_frequency(word_path, frequency_path, output):
+    build_dictionary(word_path, frequency_path, output)
+
+    word_list = load_compiled(output, 3)
+    assert word_list.words == ["foo", "bar", "nan", "baz"]
+    np.testing.assert_allclose(word_list.freq[:3], [0.2, 0.1, 0.05])
+    assert np.isnan(word_list.freq[3])
+
+    word_list = load_compiled(output, 7)
+    assert word_list.words == ["maximum", "targets"]
+
+
+def test_build_restricts_lengths(word_path, frequency_path, output):
+    build_dictionary(word_path, frequency_path, output, lengths=[7])
+    assert "words_03.npy" not in os.listdir(output)
+    assert len(load_compiled(output, 7)) == 2
+
+
+def test_build_skips_when_inputs_unchanged(word_path, frequency_path, output):
+    assert build_dictionary(word_path, frequency_path, output)
+    assert not build_dictionary(word_path, frequency_path, output)
+    assert build_dictionary(word_path, frequency_path, output, force=True)
+
+    # different settings
+    assert build_dictionary(word_path, frequency_path, output, lengths=[3])
+
+
+def test_build_reruns_when_inputs_change(word_path, frequency_path, output):
+    build_dictionary(word_path, frequency_path, output)
+    with open(frequency_path, "at") as f:
+        f.write("baz,40\n")
+
+    assert build_dictionary(word_path, frequency_path, output)
+    assert load_compiled(output, 3).words[0] == "baz"
+
+
+def test_build_reruns_when_output_incomplete(word_path, frequency_path, output):
+    build_dictionary(word_path, frequency_path, output)
+    os.remove(os.path.join(output, "words_07.npy"))
+
+    assert build_dictionary(word_path, frequency_path, output)
+    assert len(load_compiled(output, 7)) == 2
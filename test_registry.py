@@ -0,0 +1,125 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from backend import ClonleBackend
+from dictionary import compile_dictionary
+from registry import DictionaryRegistry
+
+
+@pytest.fixture
+def dataframe() -> pd.DataFrame:
+    words = ["hello", "world", "abode", "zeros", "carts", "cakes", "rakes", "ab", "xy"]
+    counts = [20, 15, 10, 8, 5, 3, 1, 30, 2]
+    return pd.DataFrame({"word": words, "count": counts})
+
+
+@pytest.fixture
+def csv_source(dataframe, tmp_path) -> str:
+    fname = str(tmp_path / "dictionary.csv")
+    dataframe.to_csv(fname, index=False)
+    return fname
+
+
+@pytest.fixture
+def compiled_source(dataframe, tmp_path) -> str:
+    path = str(tmp_path / "dictionary")
+    compile_dictionary(dataframe, path)
+    return path
+
+
+@pytest.fixture
+def registry() -> DictionaryRegistry:
+    return DictionaryRegistry(max_size=3)
+
+
+@pytest.mark.parametrize("source", ["csv_source", "compiled_source"])
+def test_get_loads_sorted_words(registry, source, request):
+    word_list = registry.get(request.getfixturevalue(source), 5)
+    assert word_list.words == [
+        "hello",
+        "world",
+        "abode",
+        "zeros",
+        "carts",
+        "cakes",
+        "rakes",
+    ]
+
+
+def test_get_returns_same_object(registry, compiled_source):
+    word_list = registry.get(compiled_source, 5)
+    assert registry.get(compiled_source, 5) is word_list
+    assert registry.hits == 1
+    assert registry.misses == 1
+
+
+def test_arrays_are_read_only(registry, csv_source):
+    word_list = registry.get(csv_source, 5)
+    with pytest.raises(ValueError):
+        word_list.matrix[0, 0] = 0
+    with pytest.raises(ValueError):
+        word_list.freq[0] = 0
+
+
+def test_frequency_cutoff_is_prefix_view(registry, csv_source):
+    full = registry.get(csv_source, 5)
+    cutoff = registry.get(csv_source, 5, frequency_cutoff=8 / 94)
+    assert cutoff.words == ["hello", "world", "abode", "zeros"]
+    assert np.shares_memory(cutoff.matrix, full.matrix)
+
+
+def test_frequency_cutoff_shares_words_and_index(registry, csv_source):
+    full = registry.get(csv_source, 5)
+    cutoff = registry.get(csv_source, 5, frequency_cutoff=8 / 94)
+    assert all(a is b for a, b in zip(cutoff.words, full.words))
+    assert cutoff.index.index is full.index
+    assert "zeros" in cutoff
+    assert "carts" not in cutoff
+
+
+def test_lengths_are_separate(registry, compiled_source):
+    assert registry.get(compiled_source, 2).words == ["ab", "xy"]
+    assert len(registry.get(compiled_source, 5)) == 7
+
+
+def test_least_recently_used_is_evicted(registry, compiled_source):
+    word_list = registry.get(compiled_source, 5)
+    registry.get(compiled_source, 5, frequency_cutoff=0.1)
+    registry.get(compiled_source, 2)
+    # refresh the length-5 list
+    registry.get(compiled_source, 5)
+    registry.get(compiled_source, 5, frequency_cutoff=0.01)
+
+    assert len(registry) == 3
+    assert registry.get(compiled_source, 5) is word_list
+
+    misses = registry.misses
+    registry.get(compiled_source, 5, frequency_cutoff=0.1)
+    assert registry.misses == misses + 1
+
+
+def test_clear(registry, compiled_source):
+    word_list = registry.get(compiled_source, 5)
+    registry.clear()
+    assert len(registry) == 0
+    assert registry.get(compiled_source, 5) is not word_list
+
+
+def test_backends_share_word_list(registry, compiled_source):
+    clonle1 = ClonleBackend.from_source(compiled_source, 5, registry=registry)
+    clonle2 = ClonleBackend.from_source(compiled_source, 5, registry=registry, rng=1)
+    assert clonle1.database is clonle2.database
+
+    clonle1.start(target="world")
+    assert clonle1.attempt("hello") == "   x."
+
+
+def test_backend_from_source_keeps_cutoff(registry, csv_source, dataframe):
+    cutoff = 8 / 94
+    clonle = ClonleBackend.from_source(
+        csv_source, 5, frequency_cutoff=cutoff, registry=registry
+    )
+    assert clonle.frequency_cutoff == cutoff
+    assert clonle.database.words == ClonleBackend(dataframe, 5, cutoff).database.words
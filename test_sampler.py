@@ -0,0 +1,63 @@
+import pytest
+
+import numpy as np
+
+from sampler import TargetSampler
+
+
+@pytest.fixture
+def sampler() -> TargetSampler:
+    return TargetSampler(np.array([0.4, 0.3, 0.2, 0.1, 0.1, np.nan], dtype=np.float32))
+
+
+def test_count_without_cutoffs(sampler):
+    assert sampler.count() == 6
+
+
+def test_count_with_frequency_cutoff(sampler):
+    assert sampler.count(cutoff=0.25) == 2
+    assert sampler.count(cutoff=0.1) == 5
+    assert sampler.count(cutoff=0.5) == 0
+
+
+def test_count_with_n_cutoff(sampler):
+    assert sampler.count(n_cutoff=3) == 3
+    assert sampler.count(cutoff=0.25, n_cutoff=3) == 2
+
+
+def test_uniform_sample_matches_numpy_choice(sampler):
+    for seed in range(20):
+        expected = np.random.default_rng(seed).choice(5, size=1, replace=False)[0]
+        assert sampler.sample(np.random.default_rng(seed), 5) == expected
+
+
+def test_uniform_sample_stays_below_n(sampler):
+    rng = np.random.default_rng(1)
+    samples = [sampler.sample(rng, 3) for _ in range(100)]
+    assert set(samples) == {0, 1, 2}
+
+
+def test_weighted_sample_follows_frequency(sampler):
+    rng = np.random.default_rng(2)
+    samples = np.array([sampler.sample(rng, 6, weighted=True) for _ in range(10000)])
+    counts = np.bincount(samples, minlength=6) / len(samples)
+    expected = np.array([0.4, 0.3, 0.2, 0.1, 0.1, 0]) / 1.1
+    np.testing.assert_allclose(counts, expected, atol=0.02)
+
+
+def test_weighted_sample_restricted_to_n(sampler):
+    rng = np.random.default_rng(3)
+    samples = [sampler.sample(rng, 2, weighted=True) for _ in range(100)]
+    assert set(samples) == {0, 1}
+
+
+def test_weighted_sample_with_zero_weights_is_uniform():
+    sampler = TargetSampler(np.array([np.nan, np.nan, np.nan]))
+    rng = np.random.default_rng(4)
+    samples = [sampler.sample(rng, 3, weighted=True) for _ in range(100)]
+    assert set(samples) == {0, 1, 2}
+
+
+def test_sample_raises_without_targets(sampler):
+    with pytest.raises(ValueError):
+        sampler.sample(np.random.default_rng(0), 0)
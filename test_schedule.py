@@ -0,0 +1,104 @@
+import pytest
+
+import numpy as np
+
+from datetime import date, datetime
+
+from dictionary import WordList
+from schedule import Schedule, build_schedule, draw_schedule
+
+
+@pytest.fixture
+def word_lists() -> dict:
+    rng = np.random.default_rng(0)
+    res = {}
+    for length in [5, 6]:
+        matrix = rng.integers(0, 26, size=(50, length)).astype(np.uint8)
+        res[length] = WordList(matrix, np.linspace(1, 0.1, len(matrix)))
+    return res
+
+
+@pytest.fixture
+def schedule(word_lists, tmp_path) -> Schedule:
+    path = str(tmp_path / "schedule.bin")
+    build_schedule(word_lists, path, date(2026, 1, 1), 30, n_targets=20, window=10)
+    return Schedule(path)
+
+
+@pytest.mark.parametrize("window", [0, 1, 5, 19])
+def test_draw_schedule_has_no_repeats_within_window(window):
+    idxs = draw_schedule(20, 500, window, np.random.default_rng(1))
+    assert np.all((idxs >= 0) & (idxs < 20))
+    for i in range(len(idxs)):
+        assert idxs[i] not in idxs[i + 1 : i + 1 + window]
+
+
+def test_draw_schedule_uses_all_targets():
+    idxs = draw_schedule(20, 2000, 5, np.random.default_rng(1))
+    assert len(np.unique(idxs)) == 20
+
+
+def test_draw_schedule_window_must_be_less_than_n_targets():
+    with pytest.raises(ValueError):
+        draw_schedule(20, 10, 20, np.random.default_rng(1))
+
+
+def test_tables(schedule):
+    assert schedule.start == date(2026, 1, 1)
+    assert sorted(schedule.tables) == [
+        ("daily", 5),
+        ("daily", 6),
+        ("hourly", 5),
+        ("hourly", 6),
+    ]
+    assert schedule.n_targets(5) == 20
+    assert schedule.tables["daily", 5][1:3] == (30, 10)
+    assert schedule.tables["hourly", 6][1:3] == (30 * 24, 10)
+
+
+def test_targets_are_top_words(schedule, word_lists):
+    for length in [5, 6]:
+        top = set(word_lists[length].words[:20])
+        for period in ["daily", "hourly"]:
+            targets = schedule.targets(length, period)
+            assert set(targets) <= top
+            for i in range(len(targets)):
+                assert targets[i] not in targets[i + 1 : i + 11]
+
+
+def test_target_lookup(schedule):
+    daily = schedule.targets(5)
+    hourly = schedule.targets(6, "hourly")
+    assert schedule.target(5, date(2026, 1, 1)) == daily[0]
+    assert schedule.target(5, datetime(2026, 1, 3, 23, 59)) == daily[2]
+    assert schedule.target(6, datetime(2026, 1, 3, 7), "hourly") == hourly[2 * 24 + 7]
+
+
+def test_target_outside_schedule(schedule):
+    assert schedule.target(5, date(2025, 12, 31)) is None
+    assert schedule.target(5, date(2026, 1, 31)) is None
+    assert schedule.target(7, date(2026, 1, 1)) is None
+
+
+def test_schedule_is_reproducible(word_lists, tmp_path):
+    paths = [str(tmp_path / f"schedule{_}.bin") for _ in range(3)]
+    build_schedule(word_lists, paths[0], date(2026, 1, 1), 30, n_targets=20, seed=1)
+    build_schedule(word_lists, paths[1], date(2026, 1, 1), 30, n_targets=20, seed=1)
+    build_schedule(word_lists, paths[2], date(2026, 1, 1), 30, n_targets=20, seed=2)
+    with open(paths[0], "rb") as f0, open(paths[1], "rb") as f1:
+        assert f0.read() == f1.read()
+    assert Schedule(paths[0]).targets(5) != Schedule(paths[2]).targets(5)
+
+
+def test_window_is_reduced_for_small_pools(word_lists, tmp_path):
+    path = str(tmp_path / "schedule.bin")
+    build_schedule(word_lists, path, date(2026, 1, 1), 30, n_targets=5, window=10)
+    schedule = Schedule(path)
+    assert schedule.tables["daily", 5][:3] == (5, 30, 4)
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "schedule.bin"
+    path.write_bytes(b"not a schedule file")
+    with pytest.raises(ValueError):
+        Schedule(str(path))
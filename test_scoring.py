@@ -0,0 +1,135 @@
+import pytest
+
+import numpy as np
+
+from string import ascii_lowercase
+from scoring import (
+    encode_words,
+    decode_words,
+    score_word,
+    score,
+    score_matrix,
+    score_guess,
+    feedback_to_str,
+    str_to_feedback,
+    solved_code,
+    feedback_digits,
+    code_dtype,
+)
+
+
+@pytest.fixture
+def random_words() -> list:
+    rng = np.random.default_rng(42)
+    # use a small alphabet to get plenty of repeated letters
+    letters = np.array(list(ascii_lowercase[:4]))
+    return ["".join(rng.choice(letters, size=5)) for _ in range(60)]
+
+
+def test_encode_decode_roundtrip():
+    words = ["hello", "world", "zebra"]
+    assert decode_words(encode_words(words)) == words
+
+
+def test_encode_maps_a_to_zero():
+    matrix = encode_words(["abz"])
+    np.testing.assert_equal(matrix, [[0, 1, 25]])
+    assert matrix.dtype == np.uint8
+
+
+def test_encode_empty_list_with_length():
+    assert encode_words([], 5).shape == (0, 5)
+
+
+def test_encode_raises_on_mixed_lengths():
+    with pytest.raises(ValueError):
+        encode_words(["foo", "quux"])
+
+
+def test_feedback_str_roundtrip():
+    for feedback in ["x xxx. ", "   ... ", "xxxxx", "     "]:
+        code = str_to_feedback(feedback)
+        assert feedback_to_str(code, len(feedback)) == feedback
+
+
+def test_solved_code_matches_all_x():
+    assert feedback_to_str(solved_code(7), 7) == "xxxxxxx"
+
+
+@pytest.mark.parametrize(
+    "guess,target,expected",
+    [
+        ("targets", "snorkle", "  . . ."),
+        ("snipers", "snorkle", "xx  .. "),
+        ("maximum", "snorkle", "       "),
+        ("targets", "session", "    . ."),
+        ("sassier", "session", "x xxx. "),
+        ("duressy", "session", "   ... "),
+        ("asaasss", "session", " .  .. "),
+        ("asses", "cakes", ".  xx"),
+    ],
+)
+def test_score_word_examples(guess, target, expected):
+    assert feedback_to_str(score_word(guess, target), len(guess)) == expected
+
+
+def test_batch_score_matches_score_word(random_words):
+    guesses = random_words[:30]
+    targets = random_words[30:]
+    codes = score(encode_words(guesses), encode_words(targets))
+
+    for guess, target, code in zip(guesses, targets, codes):
+        assert code == score_word(guess, target)
+
+
+def test_score_matrix_matches_score_word(random_words):
+    guesses = random_words[:20]
+    targets = random_words[20:]
+    codes = score_matrix(encode_words(guesses), encode_words(targets), chunk_size=7)
+
+    assert codes.shape == (len(guesses), len(targets))
+    for i, guess in enumerate(guesses):
+        for j, target in enumerate(targets):
+            assert codes[i, j] == score_word(guess, target)
+
+
+def test_score_guess_matches_score_word(random_words):
+    matrix = encode_words(random_words)
+    for guess, encoded in zip(random_words[:10], matrix):
+        codes = score_guess(encoded, matrix)
+        assert codes.dtype == code_dtype(5)
+        assert codes.tolist() == [score_word(guess, _) for _ in random_words]
+
+
+def test_score_guess_with_letter_counts(random_words):
+    matrix = encode_words(random_words)
+    counts = np.zeros((len(matrix), 26), dtype=np.int8)
+    for i in range(5):
+        np.add.at(counts, (np.arange(len(matrix)), matrix[:, i]), 1)
+    np.testing.assert_equal(
+        score_guess(matrix[3], matrix, counts), score(matrix[3], matrix)
+    )
+
+
+def test_score_broadcasts_leading_dimensions(random_words):
+    guesses = encode_words(random_words[:3])
+    targets = encode_words(random_words[3:8])
+    codes = score(guesses[:, None, :], targets[None, :, :])
+    assert codes.shape == (3, 5)
+
+
+def test_code_dtype_is_smallest_that_fits():
+    assert code_dtype(5) == np.uint8
+    assert code_dtype(6) == np.uint16
+    assert code_dtype(11) == np.uint32
+
+
+def test_long_words_do_not_overflow():
+    guess = "abcdefghijklmno"
+    code = score(encode_words([guess]), encode_words([guess]))[0]
+    assert code == solved_code(len(guess))
+
+
+def test_feedback_digits():
+    code = str_to_feedback("x. x")
+    np.testing.assert_equal(feedback_digits(code, 4), [2, 1, 0, 2])
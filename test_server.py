@@ -0,0 +1,195 @@
+import asyncio
+import json
+
+import pytest
+
+from datetime import date, timedelta
+
+from dictionary import WordList
+from schedule import Schedule, build_schedule
+from server import ClonleServer
+
+
+@pytest.fixture
+def server() -> ClonleServer:
+    words = ["hello", "world", "abode", "zeros", "carts", "cakes", "rakes"]
+    freq = [7, 6, 5, 4, 3, 2, 1]
+    return ClonleServer(WordList.from_words(words, freq), max_attempts=3, rng=0)
+
+
+def test_new_session(server):
+    response = server.handle({"cmd": "new"})
+    assert response["ok"]
+    assert response["length"] == 5
+    assert response["max_attempts"] == 3
+    assert response["session"] in server.sessions
+
+
+def test_sessions_share_word_list(server):
+    s1 = server.handle({"cmd": "new"})["session"]
+    s2 = server.handle({"cmd": "new"})["session"]
+    assert server.sessions[s1].database is server.sessions[s2].database
+
+
+def test_seeded_sessions_have_same_target(server):
+    s1 = server.handle({"cmd": "new", "seed": 42})["session"]
+    s2 = server.handle({"cmd": "new", "seed": 42})["session"]
+    assert server.sessions[s1].target == server.sessions[s2].target
+
+
+def test_winning_closes_session(server):
+    session = server.handle({"cmd": "new"})["session"]
+    target = server.sessions[session].target
+    response = server.handle({"cmd": "guess", "session": session, "word": target})
+    assert response["ok"]
+    assert response["feedback"] == "xxxxx"
+    assert response["status"] == "won"
+    assert response["target"] == target
+    assert session not in server.sessions
+
+
+def test_losing_closes_session(server):
+    session = server.handle({"cmd": "new"})["session"]
+    target = server.sessions[session].target
+    word = next(_ for _ in server.database.words if _ != target)
+    for i in range(3):
+        response = server.handle({"cmd": "guess", "session": session, "word": word})
+        assert response["attempts"] == i + 1
+    assert response["status"] == "lost"
+    assert response["target"] == target
+    assert session not in server.sessions
+
+
+def test_state(server):
+    session = server.handle({"cmd": "new", "seed": 0})["session"]
+    server.sessions[session].start(target="hello")
+    server.handle({"cmd": "guess", "session": session, "word": "world"})
+    response = server.handle({"cmd": "state", "session": session})
+    assert response["attempts"] == 1
+    assert response["history"] == [("world", " . x ")]
+    assert response["letters"]["w"] == "missing"
+    assert response["letters"]["o"] == "contained"
+    assert response["letters"]["a"] == "unknown"
+
+
+def test_errors(server):
+    session = server.handle({"cmd": "new"})["session"]
+    assert not server.handle({"cmd": "dance"})["ok"]
+    assert not server.handle({"cmd": "guess", "session": session})["ok"]
+    assert not server.handle({"cmd": "guess", "session": 123, "word": "hello"})["ok"]
+
+    response = server.handle({"cmd": "guess", "session": session, "word": "xxxxx"})
+    assert not response["ok"]
+    assert "dictionary" in response["error"]
+
+
+@pytest.mark.parametrize("seed", [-1, 1.5, True, "42", [1], float("inf")])
+def test_invalid_seed(server, seed):
+    response = server.handle({"cmd": "new", "seed": seed})
+    assert not response["ok"]
+    assert "seed" in response["error"]
+    assert len(server.sessions) == 0
+
+
+def test_huge_seed_over_network(server):
+    async def run():
+        listener = await server.serve(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            # JSON parses 1e999 as infinity
+            writer.write(b'{"cmd": "new", "seed": 1e999}\n{"cmd": "new"}\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(2)]
+            writer.close()
+        return responses
+
+    bad, good = asyncio.run(run())
+    assert not bad["ok"]
+    assert good["ok"]
+
+
+def test_scheduled_sessions(server, tmp_path):
+    path = str(tmp_path / "schedule.bin")
+    build_schedule({5: server.database}, path, date.today(), 2)
+    server.schedule = Schedule(path)
+
+    session = server.handle({"cmd": "new", "period": "daily"})["session"]
+    assert server.sessions[session].target == server.schedule.target(5)
+
+
+def test_scheduled_session_errors(server, tmp_path):
+    response = server.handle({"cmd": "new", "period": "daily"})
+    assert not response["ok"]
+    assert "schedule" in response["error"]
+
+    path = str(tmp_path / "schedule.bin")
+    build_schedule({5: server.database}, path, date.today() + timedelta(days=2), 2)
+    server.schedule = Schedule(path)
+    response = server.handle({"cmd": "new", "period": "daily"})
+    assert not response["ok"]
+    assert len(server.sessions) == 0
+
+
+def test_quit(server):
+    session = server.handle({"cmd": "new"})["session"]
+    assert server.handle({"cmd": "quit", "session": session})["ok"]
+    assert session not in server.sessions
+
+
+def test_max_sessions_evicts_oldest(server):
+    server.max_sessions = 2
+    s1, s2, s3 = [server.handle({"cmd": "new"})["session"] for _ in range(3)]
+    assert list(server.sessions) == [s2, s3]
+
+
+def test_network_round_trip(server):
+    async def run():
+        listener = await server.serve(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+            async def request(line: bytes) -> dict:
+                writer.write(line + b"\n")
+                await writer.drain()
+                return json.loads(await reader.readline())
+
+            new = await request(json.dumps({"cmd": "new"}).encode())
+            guess = {"cmd": "guess", "session": new["session"], "word": "hello"}
+            response = await request(json.dumps(guess).encode())
+            malformed = await request(b"not json")
+
+            writer.close()
+        return response, malformed
+
+    response, malformed = asyncio.run(run())
+    assert response["ok"]
+    assert len(response["feedback"]) == 5
+    assert not malformed["ok"]
+
+
+def test_request_too_long(server):
+    async def run():
+        listener = await server.serve(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"x" * 100_000 + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            rest = await reader.read()
+            writer.close()
+
+            # the server keeps accepting other connections
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(json.dumps({"cmd": "new"}).encode() + b"\n")
+            await writer.drain()
+            other = json.loads(await reader.readline())
+            writer.close()
+        return response, rest, other
+
+    response, rest, other = asyncio.run(run())
+    assert response == {"ok": False, "error": "request too long."}
+    assert rest == b""
+    assert other["ok"]
@@ -0,0 +1,98 @@
+import pytest
+
+import multiprocessing
+import os
+
+import numpy as np
+
+from backend import ClonleBackend
+from dictionary import SortedWordIndex, WordList
+from shared import SharedDictionary
+
+
+@pytest.fixture
+def word_lists() -> dict:
+    return {
+        5: WordList.from_words(["rakes", "crane", "zeros", "abode"], [4, 3, 2, 1]),
+        3: WordList.from_words(["foo", "bar"], [2, 1]),
+    }
+
+
+@pytest.fixture
+def shared(word_lists, tmp_path):
+    with SharedDictionary(word_lists, directory=str(tmp_path)) as shared:
+        yield shared
+
+
+def test_word_lists_are_shared(shared, word_lists):
+    assert shared.lengths == [3, 5]
+    for length, word_list in word_lists.items():
+        loaded = shared.word_list(length)
+        assert isinstance(loaded.matrix, np.memmap)
+        assert isinstance(loaded.index, SortedWordIndex)
+        assert loaded.words == word_list.words
+        assert np.allclose(loaded.freq, word_list.freq)
+
+
+def test_backend_from_shared_path(shared):
+    clonle = ClonleBackend.from_source(shared.path, 5)
+    clonle.start(target="crane")
+    assert clonle.attempt("rakes") == ".. . "
+    assert clonle.attempt("crane") == "xxxxx"
+
+
+def test_close_removes_files(word_lists, tmp_path):
+    shared = SharedDictionary(word_lists, directory=str(tmp_path))
+    word_list = shared.word_list(5)
+    assert os.path.isdir(shared.path)
+    assert not shared.closed
+
+    shared.close()
+    assert shared.closed
+    assert not os.path.exists(shared.path)
+
+    # word lists loaded before closing are still usable
+    assert word_list.words == ["rakes", "crane", "zeros", "abode"]
+    assert "zeros" in word_list
+
+    # closing again does nothing
+    shared.close()
+
+
+def test_existing_name_is_not_overwritten(word_lists, tmp_path):
+    with SharedDictionary(word_lists, name="words", directory=str(tmp_path)):
+        with pytest.raises(FileExistsError):
+            SharedDictionary(word_lists, name="words", directory=str(tmp_path))
+
+
+def test_from_source(tmp_path):
+    csv_path = os.path.join(tmp_path, "dictionary.csv")
+    with open(csv_path, "wt") as f:
+        f.write("word,count\nfoo,4\nbar,3\nbazz,2\nquux,1\n")
+
+    with SharedDictionary.from_source(
+        csv_path, [3, 4], directory=str(tmp_path)
+    ) as shared:
+        assert shared.word_list(3).words == ["foo", "bar"]
+        assert shared.word_list(4).words == ["bazz", "quux"]
+
+
+def _play_in_worker(path: str) -> tuple:
+    clonle = ClonleBackend.from_source(path, 5, rng=1)
+    clonle.start()
+    return clonle.target, clonle.attempt(clonle.target)
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_workers_use_shared_path(shared):
+    with multiprocessing.get_context("fork").Pool(2) as pool:
+        results = pool.map(_play_in_worker, 2 * [shared.path])
+
+    for target, res in results:
+        assert target in ["rakes", "crane", "zeros", "abode"]
+        assert res == "xxxxx"
+
+    # the workers don't own the shared data
+    assert os.path.isdir(shared.path)
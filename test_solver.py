@@ -0,0 +1,182 @@
+import pytest
+
+import numpy as np
+
+from string import ascii_lowercase
+from backend import ClonleBackend, NotInitializedError
+from dictionary import WordList
+from solver import (
+    EntropySolver,
+    feedback_histograms,
+    mean_information,
+    median_information,
+    min_information,
+)
+
+
+@pytest.fixture
+def word_list() -> WordList:
+    rng = np.random.default_rng(3)
+    letters = np.array(list(ascii_lowercase[:6]))
+    words = sorted(set("".join(rng.choice(letters, size=5)) for _ in range(300)))
+    freq = rng.random(len(words))
+    order = np.argsort(-freq)
+    return WordList.from_words([words[_] for _ in order], freq[order])
+
+
+@pytest.fixture
+def clonle(word_list) -> ClonleBackend:
+    clonle = ClonleBackend(word_list, 5)
+    clonle.start(target_n_cutoff=100)
+    return clonle
+
+
+def test_feedback_histograms_counts_each_code():
+    codes = np.array([[0, 0, 2, 1], [3, 3, 3, 3]])
+    counts = feedback_histograms(codes)
+    np.testing.assert_equal(
+        np.sort(counts, axis=1)[:, ::-1][:, :3], [[2, 1, 1], [4, 0, 0]]
+    )
+
+
+def test_feedback_histograms_with_many_codes_and_weights():
+    codes = np.array([[100, 7, 100], [5, 6, 7]])
+    weights = np.array([0.5, 0.25, 0.25])
+    counts = feedback_histograms(codes, weights)
+    np.testing.assert_allclose(
+        np.sort(counts, axis=1)[:, ::-1][:, :3], [[0.75, 0.25, 0], [0.5, 0.25, 0.25]]
+    )
+
+
+@pytest.mark.parametrize("dtype", [int, float])
+def test_metrics_on_uniform_split(dtype):
+    counts = np.array([[3, 3, 3, 3, 0]], dtype=dtype)
+    assert mean_information(counts)[0] == pytest.approx(2)
+    assert median_information(counts)[0] == pytest.approx(2)
+    assert min_information(counts)[0] == pytest.approx(2)
+
+
+@pytest.mark.parametrize("dtype", [int, float])
+def test_metrics_on_uneven_split(dtype):
+    counts = np.array([[2, 1, 1]], dtype=dtype)
+    assert mean_information(counts)[0] == pytest.approx(1.5)
+    assert median_information(counts)[0] == pytest.approx(1)
+    assert min_information(counts)[0] == pytest.approx(1)
+
+
+@pytest.mark.parametrize("dtype", [int, float])
+def test_median_information_matches_brute_force(dtype):
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 6, size=(200, 12)).astype(dtype)
+    counts[:, 0] += 1
+    for row, score in zip(counts, median_information(counts)):
+        # the class size of the median target, with targets sorted by class size
+        sizes = np.sort(np.repeat(row, row.astype(int)))[::-1]
+        median = sizes[(len(sizes) + 1) // 2 - 1]
+        assert score == pytest.approx(np.log2(len(sizes) / median))
+
+
+def test_solver_raises_before_start(word_list, tmp_path):
+    solver = EntropySolver(ClonleBackend(word_list, 5), cache_dir=tmp_path)
+    with pytest.raises(NotInitializedError):
+        solver.next_guess()
+
+
+def test_solver_scores_match_brute_force(clonle, tmp_path):
+    solver = EntropySolver(clonle, cache_dir=tmp_path)
+    scores = solver.scores()
+
+    table = clonle.pattern_table(target_n_cutoff=100, cache_dir=tmp_path)
+    for i in [0, 17, 250]:
+        _, counts = np.unique(table[i], return_counts=True)
+        probs = counts / counts.sum()
+        assert scores[i] == pytest.approx(-np.sum(probs * np.log2(probs)))
+
+
+@pytest.mark.parametrize("metric", ["mean", "median", "min"])
+@pytest.mark.parametrize("weighted", [False, True])
+def test_solver_finds_target(clonle, tmp_path, metric, weighted):
+    clonle.max_attempts = 20
+    solver = EntropySolver(clonle, metric=metric, weighted=weighted, cache_dir=tmp_path)
+    for _ in range(clonle.max_attempts):
+        guess = solver.next_guess()
+        if clonle.attempt(guess) == 5 * "x":
+            break
+
+    assert guess == clonle.target
+
+
+@pytest.mark.parametrize("hard_mode", ["standard", "strict"])
+def test_solver_respects_hard_mode(word_list, tmp_path, hard_mode):
+    clonle = ClonleBackend(word_list, 5, max_attempts=20, hard_mode=hard_mode)
+    clonle.start(target_n_cutoff=100)
+    solver = EntropySolver(clonle, cache_dir=tmp_path)
+    for _ in range(clonle.max_attempts):
+        # attempt() raises if the guess breaks the hard-mode rules
+        guess = solver.next_guess()
+        if clonle.attempt(guess) == 5 * "x":
+            break
+
+    assert guess == clonle.target
+
+
+def test_solver_guesses_are_consistent_when_few_candidates_left(clonle, tmp_path):
+    solver = EntropySolver(clonle, cache_dir=tmp_path)
+    clonle.attempt(solver.next_guess())
+    clonle.attempt(solver.next_guess())
+
+    if clonle.candidates.count <= 2:
+        assert solver.next_guess() in clonle.candidates
+
+
+def test_solver_accepts_custom_metric(clonle, tmp_path):
+    def n_classes(counts: np.ndarray) -> np.ndarray:
+        return np.sum(counts > 0, axis=1)
+
+    solver = EntropySolver(clonle, metric=n_classes, cache_dir=tmp_path)
+    scores = solver.scores()
+    assert np.all(scores == np.round(scores))
+    assert solver.next_guess() in clonle.database
+
+
+def test_opening_is_cached(clonle, tmp_path):
+    solver = EntropySolver(clonle, cache_dir=tmp_path)
+    first = solver.next_guess()
+    clonle.attempt(first)
+    clonle.start(target_n_cutoff=100)
+    assert solver.next_guess() == first
+
+
+def test_cached_guesses_are_dropped_when_target_pool_changes(clonle, tmp_path):
+    solver = EntropySolver(clonle, cache_dir=tmp_path)
+    clonle.attempt(solver.next_guess())
+    solver.next_guess()
+
+    clonle.start(target_n_cutoff=10)
+    fresh = EntropySolver(clonle, cache_dir=tmp_path)
+    assert solver.next_guess() == fresh.next_guess()
+    clonle.attempt(fresh.next_guess())
+    assert solver.next_guess() == fresh.next_guess()
+
+
+def test_opening_can_be_provided(clonle, tmp_path):
+    opening = clonle.database.words[10]
+    solver = EntropySolver(clonle, cache_dir=tmp_path, opening=opening)
+    assert solver.next_guess() == opening
+    clonle.attempt(opening)
+    solver.next_guess()
+
+    clonle.start(target_n_cutoff=100)
+    assert solver.next_guess() == opening
+
+
+def test_guesses_are_memoized_by_history(clonle, tmp_path):
+    solver = EntropySolver(clonle, cache_dir=tmp_path)
+    clonle.attempt(solver.next_guess())
+    second = solver.next_guess()
+
+    target = clonle.target
+    clonle.start(target_n_cutoff=100, target=target)
+    clonle.attempt(solver.next_guess())
+    solver.scores = None  # any recalculation would now fail
+    assert solver.next_guess() == second
@@ -0,0 +1,150 @@
+import pytest
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from adversarial import AdversarialBackend
+from backend import ClonleBackend
+from dictionary import (
+    SortedWordIndex,
+    compile_dictionary,
+    dataframe_to_word_list,
+    dataframe_to_word_lists,
+    save_compiled,
+)
+from store import WordStore
+
+
+@pytest.fixture
+def database() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "word": [
+                "foo",
+                "snorkle",
+                "bar",
+                "targets",
+                "baz",
+                "sn1pers",
+                "maximum",
+                "rakes",
+                "crane",
+                "Zeros",
+            ],
+            "count": [4, 5, 3, 1, 2, 8, 6, 3, 7, 9],
+        }
+    )
+
+
+@pytest.fixture
+def store(database) -> WordStore:
+    return WordStore.from_dataframe(database)
+
+
+def test_lengths(store):
+    assert store.lengths == [3, 5, 7]
+    assert len(store) == 3
+    assert 5 in store
+    assert 4 not in store
+
+
+def test_matches_single_length_lists(store, database):
+    for length in store.lengths:
+        expected = dataframe_to_word_list(database, length)
+        assert store[length].words == expected.words
+        assert np.allclose(store[length].freq, expected.freq)
+
+
+def test_ties_keep_database_order():
+    rng = np.random.default_rng(0)
+    words = sorted({"".join(rng.choice(list("abcdef"), size=4)) for _ in range(500)})
+    words = list(rng.permutation(words))
+    counts = rng.integers(1, 4, size=len(words))
+    database = pd.DataFrame({"word": words, "count": counts})
+
+    store = WordStore.from_dataframe(database)
+    expected = [w for c in [3, 2, 1] for w, n in zip(words, counts) if n == c]
+    assert store[4].words == expected
+    assert dataframe_to_word_list(database, 4).words == expected
+
+
+def test_frequency_cutoff(database):
+    store = WordStore.from_dataframe(database, frequency_cutoff=0.1)
+    assert store.lengths == [5, 7]
+    assert store[7].words == ["maximum", "snorkle"]
+    assert store[5].words == ["crane"]
+
+
+def test_selected_lengths(database):
+    store = WordStore.from_dataframe(database, lengths=[3, 4, 7])
+    assert store.lengths == [3, 7]
+
+
+def test_missing_length(store):
+    with pytest.raises(KeyError):
+        store[4]
+    with pytest.raises(KeyError):
+        store.create_backend(4)
+
+
+def test_from_compiled(database, tmp_path):
+    path = os.path.join(tmp_path, "dictionary")
+    compile_dictionary(database, path)
+
+    store = WordStore.load(path, lengths=[5, 7, 9])
+    assert store.lengths == [5, 7]
+    assert isinstance(store[5].matrix, np.memmap)
+    assert store[7].words == ["maximum", "snorkle", "targets"]
+
+    store = WordStore.from_compiled(path, frequency_cutoff=0.1)
+    assert store.lengths == [5, 7]
+    assert store[7].words == ["maximum", "snorkle"]
+
+
+def test_from_compiled_cutoff_keeps_sorted_word_index(database, tmp_path):
+    path = os.path.join(tmp_path, "dictionary")
+    save_compiled(dataframe_to_word_lists(database), path, index=True)
+
+    store = WordStore.from_compiled(path, frequency_cutoff=0.1)
+    assert isinstance(store[7].index.index, SortedWordIndex)
+    assert store[7]._words is None
+    assert "snorkle" in store[7]
+    assert "targets" not in store[7]
+
+
+def test_load_csv(database, tmp_path):
+    path = os.path.join(tmp_path, "dictionary.csv")
+    database.to_csv(path, index=False)
+
+    store = WordStore.load(path)
+    assert store.lengths == [3, 5, 7]
+    assert store[5].words == ["crane", "rakes"]
+
+
+def test_create_backend(store):
+    clonle = store.create_backend(5, max_attempts=3, rng=1)
+    assert isinstance(clonle, ClonleBackend)
+    assert clonle.database is store[5]
+    assert clonle.max_attempts == 3
+
+    clonle.start(target="crane")
+    assert clonle.attempt("rakes") == ".. . "
+
+
+def test_create_backend_of_other_class(store):
+    clonle = store.create_backend(7, AdversarialBackend)
+    assert isinstance(clonle, AdversarialBackend)
+    assert clonle.database is store[7]
+
+
+def test_random_length(store):
+    lengths = [store.random_length(np.random.default_rng(i)) for i in range(100)]
+    assert set(lengths) == {3, 5, 7}
+    assert store.random_length(3) == store.random_length(3)
+
+
+def test_random_length_empty_store():
+    with pytest.raises(ValueError):
+        WordStore({}).random_length()